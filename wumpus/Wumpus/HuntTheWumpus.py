@@ -1,744 +1,1012 @@
-# Import necessary libraries
-import pygame       # Main game library for graphics and input
-import random      # For random number generation (hazard placement, etc.)
-import time        # For timing delays (message displays, etc.)
-import sys         # For system functions like exit
-
-# --- Constants ---
-# Game window dimensions (square)
-SCREEN_WIDTH = SCREEN_HEIGHT = 1000  
-
-# Game configuration - number of hazards/items
-NUM_BATS = 2       # Number of rooms with bats (teleport player)
-NUM_PITS = 1       # Number of rooms with bottomless pits (instant death)
-NUM_ARROWS = 3     # Number of extra arrows available in cave
-NUM_ROCKS = 3      # Number of extra rocks available in cave
-
-# Direction constants (matches indices in cave layout)
-UP = 0    # Index for upward exit
-DOWN = 1  # Index for downward exit  
-LEFT = 2  # Index for left exit
-RIGHT = 3 # Index for right exit
-
-# Color definitions (RGB tuples)
-BROWN = (193, 154, 107)  # Color for cave walls/paths
-BLACK = (0, 0, 0)         # Background color
-RED = (138, 7, 7)         # Warning color (Wumpus proximity)
-
-# --- Cave Layout ---
-# Dictionary representing the 20-room cave as a dodecahedron
-# Format: {room_number: [up_exit, down_exit, left_exit, right_exit]}
-# 0 indicates no exit in that direction
-# Rooms are interconnected to form the cave structure
-cave = {
-    1: [0, 8, 2, 5], 2: [0, 10, 3, 1], 3: [0, 12, 4, 2], 4: [0, 14, 5, 3],
-    5: [0, 6, 1, 4], 6: [5, 0, 7, 15], 7: [0, 17, 8, 6], 8: [1, 0, 9, 7],
-    9: [0, 18, 10, 8], 10: [2, 0, 11, 9], 11: [0, 19, 12, 10], 12: [3, 0, 13, 11],
-    13: [0, 20, 14, 12], 14: [4, 0, 15, 13], 15: [0, 16, 6, 14], 16: [15, 0, 17, 20],
-    17: [7, 0, 18, 16], 18: [9, 0, 19, 17], 19: [11, 0, 20, 18], 20: [13, 0, 16, 19]
-}
-
-# --- Game State Variables ---
-player_pos = 0          # Current room number (1-20) where player is located
-wumpus_pos = 0          # Current room number where Wumpus is located
-num_arrows = 1          # Player's current arrow count (starts with 1)
-num_rocks = 1           # Player's current rock count (starts with 1)
-mobile_wumpus = True    # Flag whether Wumpus can move between rooms
-wumpus_move_chance = 70 # Percentage chance Wumpus moves each turn (when mobile)
-last_direction = UP     # Tracks player's last facing direction (default up)
-
-# Lists tracking rooms containing each type of hazard/item
-bats_list = []    # Rooms containing bats
-pits_list = []    # Rooms containing bottomless pits 
-arrows_list = []  # Rooms containing arrow pickups
-rocks_list = []   # Rooms containing rock pickups
-
-def print_instructoions():
-    print(
-    '''
-                             Hunt The Wumpus!
-This is the game of "Hunt the Wumpus".  You have been cast into a
-dark 20 room cave with a fearsome Wumpus. The cave is shaped like a 
-dodachedron and the only way out is to kill the Wumpus.  To that end
-you have a bow with one arrow. You might find more arrows from unlucky 
-past Wumpus victims in the cave.  There are other dangers in the cave, 
-specifcally bats and bottomless pits.
-
-    * If you run out of arrows you die.
-    * If you end up in the same room with the Wumpus you die.
-    * If you fall into a bottomless pit you die.
-    * If you end up in a room with bats they will pick you up
-      and deposit you in a random location.
-
-If you are near the Wumpus you will see the bloodstains on the walls.
-If you are near bats you will hear them and if you are near a bottomless
-pit you will feel the air flowing down it.
-
-If you end up on a red spot the Wumpus will be in one of the following directions
-around you <a> key and an selection screen to fire your arrow, if you hit the Wumpus
-you win.
-
-If you are unsure where to move you can toss a rock to check if they are Bats, bottomless pits
-or the Wumpus by using the <r> key. 
-
-    '''
-    )
-
-# --- Initialize Pygame ---
-# Display game instructions and wait for player to start
-print_instructoions()
-input("Press <ENTER> to begin.")
-
-# Initialize all pygame modules
-pygame.init()
-
-# Create game window with double buffering and hardware acceleration
-screen = pygame.display.set_mode(
-    (SCREEN_WIDTH, SCREEN_HEIGHT), 
-    pygame.DOUBLEBUF | pygame.HWSURFACE
-)
-pygame.display.set_caption("Hunt the Wumpus")  # Window title
-
-# Create default font for text rendering (size 36)
-font = pygame.font.Font(None, 36)
-
-# --- Load Game Assets ---
-# Load all image assets used in the game
-bat_img = pygame.image.load('images/bat.png')      # Bat hazard image
-player_img = pygame.image.load('images/player.png') # Player character image
-wumpus_img = pygame.image.load('images/wumpus.png') # Wumpus enemy image
-arrow_img = pygame.image.load('images/arrow.png')   # Arrow projectile image
-rock_img = pygame.image.load('images/rock.png')     # Rock projectile image
-
-# --- Helper Functions ---
-
-def check_neighbor_rooms(pos, item_list):
-    """Check if any adjacent rooms contain items from item_list"""
-    exits = cave[pos]  # Get connected rooms from cave layout
-    return any(item in exits for item in item_list)  # True if any match found
-
-def draw_room(pos, screen):
-    """
-    Render the current game room with:
-    - Background and exits
-    - Player position
-    - Any hazards/items present
-    - Status information overlay
-    """
-    exits = cave[player_pos]  # Get exits for current room
-    
-    # Clear screen with black background
-    screen.fill(BLACK)  
-    
-    # Draw main cave circle (room walls)
-    circle_radius = int((SCREEN_WIDTH // 2) * 0.75)
-    pygame.draw.circle(screen, BROWN, (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2), circle_radius)
-
-    # Define exit rectangles for each direction (left, right, up, down)
-    directions = [
-        (LEFT, 0, SCREEN_HEIGHT//2-40, SCREEN_WIDTH//4, 80),
-        (RIGHT, SCREEN_WIDTH - SCREEN_WIDTH//4, SCREEN_HEIGHT//2-40, SCREEN_WIDTH//4, 80),
-        (UP, SCREEN_WIDTH//2-40, 0, 80, SCREEN_HEIGHT//4),
-        (DOWN, SCREEN_WIDTH//2-40, SCREEN_HEIGHT - SCREEN_WIDTH//4, 80, SCREEN_HEIGHT//4)
-    ]
-
-    # Draw each available exit path
-    for dir, x, y, w, h in directions:
-        if exits[dir] > 0:  # If exit exists in this direction
-            pygame.draw.rect(screen, BROWN, (x, y, w, h))
-
-    # Draw red warning circle if Wumpus is nearby
-    if check_neighbor_rooms(player_pos, [wumpus_pos, [-1, -1]]):
-        pygame.draw.circle(screen, RED, (SCREEN_WIDTH//2, SCREEN_HEIGHT//2), int((SCREEN_WIDTH//2)*.5))
-
-    # Draw pit if player is in pit room (though they should die immediately)
-    if player_pos in pits_list:
-        pygame.draw.circle(screen, BLACK, (SCREEN_WIDTH//2, SCREEN_HEIGHT//2), int((SCREEN_WIDTH//2)*.5))
-
-    # Draw player at center of screen
-    screen.blit(player_img, (SCREEN_WIDTH//2 - player_img.get_width()//2, SCREEN_HEIGHT//2 - player_img.get_height()//2))
-
-    # Draw hazards if present in current room
-    if player_pos in bats_list:
-        screen.blit(bat_img, (SCREEN_WIDTH//2 - bat_img.get_width()//2, SCREEN_HEIGHT//2 - bat_img.get_height()//2))
-    if player_pos == wumpus_pos:
-        screen.blit(wumpus_img, (SCREEN_WIDTH//2 - wumpus_img.get_width()//2, SCREEN_HEIGHT//2 - wumpus_img.get_height()//2))
-
-    # Draw status text overlay
-    y = 0  # Starting y-position for text
-    for line in [
-        f"POS: {player_pos}",  # Current room number
-        f"Arrows: {num_arrows}",  # Arrow count
-        f"Rocks: {num_rocks}",  # Rock count
-        "You hear the squeaking of bats nearby" if check_neighbor_rooms(player_pos, bats_list) else "",
-        "You feel a draft nearby" if check_neighbor_rooms(player_pos, pits_list) else ""
-    ]:
-        if line:  # Only render non-empty lines
-            text = font.render(line, True, (0, 255, 64))  # Green text
-            screen.blit(text, (0, y))
-            y += text.get_height() + 10  # Move down for next line
-
-    # Special handling for bat encounter - pause to show before teleporting
-    if player_pos in bats_list:
-        pygame.display.flip()
-        time.sleep(2)
-
-def check_room(pos):
-    """
-    Check current room for hazards/items and handle consequences
-    Modifies global game state
-    """
-    global player_pos, num_arrows, num_rocks
-
-    # Death conditions
-    if player_pos == wumpus_pos:
-        game_over("You were eaten by a WUMPUS!!!")
-    if player_pos in pits_list:
-        game_over("You fell into a bottomless pit!!")
-
-    # Bat encounter - teleport player
-    if player_pos in bats_list:
-        screen.fill(BLACK)
-        message = "Bats pick you up and place you elsewhere in the cave!"
-        text = font.render(message, True, (0, 255, 64))
-        text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-        screen.blit(text, text_rect)
-        pygame.display.flip()
-        time.sleep(2.5)
-        
-        # Move bats and teleport player to safe room
-        bats_list.remove(player_pos)
-        new_bat_pos = random.choice([i for i in range(1, 21) if i != player_pos])
-        bats_list.append(new_bat_pos)
-        player_pos = random.choice([i for i in range(1, 21) if i != player_pos])
-
-    # Arrow pickup
-    if player_pos in arrows_list:
-        show_message("You have found an arrow!")
-        num_arrows += 1
-        arrows_list.remove(player_pos)
-
-    # Rock pickup
-    if player_pos in rocks_list:
-        show_message("You have found a rock!")
-        num_rocks += 1
-        rocks_list.remove(player_pos)
-
-def show_message(msg):
-    """Display a message to the player centered on a black screen for 2.5 seconds"""
-    screen.fill(BLACK)  # Clear screen with black background
-    # Render the message text in green (RGB: 0,255,64)
-    text = font.render(msg, True, (0, 255, 64))
-    # Center the text on screen
-    text_rect = text.get_rect(center=screen.get_rect().center)
-    screen.blit(text, text_rect)  # Draw text to screen
-    pygame.display.flip()  # Update display
-    time.sleep(2.5)  # Pause to allow reading
-
-def shoot_arrow(direction):
-    """Handle arrow shooting mechanics"""
-    global num_arrows  # Need to modify arrow count
-    
-    # Check if player has arrows
-    if num_arrows == 0:
-        show_message("You have no arrows!")
-        return
-
-    # Deduct arrow and animate its flight
-    num_arrows -= 1
-    animate_projectile(arrow_img, direction)
-
-    # Check if arrow hit the Wumpus
-    if wumpus_pos == cave[player_pos][direction]:
-        game_over("Your aim was true and you have killed the Wumpus!")
-    else:
-        print("Your arrow sails into the darkness...")
-        place_wumpus()  # Wumpus may move after missed shot
-        
-        # Special warning when out of arrows
-        if num_arrows == 0:
-            show_message("You're out of arrows! The Wumpus begins to hunt you...")
-
-def throw_rock(direction):
-    """Handle rock throwing mechanics for scouting"""
-    global num_rocks  # Need to modify rock count
-    messages = []  # Stores feedback messages
-    
-    # Check if player has rocks
-    if num_rocks == 0:
-        messages.append("You have no rocks to throw!")
-    else:
-        # Deduct rock and animate its throw
-        num_rocks -= 1
-        animate_projectile(rock_img, direction)
-
-        # Determine what's in the target room
-        target = cave[player_pos][direction]
-        if wumpus_pos == target:
-            messages.append("You hear a low growl... the Wumpus is near!")
-        elif target in bats_list:
-            messages.append("You hear frantic squeaking... bats!")
-        elif target in pits_list:
-            messages.append("You hear the rock fall endlessly... a pit!")
-        else:
-            messages.append("You hear a faint clink. The room is empty.")
-            
-        # Warn if last rock was used
-        if num_rocks == 0:
-            messages.append("You have no rocks left!")
-
-    # Display all messages
-    screen.fill(BLACK)
-    y = 100  # Starting y-position for first message
-    for msg in messages:
-        text = font.render(msg, True, (255, 255, 255))  # White text
-        screen.blit(text, (screen.get_width()//2 - text.get_width()//2, y))
-        y += 50  # Move down for next message
-    pygame.display.flip()
-    time.sleep(2.5)  # Pause to read messages
-
-def move_wumpus():
-    """Handle Wumpus movement AI"""
-    global wumpus_pos
-    
-    # Behavior depends on whether player has arrows
-    if num_arrows > 0:
-        # Passive random movement mode
-        if not mobile_wumpus or random.randint(1, 100) > wumpus_move_chance:
-            return  # Chance to not move
-            
-        # Try to move to random adjacent safe room
-        neighbors = cave[wumpus_pos]
-        random.shuffle(neighbors)
-        for new_room in neighbors:
-            if new_room and new_room != player_pos and new_room not in pits_list + bats_list:
-                wumpus_pos = new_room
-                return
-    else:
-        # Aggressive chase mode when player is out of arrows
-        if player_pos in cave[wumpus_pos]:
-            wumpus_pos = player_pos  # Move directly to player if adjacent
-        else:
-            # Find closest safe room to player
-            neighbors = cave[wumpus_pos]
-            best = None
-            min_diff = 100  # Large initial difference
-            for new_room in neighbors:
-                if new_room and new_room not in pits_list + bats_list:
-                    diff = abs(new_room - player_pos)
-                    if diff < min_diff:
-                        min_diff = diff
-                        best = new_room
-            if best:
-                wumpus_pos = best
-
-def game_over(message):
-    """Display game over screen with options to retry, menu or quit"""
-    while True:  # Stay in game over loop until player chooses
-        screen.fill(RED)  # Red background for game over
-        
-        # Render game over message and options
-        text = font.render(message, True, (0, 255, 64))
-        retry = font.render("Press [R] to Retry", True, (255, 255, 255))
-        menu = font.render("Press [M] for Main Menu", True, (255, 255, 255))
-        exit_msg = font.render("Press [Q] to Quit", True, (255, 255, 255))
-
-        # Position and draw all text elements
-        screen.blit(text, text.get_rect(center=(SCREEN_WIDTH//2, 200)))
-        screen.blit(retry, (SCREEN_WIDTH//2 - retry.get_width()//2, 300))
-        screen.blit(menu, (SCREEN_WIDTH//2 - menu.get_width()//2, 350))
-        screen.blit(exit_msg, (SCREEN_WIDTH//2 - exit_msg.get_width()//2, 400))
-        pygame.display.flip()
-
-        # Handle player input
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: 
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:  # Retry
-                    reset_game()
-                    return
-                elif event.key == pygame.K_m:  # Main menu
-                    main_menu()
-                    reset_game()
-                    return
-                elif event.key == pygame.K_q:  # Quit
-                    pygame.quit()
-                    sys.exit()
-
-def animate_projectile(image, direction, color=(0, 0, 0)):
-    """
-    Animate a projectile (arrow/rock) flying in a straight line from center
-    Args:
-        image: pygame.Surface - The image to animate
-        direction: int - Direction constant (UP/DOWN/LEFT/RIGHT)
-        color: tuple - Background color during animation (default black)
-    """
-    # Start position at screen center
-    x = SCREEN_WIDTH // 2
-    y = SCREEN_HEIGHT // 2
-
-    # Movement variables
-    dx, dy = 0, 0  # Directional movement deltas
-    speed = 15      # Pixels per frame movement speed
-    steps = 20      # Number of animation frames (longer flight)
-
-    # Set direction vector based on input direction
-    if direction == UP:
-        dx, dy = 0, -speed  # Move upward
-    elif direction == DOWN:
-        dx, dy = 0, speed   # Move downward
-    elif direction == LEFT:
-        dx, dy = -speed, 0  # Move left
-    elif direction == RIGHT:
-        dx, dy = speed, 0   # Move right
-
-    # Animation loop
-    for _ in range(steps):
-        draw_room(player_pos, screen)  # Redraw background
-        x += dx  # Update position
-        y += dy
-        # Draw projectile centered at new position
-        screen.blit(image, (x - image.get_width() // 2, y - image.get_height() // 2))
-        pygame.display.flip()  # Update display
-        pygame.time.delay(30)   # Small delay for smooth animation
-
-# Global keybind configuration dictionary
-# Maps action names to pygame key constants
-keybinds = {
-    "move_up": pygame.K_UP,
-    "move_down": pygame.K_DOWN,
-    "move_left": pygame.K_LEFT,
-    "move_right": pygame.K_RIGHT,
-    "throw_rock": pygame.K_r,  # 'R' for rock
-    "shoot_arrow": pygame.K_a  # 'A' for arrow
-}
-
-class Player:
-    """Player character class handling position and rendering"""
-    def __init__(self):
-        # Start at center of screen
-        self.x = SCREEN_WIDTH // 2
-        self.y = SCREEN_HEIGHT // 2
-        self.speed = 5        # Movement speed in pixels
-        self.color = (255, 200, 0)  # Yellow-orange color
-        self.size = 30        # Square side length
-
-    def move(self, dx, dy):
-        """Move player by dx,dy units while keeping within screen bounds"""
-        self.x += dx * self.speed
-        self.y += dy * self.speed
-        # Clamp position to stay on screen
-        self.x = max(0, min(self.x, SCREEN_WIDTH - self.size))
-        self.y = max(0, min(self.y, SCREEN_HEIGHT - self.size))
-
-    def draw(self, surface):
-        """Draw player as colored square on given surface"""
-        pygame.draw.rect(surface, self.color, (self.x, self.y, self.size, self.size))
-
-# Create player instance
-player = Player()
-
-def main_menu():
-    """Display main menu screen and handle navigation"""
-    while True:
-        screen.fill(BLACK)  # Clear screen
-        
-        # Render menu text options
-        title = font.render("Hunt the Wumpus", True, (255, 255, 255))
-        start = font.render("Press [S] to Start", True, (0, 255, 0))  # Green
-        setting = font.render("Press [`] for Settings", True, (0, 0, 255))  # Blue
-        quit_game = font.render("Press [Q] to Quit", True, (255, 0, 0))  # Red
-
-        # Position and draw all text elements
-        screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 150))
-        screen.blit(start, (SCREEN_WIDTH//2 - start.get_width()//2, 250))
-        screen.blit(setting, (SCREEN_WIDTH//2 - setting.get_width()//2, 300))
-        screen.blit(quit_game, (SCREEN_WIDTH//2 - quit_game.get_width()//2, 350))
-
-        pygame.display.flip()
-
-        # Event handling loop
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_s:  # Start game
-                    return  
-                elif event.key == pygame.K_q:  # Quit
-                    pygame.quit()
-                    sys.exit()
-                elif event.key == pygame.K_BACKQUOTE:  # Settings
-                    settings_menu()
-                elif event.key == pygame.K_d:  # Difficulty
-                    difficulty_menu()
-
-def settings_menu():
-    """Key rebinding configuration menu"""
-    global keybinds
-    selected_action = None  # Currently selected action to rebind
-    message = ""  # Status message to display
-
-    while True:
-        screen.fill((30, 30, 30))  # Dark gray background
-        title = font.render("Settings - Keybinds", True, (255, 255, 255))
-        screen.blit(title, (200, 50))
-
-        # Display all keybindings
-        y = 150
-        for idx, (action, key) in enumerate(keybinds.items(), start=1):
-            # Format action text with current key
-            action_text = f"[{idx}] {action.replace('_', ' ').title()}: {pygame.key.name(key)}"
-            # Highlight selected action
-            color = (255, 255, 0) if selected_action == action else (255, 255, 255)
-            text_surface = font.render(action_text, True, color)
-            screen.blit(text_surface, (200, y))
-            y += 50
-
-        # Help instructions
-        instructions = font.render(
-            "Press 1-6 to rebind keys. Press [D] for difficulty. ESC to go back.", 
-            True, (150, 150, 150))
-        screen.blit(instructions, (100, 500))
-
-        # Display status message if exists
-        if message:
-            msg_surface = font.render(message, True, (0, 255, 0))
-            screen.blit(msg_surface, (100, 450))
-
-        pygame.display.flip()
-
-        # Handle input events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if selected_action:  # If waiting for new key
-                    keybinds[selected_action] = event.key  # Update binding
-                    message = f"{selected_action.replace('_', ' ').title()} set to {pygame.key.name(event.key)}"
-                    selected_action = None
-                elif event.key == pygame.K_ESCAPE:  # Return to previous menu
-                    return
-                # Number keys select actions 1-6
-                elif event.key == pygame.K_1:
-                    selected_action = "move_up"
-                elif event.key == pygame.K_2:
-                    selected_action = "move_down"
-                elif event.key == pygame.K_3:
-                    selected_action = "move_left"
-                elif event.key == pygame.K_4:
-                    selected_action = "move_right"
-                elif event.key == pygame.K_5:
-                    selected_action = "throw_rock"
-                elif event.key == pygame.K_6:
-                    selected_action = "shoot_arrow"
-                elif event.key == pygame.K_d:  # Open difficulty menu
-                    difficulty_menu()
-
-def difficulty_menu():
-    """Menu for selecting game difficulty level"""
-    global NUM_BATS, NUM_PITS, NUM_ARROWS, NUM_ROCKS, wumpus_move_chance
-    
-    # Difficulty options and their configurations
-    options = ["Easy", "Medium", "Hard"]
-    values = {
-        "Easy": (1, 1, 5, 5, 30),    # bats, pits, arrows, rocks, move_chance%
-        "Medium": (2, 1, 3, 3, 60),   # bats, pits, arrows, rocks, move_chance%
-        "Hard": (3, 2, 1, 1, 90)      # bats, pits, arrows, rocks, move_chance%
-    }
-    selected = 0  # Currently selected option index
-
-    while True:
-        screen.fill((10, 10, 10))  # Very dark background
-        title = font.render("Select Difficulty", True, (255, 255, 255))
-        screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 100))
-
-        # Draw all difficulty options
-        for i, option in enumerate(options):
-            # Highlight selected option
-            color = (0, 255, 0) if i == selected else (255, 255, 255)
-            text = font.render(option, True, color)
-            screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, 200 + i * 60))
-
-        # Return instructions
-        back_msg = font.render("Press ESC to return", True, (100, 100, 100))
-        screen.blit(back_msg, (SCREEN_WIDTH // 2 - back_msg.get_width() // 2, 450))
-
-        pygame.display.flip()
-
-        # Handle input
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: 
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:  # Move selection up
-                    selected = (selected - 1) % len(options)
-                elif event.key == pygame.K_DOWN:  # Move selection down
-                    selected = (selected + 1) % len(options)
-                elif event.key == pygame.K_RETURN:  # Confirm selection
-                    # Update game parameters based on difficulty
-                    NUM_BATS, NUM_PITS, NUM_ARROWS, NUM_ROCKS, wumpus_move_chance = values[options[selected]]
-                    return
-                elif event.key == pygame.K_ESCAPE:  # Return without changes
-                    return
-                
-def reset_game():
-    """Reset game state to initial conditions"""
-    global num_arrows, num_rocks
-    num_arrows = 1  # Reset to starting arrow count
-    num_rocks = 2   # Reset to starting rock count
-    populate_cave()  # Regenerate cave layout and hazards
-
-def populate_cave():
-    """Initialize cave with random placement of player, wumpus, and items"""
-    global player_pos, wumpus_pos
-    # Clear all existing item/hazard lists
-    bats_list.clear()
-    pits_list.clear()
-    arrows_list.clear()
-    rocks_list.clear()
-
-    # Place player in random room (1-20)
-    player_pos = random.randint(1, 20)
-    place_wumpus()  # Place wumpus (ensuring not in same room as player)
-    
-    # Place hazards and items according to current difficulty settings
-    for _ in range(NUM_BATS): place_bat()
-    for _ in range(NUM_PITS): place_pit()
-    for _ in range(NUM_ARROWS): place_arrow()
-    for _ in range(NUM_ROCKS): place_rock()
-
-def place_wumpus():
-    """Place the Wumpus in a random room not containing the player"""
-    global wumpus_pos
-    while True:
-        wumpus_pos = random.randint(1, 20)
-        if wumpus_pos != player_pos:  # Ensure wumpus doesn't spawn on player
-            break
-
-def place_item(item_list):
-    """
-    Generic function to place an item in a valid random room
-    Args:
-        item_list: The list to add the room number to (bats, pits, etc.)
-    """
-    while True:
-        pos = random.randint(1, 20)  # Random room number
-        # Check room is empty and not containing player/wumpus
-        if (pos != player_pos and 
-            pos != wumpus_pos and 
-            pos not in pits_list + bats_list + item_list):
-            item_list.append(pos)
-            break
-
-# Convenience functions for placing specific items
-def place_bat(): place_item(bats_list)
-def place_pit(): place_item(pits_list)
-def place_arrow(): place_item(arrows_list)
-def place_rock(): place_item(rocks_list)
-
-def get_action_from_key(key):
-    """Look up which action is bound to the given key"""
-    for action, bound_key in keybinds.items():
-        if key == bound_key:
-            return action
-    return None  # No action bound to this key
-
-def check_pygame_events():
-    """Handle all pygame events including player input"""
-    global player_pos, last_direction
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:  # Window close button
-            pygame.quit()
-            sys.exit()
-
-        if event.type == pygame.KEYDOWN:  # Key press events
-            if event.key == pygame.K_ESCAPE:  # Quit on ESC
-                pygame.quit()
-                sys.exit()
-
-            # Check if pressed key is bound to an action
-            action = get_action_from_key(event.key)
-
-            # Movement handling
-            if action in ["move_left", "move_right", "move_up", "move_down"]:
-                # Convert action to direction constant
-                if action == "move_left": direction = LEFT
-                elif action == "move_right": direction = RIGHT
-                elif action == "move_up": direction = UP
-                elif action == "move_down": direction = DOWN
-
-                last_direction = direction  # Track facing direction
-
-                # Check for modified movement (shoot/throw)
-                if pygame.key.get_mods() & pygame.KMOD_SHIFT:  # Shift+move = shoot
-                    shoot_arrow(direction)
-                elif pygame.key.get_mods() & pygame.KMOD_CTRL:  # Ctrl+move = throw
-                    throw_rock(direction)
-                # Normal movement if exit exists in that direction
-                elif cave[player_pos][direction] > 0:
-                    player_pos = cave[player_pos][direction]  # Move player
-                    move_wumpus()  # Wumpus may move after player
-
-            # Direct action keys
-            elif action == "throw_rock":
-                direction = choose_direction("Choose direction to throw rock")
-                if direction is not None:  # If direction was selected
-                    throw_rock(direction)
-                    
-            elif action == "shoot_arrow":
-                direction = choose_direction("Choose direction to shoot arrow")
-                if direction is not None:
-                    shoot_arrow(direction)
-
-def choose_direction(prompt):
-    """Display directional choice menu and return selection"""
-    options = ["UP", "DOWN", "LEFT", "RIGHT"]
-    directions = [UP, DOWN, LEFT, RIGHT]  # Corresponding direction constants
-    selected = 0  # Currently selected option index
-
-    while True:
-        screen.fill(BLACK)
-        # Display prompt text
-        title = font.render(prompt, True, (255, 255, 255))
-        screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 100))
-
-        # Display all direction options
-        for i, option in enumerate(options):
-            # Highlight selected option in green
-            color = (0, 255, 0) if i == selected else (200, 200, 200)
-            text = font.render(option, True, color)
-            screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 200 + i * 50))
-
-        pygame.display.flip()
-
-        # Handle menu navigation
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:  # Move selection up
-                    selected = (selected - 1) % len(options)
-                elif event.key == pygame.K_DOWN:  # Move selection down
-                    selected = (selected + 1) % len(options)
-                elif event.key == pygame.K_RETURN:  # Confirm selection
-                    return directions[selected]
-                elif event.key == pygame.K_ESCAPE:  # Cancel
-                    return None
-
-# --- Game Start ---
-main_menu()  # Show main menu first
-reset_game()  # Initialize game state
-
-# Main game loop
-while True:
-    check_pygame_events()  # Handle input
-    draw_room(player_pos, screen)  # Render current room
-    pygame.display.flip()  # Update display
-    check_room(player_pos)  # Check for hazards/items in current room
\ No newline at end of file
+# Import necessary libraries
+import pygame       # Main game library for graphics and input
+import sys         # For system functions like exit
+import argparse    # Profiling options on the command line
+import os          # For the asset cache path
+import engine      # Pygame-free game rules (GameState/Engine)
+import agent       # AI player behind the hint key
+from config import load_config, save_config, load_keybinds, DEFAULT_KEYBINDS  # Keybinds and difficulty kept between runs
+from snapshot import save_snapshots, load_snapshots  # Saved game for Continue
+from timeline import Timeline  # Non-blocking queue for messages and animations
+from render_cache import SurfaceCache  # LRU caches for text and room backgrounds
+from profiler import Profiler  # Frame phase timers, stats overlay and traces
+import telemetry    # Gameplay events recorded to files (--telemetry)
+from layout import Layout  # Positions and sizes worked out for the window size
+from assets import AssetManager, IMAGE_DIR  # Converted, scaled and cached sprites
+from engine import UP, DOWN, LEFT, RIGHT, cave
+
+# --- Constants ---
+# Starting window size (the window can be resized, everything is laid out for its size)
+SCREEN_WIDTH = SCREEN_HEIGHT = 1000  
+RESIZABLE = True     # Let the player resize the window
+
+# Rendering
+RENDER_SCALE = 1.0   # Draw at this fraction of the window size and upscale (e.g. 0.5 on weak hardware)
+DIRTY_RECTS = True   # Only push the parts of the screen that changed to the window
+
+# Frame pacing - screens are only redrawn after input or a state change
+FPS_CAP = 60        # Most loop iterations allowed per second
+IDLE_WAIT = True    # Sleep in pygame.event.wait() until something happens
+
+# Timed overlays - shown without freezing the window
+MESSAGE_TIME = 2.5      # Seconds a message stays on screen
+BAT_TIME = 2.0          # Seconds the bats are shown before they carry you off
+PROJECTILE_TIME = 0.6   # Seconds an arrow/rock takes to fly across the room
+SKIP_ON_KEYPRESS = True # Any key cuts the current message/animation short
+
+# Render caches
+TEXT_CACHE_SIZE = 256     # Rendered text surfaces kept
+ROOM_CACHE_SIZE = 16      # Room backgrounds kept (one per exit layout and floor colour)
+SHOW_CACHE_STATS = False  # Show the cache hit rate in the room status text
+
+# Frame stats overlay (FPS, frame times, event queue, phase times) - F3 toggles it,
+# the loop's functions are only timed while it is shown or a trace is recorded
+SHOW_FRAME_STATS = False
+
+# Packed file of decoded images for faster starts (None to always decode the PNGs)
+ASSET_CACHE_FILE = os.path.join(IMAGE_DIR, "assets.cache")
+# Unfinished game saved on quitting, offered as Continue in the main menu
+SAVE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "savegame.wsnap")
+
+# Color definitions (RGB tuples)
+BROWN = (193, 154, 107)  # Color for cave walls/paths
+STATUS_COLOR = (0, 255, 64)  # Green status text in the room
+BLACK = (0, 0, 0)         # Background color
+RED = (138, 7, 7)         # Warning color (Wumpus proximity)
+
+# --- Game State ---
+# The rules and all per-game state live in engine.py, this file only draws them
+game = engine.Engine()     # Rules + difficulty settings (changed by difficulty_menu)
+difficulty = None          # Name of the chosen DIFFICULTIES preset (None = engine defaults)
+chosen_game = None         # Engine with the chosen settings while a continued game plays with its own
+state = engine.GameState() # Current GameState (replaced by reset_game)
+last_direction = UP        # Tracks player's last facing direction (default up)
+advisor = agent.Agent()    # Follows the game from the player's view to give hints
+pending_turn = None        # (action, direction, events) of the last action, until check_room
+
+# --- Display, Font and Sprites ---
+# Nothing is initialized at import time, so the module can be imported by
+# tools and tests without a display. init_display()/get_font() set these up
+# the first time they are needed (the game never plays sound, so the mixer
+# is never started). apply_layout() redoes the size-dependent ones when the
+# window is resized.
+window = None      # Game window surface
+screen = None      # Surface everything is drawn on (the window, or a smaller one when RENDER_SCALE < 1)
+layout = None      # Layout of screen (positions, radii, exit rectangles, font size)
+assets = None      # AssetManager scaling the sprites for the layout
+font = None        # Default font for all text
+bat_img = player_img = wumpus_img = arrow_img = rock_img = None  # Sprites
+shown_room = None  # (room look, status lines) in the window, None after anything else was shown
+
+def print_instructoions():
+    print(
+    '''
+                             Hunt The Wumpus!
+This is the game of "Hunt the Wumpus".  You have been cast into a
+dark 20 room cave with a fearsome Wumpus. The cave is shaped like a 
+dodachedron and the only way out is to kill the Wumpus.  To that end
+you have a bow with one arrow. You might find more arrows from unlucky 
+past Wumpus victims in the cave.  There are other dangers in the cave, 
+specifcally bats and bottomless pits.
+
+    * If you run out of arrows you die.
+    * If you end up in the same room with the Wumpus you die.
+    * If you fall into a bottomless pit you die.
+    * If you end up in a room with bats they will pick you up
+      and deposit you in a random location.
+
+If you are near the Wumpus you will see the bloodstains on the walls.
+If you are near bats you will hear them and if you are near a bottomless
+pit you will feel the air flowing down it.
+
+If you end up on a red spot the Wumpus will be in one of the following directions
+around you <a> key and an selection screen to fire your arrow, if you hit the Wumpus
+you win.
+
+If you are unsure where to move you can toss a rock to check if they are Bats, bottomless pits
+or the Wumpus by using the <r> key. Stuck? Press <h> for a hint.
+
+    '''
+    )
+
+# --- Initialize Pygame ---
+
+# Window flags: double buffering and hardware acceleration (and resizing)
+WINDOW_FLAGS = pygame.DOUBLEBUF | pygame.HWSURFACE | (pygame.RESIZABLE if RESIZABLE else 0)
+
+def init_display():
+    """Open the game window and load everything that needs it (first call only)"""
+    global window, assets
+    if window is not None:
+        return screen
+
+    # Only the display is started here, not every pygame subsystem
+    pygame.display.init()
+
+    # Create game window
+    window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), WINDOW_FLAGS)
+    pygame.display.set_caption("Hunt the Wumpus")  # Window title
+
+    # --- Load Game Assets ---
+    # Images are decoded once (converted for fast blits, from the images
+    # folder wherever the game is run from) and scaled by apply_layout
+    assets = AssetManager(cache_path=ASSET_CACHE_FILE)
+    apply_layout()
+    assets.save_cache()  # Next start loads all of them in one read
+    return screen
+
+def resize_window(size):
+    """Handle a VIDEORESIZE: reopen the window at the new size and lay it out again"""
+    global window
+    window = pygame.display.set_mode(size, WINDOW_FLAGS)
+    apply_layout()
+
+def apply_layout():
+    """
+    Work out the layout for the window's size and rebuild everything that
+    depends on it: the render target, sprites, font and cached surfaces
+    (only called when the window opens or is resized)
+    """
+    global screen, layout, font, shown_room, bat_img, player_img, wumpus_img, arrow_img, rock_img
+    width, height = window.get_size()
+    if RENDER_SCALE < 1.0:  # Draw small, present() upscales it once per frame
+        screen = pygame.Surface((max(1, int(width * RENDER_SCALE)), max(1, int(height * RENDER_SCALE)))).convert()
+    else:
+        screen = window
+    layout = Layout(*screen.get_size())
+
+    # Sprites scaled for the layout
+    assets.set_scale(layout.scale)
+    bat_img = assets.image('bat.png')       # Bat hazard image
+    player_img = assets.image('player.png') # Player character image
+    wumpus_img = assets.image('wumpus.png') # Wumpus enemy image
+    arrow_img = assets.image('arrow.png')   # Arrow projectile image
+    rock_img = assets.image('rock.png')     # Rock projectile image
+
+    # Text and room backgrounds were rendered for the old size
+    font = None
+    text_cache.clear()
+    room_backgrounds.clear()
+    shown_room = None
+
+    # Pre-render the background of every room in the cave
+    for room_exits in cave.values():
+        room_backgrounds.get(tuple(room > 0 for room in room_exits), None)
+
+def get_font():
+    """Default font for text rendering (size 36 on a 1000 pixel window), created on first use"""
+    global font
+    if font is None:
+        pygame.font.init()
+        font = pygame.font.Font(None, layout.font_size if layout else 36)
+    return font
+
+# Every label is rendered once per (string, colour) and reused
+text_cache = SurfaceCache(lambda text, color: get_font().render(text, True, color), TEXT_CACHE_SIZE)
+
+def render_text(text, color):
+    """Rendered text surface for the string in the given colour (cached)"""
+    return text_cache.get(text, color)
+
+# Clock used to cap the frame rate of every loop
+clock = pygame.time.Clock()
+
+# Queue of timed messages and animations drawn on top of the game
+overlays = Timeline()
+held_keys = []  # Key presses made while an overlay played (SKIP_ON_KEYPRESS off), posted again after it
+
+# Events that need handling or mean the current screen has to be drawn again
+REDRAW_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.VIDEORESIZE)
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)  # The window has to be drawn again in full
+
+# --- Helper Functions ---
+
+def limit_frame_rate():
+    """Sleep just long enough to keep the loop under FPS_CAP"""
+    clock.tick(FPS_CAP)
+
+def next_events():
+    """
+    Wait for the next batch of events without spinning the CPU
+    Caps the loop at FPS_CAP and, in idle mode, blocks until an event arrives
+    """
+    limit_frame_rate()
+    if IDLE_WAIT:
+        events = [pygame.event.wait()] + pygame.event.get()
+    else:
+        events = pygame.event.get()
+    handle_window_events(events)
+    return events
+
+def handle_window_events(events):
+    """Lay the window out again after a resize, forget what it showed after an expose"""
+    global shown_room
+    for event in events:
+        if event.type == pygame.VIDEORESIZE:
+            resize_window(event.size)
+        elif event.type in EXPOSE_EVENTS:
+            shown_room = None
+
+def wait_for_input():
+    """
+    Return the next events that need handling (key press, quit, window exposed)
+    Other events such as mouse movement are dropped so nothing gets redrawn for them
+    """
+    while True:
+        events = next_events()
+        if any(event.type in REDRAW_EVENTS for event in events):
+            return events
+
+def update_overlays():
+    """
+    Draw the current timed overlay and handle input while it plays
+    Returns False once nothing is queued
+    """
+    overlay = overlays.current()
+    if overlay is None:
+        for event in held_keys:  # Keys pressed during the overlays act now, in order
+            pygame.event.post(event)
+        held_keys.clear()
+        return False
+    present(overlay.draw(screen, overlays.progress()))  # Animations return the rects they changed
+
+    # Animations need every frame, still overlays only wake up when they end
+    limit_frame_rate()
+    if overlay.animated:
+        events = pygame.event.get()
+    else:
+        events = [pygame.event.wait(max(1, int(overlays.time_left() * 1000)))] + pygame.event.get()
+    handle_window_events(events)
+
+    for event in events:
+        if event.type == pygame.QUIT:
+            exit_game()
+        elif event.type == pygame.KEYDOWN:
+            if SKIP_ON_KEYPRESS:
+                overlays.skip()
+            else:
+                held_keys.append(event)
+    return True
+
+def present(rects=None):
+    """
+    Show what was drawn on screen in the window
+    Args:
+        rects: list of pygame.Rect areas of screen that changed (None = all of it)
+    """
+    global shown_room
+    shown_room = None  # show_room() sets it again after its own present()
+    if not DIRTY_RECTS:
+        rects = None
+
+    # The frame stats overlay goes on top and is taken off again afterwards
+    covered = frame_profiler.draw(screen) if frame_profiler.visible else None
+    if covered and rects is not None:
+        rects = rects + [covered[0]]
+
+    if screen is not window:  # Low resolution render target, upscaled once per frame
+        pygame.transform.scale(screen, window.get_size(), window)
+        if rects is not None:
+            sx = window.get_width() / screen.get_width()
+            sy = window.get_height() / screen.get_height()
+            rects = [pygame.Rect(int(rect.x * sx), int(rect.y * sy), int(rect.w * sx) + 2, int(rect.h * sy) + 2)
+                     for rect in rects]
+
+    if rects is None:
+        pygame.display.flip()
+    else:
+        pygame.display.update(rects)
+
+    if covered:
+        screen.blit(covered[1], covered[0])
+
+def finish_overlays():
+    """Play everything queued before a screen that takes over the loop"""
+    while update_overlays():
+        pass
+
+def build_room_background(open_exits, floor):
+    """
+    Render the parts of a room that only change when the player moves:
+    walls, exits and the floor warning colour
+    Args:
+        open_exits: tuple of 4 bools, True where the room has an exit
+        floor: colour of the floor circle (RED near the Wumpus, BLACK in a pit) or None
+    """
+    surface = pygame.Surface(layout.size).convert()
+
+    # Clear screen with black background
+    surface.fill(BLACK)  
+    
+    # Draw main cave circle (room walls)
+    pygame.draw.circle(surface, BROWN, layout.center, layout.wall_radius)
+
+    # Draw each available exit path (rectangles from the layout)
+    for dir, rect in layout.exits.items():
+        if open_exits[dir]:  # If exit exists in this direction
+            pygame.draw.rect(surface, BROWN, rect)
+
+    # Draw red warning circle / black pit over the floor
+    if floor is not None:
+        pygame.draw.circle(surface, floor, layout.center, layout.floor_radius)
+    return surface
+
+# Rooms with the same exit layout share one pre-rendered background
+room_backgrounds = SurfaceCache(build_room_background, ROOM_CACHE_SIZE)
+
+# Phases of the main loop timed by the frame profiler (see profiler.py)
+frame_profiler = Profiler({"text": text_cache, "rooms": room_backgrounds})
+this_module = sys.modules[__name__]  # Looked up by name, so functions defined below work too
+frame_profiler.add(this_module, "draw_room", "draw_room")
+frame_profiler.add(this_module, "check_room", "check_room")
+frame_profiler.add(text_cache, "build", "render_text")        # font.render on a cache miss
+frame_profiler.add(room_backgrounds, "build", "build_room")   # Room background on a cache miss
+frame_profiler.add(this_module, "present", "present")         # Ends a frame
+frame_profiler.add(pygame.display, "flip", "flip")            # Whole window pushed
+frame_profiler.add(pygame.display, "update", "update")        # Only the changed rects pushed
+frame_profiler.add(pygame.event, "get", "events", count=True) # Also counts the queued events
+frame_profiler.add(pygame.event, "wait", "wait")              # Blocked until input arrives
+frame_profiler.add(this_module, "limit_frame_rate", "tick")   # Blocked by the frame cap
+
+def room_look():
+    """
+    What the room looks like apart from the status text, as a tuple
+    (open exits, floor colour, bats shown, Wumpus shown)
+    """
+    player_pos = state.player_pos
+    exits = cave[player_pos]  # Get exits for current room
+
+    # Red warning circle if Wumpus is nearby, pit if player is in pit room
+    # (though they should die immediately)
+    floor = None
+    if state.has_pit(player_pos):
+        floor = BLACK
+    elif game.wumpus_nearby(state):
+        floor = RED
+
+    open_exits = (exits[UP] > 0, exits[DOWN] > 0, exits[LEFT] > 0, exits[RIGHT] > 0)
+    return open_exits, floor, state.has_bats(player_pos), player_pos == state.wumpus_pos
+
+def status_lines():
+    """Status text shown in the top left corner of the room (non-empty lines)"""
+    lines = [
+        f"POS: {state.player_pos}",  # Current room number
+        f"Arrows: {state.num_arrows}",  # Arrow count
+        f"Rocks: {state.num_rocks}",  # Rock count
+        engine.BATS_NEARBY_MESSAGE if game.bats_nearby(state) else "",
+        engine.PIT_NEARBY_MESSAGE if game.pit_nearby(state) else "",
+        f"Cache hits: text {text_cache.hit_rate():.0%}, rooms {room_backgrounds.hit_rate():.0%}" if SHOW_CACHE_STATS else ""
+    ]
+    return [line for line in lines if line]
+
+def status_area(lines):
+    """Rect covered by the status text lines"""
+    width = height = 0
+    for line in lines:
+        text = render_text(line, STATUS_COLOR)
+        width = max(width, text.get_width())
+        height += text.get_height() + layout.line_gap
+    return pygame.Rect(0, 0, width, height)
+
+def draw_room(pos, screen):
+    """
+    Render the current game room with:
+    - Background and exits
+    - Player position
+    - Any hazards/items present
+    - Status information overlay
+    """
+    open_exits, floor, bats, wumpus = room_look()
+
+    # Walls, exits and floor come from a cached pre-rendered background
+    screen.blit(room_backgrounds.get(open_exits, floor), (0, 0))
+
+    # Draw player at center of screen
+    screen.blit(player_img, player_img.get_rect(center=layout.center))
+
+    # Draw hazards if present in current room
+    if bats:
+        screen.blit(bat_img, bat_img.get_rect(center=layout.center))
+    if wumpus:
+        screen.blit(wumpus_img, wumpus_img.get_rect(center=layout.center))
+
+    # Draw status text overlay
+    y = 0  # Starting y-position for text
+    for line in status_lines():
+        text = render_text(line, STATUS_COLOR)  # Green text
+        screen.blit(text, (0, y))
+        y += text.get_height() + layout.line_gap  # Move down for next line
+
+def show_room():
+    """
+    Draw the current room and push it to the window. When only the status
+    text changed since the room was last shown, just the status area is
+    redrawn and pushed (nothing at all if nothing changed)
+    """
+    global shown_room
+    look, lines = room_look(), status_lines()
+    if shown_room is None or shown_room[0] != look:
+        draw_room(state.player_pos, screen)
+        present()
+    elif shown_room[1] != lines:
+        area = status_area(shown_room[1]).union(status_area(lines))
+        screen.set_clip(area)  # Blits outside the status area are skipped
+        draw_room(state.player_pos, screen)
+        screen.set_clip(None)
+        present([area])
+    else:
+        present([])
+    shown_room = (look, lines)
+
+def check_room(pos):
+    """
+    Check current room for hazards/items (rules in engine.check_room)
+    and show the player what happened
+    Returns True if anything happened
+    """
+    events = game.check_room(state)
+    observe_turn(events)
+    for event in events:
+        if event in engine.GAME_OVER_EVENTS:  # Death conditions
+            game_over(engine.MESSAGES[event])
+            break
+        if event == engine.BATS:
+            # Keep the bats on screen for a moment before teleporting
+            overlays.add(BAT_TIME, still_frame(screen.copy()))
+        # Bat teleport and arrow/rock pickups
+        show_message(engine.MESSAGES[event])
+    return bool(events)  # The room has to be drawn again after a message
+
+def observe_turn(events):
+    """Tell the hint advisor what the player saw after their last action"""
+    global pending_turn
+    if pending_turn is None and not events and advisor.state is state:
+        return  # Nothing new since the last look
+    action, direction, action_events = pending_turn or (None, None, [])
+    pending_turn = None
+    advisor.observe(game, state, action, direction, action_events + events)
+
+# Names used when the advisor's hint is shown
+HINT_ACTIONS = {engine.MOVE: "Move", engine.SHOOT: "Shoot an arrow", engine.THROW: "Throw a rock"}
+DIRECTION_NAMES = {UP: "up", DOWN: "down", LEFT: "left", RIGHT: "right"}
+
+def show_hint():
+    """Show what the AI advisor would do in the player's place"""
+    action, direction = advisor.hint(game, state)
+    show_message(f"Hint: {HINT_ACTIONS[action]} {DIRECTION_NAMES[direction]}")
+
+def still_frame(frame):
+    """Overlay draw function showing a copy of an earlier screen"""
+    def draw(surface, progress):
+        surface.blit(frame, (0, 0))
+    return draw
+
+def show_message(msg):
+    """Queue a message centered on a black screen for MESSAGE_TIME seconds"""
+    def draw(surface, progress):
+        surface.fill(BLACK)  # Clear screen with black background
+        # Render the message text in green (RGB: 0,255,64)
+        text = render_text(msg, (0, 255, 64))
+        # Center the text on screen
+        text_rect = text.get_rect(center=surface.get_rect().center)
+        surface.blit(text, text_rect)  # Draw text to screen
+    overlays.add(MESSAGE_TIME, draw)
+
+def shoot_arrow(direction):
+    """Handle arrow shooting (rules in engine.shoot_arrow, counted as a turn)"""
+    global pending_turn
+    events = game.act(state, engine.SHOOT, direction)
+    pending_turn = (engine.SHOOT, direction, events)
+
+    # Check if player had arrows
+    if events[0] == engine.NO_ARROWS:
+        show_message(engine.MESSAGES[engine.NO_ARROWS])
+        return
+
+    # Animate the arrow's flight
+    animate_projectile(arrow_img, direction)
+
+    for event in events:
+        if event == engine.KILLED_WUMPUS:
+            game_over(engine.MESSAGES[event])
+        elif event == engine.ARROW_MISSED:
+            print(engine.MESSAGES[event])
+        else:  # Special warning when out of arrows
+            show_message(engine.MESSAGES[event])
+
+def throw_rock(direction):
+    """Handle rock throwing for scouting (rules in engine.throw_rock, counted as a turn)"""
+    global pending_turn
+    events = game.act(state, engine.THROW, direction)
+    pending_turn = (engine.THROW, direction, events)
+
+    # Animate the throw if the player had a rock
+    if events[0] != engine.NO_ROCKS:
+        animate_projectile(rock_img, direction)
+    messages = [engine.MESSAGES[event] for event in events]  # Stores feedback messages
+
+    # Queue all messages on one screen
+    def draw(surface, progress):
+        surface.fill(BLACK)
+        y = layout.y(100)  # Starting y-position for first message
+        for msg in messages:
+            text = render_text(msg, (255, 255, 255))  # White text
+            surface.blit(text, (layout.cx - text.get_width()//2, y))
+            y += layout.px(50)  # Move down for next message
+    overlays.add(MESSAGE_TIME, draw)
+
+def game_over(message):
+    """Display game over screen with options to retry, menu or quit"""
+    finish_overlays()  # Let the last arrow/message play out first
+    delete_saved_game()  # A finished game can't be continued
+    while True:  # Stay in game over loop until player chooses
+        screen.fill(RED)  # Red background for game over
+        
+        # Render game over message and options
+        text = render_text(message, (0, 255, 64))
+        retry = render_text("Press [R] to Retry", (255, 255, 255))
+        menu = render_text("Press [M] for Main Menu", (255, 255, 255))
+        exit_msg = render_text("Press [Q] to Quit", (255, 255, 255))
+
+        # Position and draw all text elements
+        screen.blit(text, text.get_rect(center=(layout.cx, layout.y(200))))
+        screen.blit(retry, (layout.cx - retry.get_width()//2, layout.y(300)))
+        screen.blit(menu, (layout.cx - menu.get_width()//2, layout.y(350)))
+        screen.blit(exit_msg, (layout.cx - exit_msg.get_width()//2, layout.y(400)))
+        present()
+
+        # Handle player input
+        for event in wait_for_input():
+            if event.type == pygame.QUIT: 
+                exit_game()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r:  # Retry
+                    reset_game()
+                    return
+                elif event.key == pygame.K_m:  # Main menu
+                    if not main_menu():
+                        reset_game()
+                    return
+                elif event.key == pygame.K_q:  # Quit
+                    exit_game()
+
+def animate_projectile(image, direction, color=(0, 0, 0)):
+    """
+    Queue a projectile (arrow/rock) flying in a straight line from center
+    Args:
+        image: pygame.Surface - The image to animate
+        direction: int - Direction constant (UP/DOWN/LEFT/RIGHT)
+        color: tuple - Background color during animation (default black)
+    """
+    # Set direction vector based on input direction
+    if direction == UP:
+        dx, dy = 0, -1  # Move upward
+    elif direction == DOWN:
+        dx, dy = 0, 1   # Move downward
+    elif direction == LEFT:
+        dx, dy = -1, 0  # Move left
+    elif direction == RIGHT:
+        dx, dy = 1, 0   # Move right
+    last = []  # (surface size, rect) of the previous frame
+
+    def draw(surface, progress):
+        # Tween from screen center to the end of the flight (layout.flight pixels)
+        x = layout.cx + dx * layout.flight * progress
+        y = layout.cy + dy * layout.flight * progress
+        rect = image.get_rect(center=(round(x), round(y)))
+        if not last or last[0] != surface.get_size():
+            draw_room(state.player_pos, surface)  # First frame (or resized): the whole room
+            changed = None
+        else:
+            # Only put the room back where the projectile was
+            old = last[1]
+            surface.set_clip(old)
+            draw_room(state.player_pos, surface)
+            surface.set_clip(None)
+            changed = [old, rect]
+        # Draw projectile centered at new position
+        surface.blit(image, rect)
+        last[:] = [surface.get_size(), rect]
+        return changed  # Only the old and new projectile boxes have to be pushed
+    overlays.add(PROJECTILE_TIME, draw, animated=True)
+
+# Global keybind configuration dictionary
+# Maps action names to pygame key constants (defaults in config.py, shared with terminal.py)
+keybinds = dict(DEFAULT_KEYBINDS)
+
+class Player:
+    """Player character class handling position and rendering"""
+    def __init__(self):
+        # Start at center of screen
+        self.x = SCREEN_WIDTH // 2
+        self.y = SCREEN_HEIGHT // 2
+        self.speed = 5        # Movement speed in pixels
+        self.color = (255, 200, 0)  # Yellow-orange color
+        self.size = 30        # Square side length
+
+    def move(self, dx, dy):
+        """Move player by dx,dy units while keeping within screen bounds"""
+        self.x += dx * self.speed
+        self.y += dy * self.speed
+        # Clamp position to stay on screen
+        self.x = max(0, min(self.x, SCREEN_WIDTH - self.size))
+        self.y = max(0, min(self.y, SCREEN_HEIGHT - self.size))
+
+    def draw(self, surface):
+        """Draw player as colored square on given surface"""
+        pygame.draw.rect(surface, self.color, (self.x, self.y, self.size, self.size))
+
+# Create player instance
+player = Player()
+
+def main_menu():
+    """
+    Display main menu screen and handle navigation
+    Returns True if the player continued a saved game
+    """
+    while True:
+        screen.fill(BLACK)  # Clear screen
+        
+        # Render menu text options
+        title = render_text("Hunt the Wumpus", (255, 255, 255))
+        resume = render_text("Press [C] to Continue", (0, 255, 0)) if os.path.exists(SAVE_FILE) else None
+        start = render_text("Press [S] to Start", (0, 255, 0))  # Green
+        setting = render_text("Press [`] for Settings", (0, 0, 255))  # Blue
+        quit_game = render_text("Press [Q] to Quit", (255, 0, 0))  # Red
+
+        # Position and draw all text elements
+        screen.blit(title, (layout.cx - title.get_width()//2, layout.y(150)))
+        if resume:  # Only when a game was saved on quitting
+            screen.blit(resume, (layout.cx - resume.get_width()//2, layout.y(200)))
+        screen.blit(start, (layout.cx - start.get_width()//2, layout.y(250)))
+        screen.blit(setting, (layout.cx - setting.get_width()//2, layout.y(300)))
+        screen.blit(quit_game, (layout.cx - quit_game.get_width()//2, layout.y(350)))
+
+        present()
+
+        # Event handling loop
+        for event in wait_for_input():
+            if event.type == pygame.QUIT:
+                exit_game()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_s:  # Start game
+                    return False
+                elif event.key == pygame.K_c and continue_game():  # Continue saved game
+                    return True
+                elif event.key == pygame.K_q:  # Quit
+                    exit_game()
+                elif event.key == pygame.K_BACKQUOTE:  # Settings
+                    settings_menu()
+                elif event.key == pygame.K_d:  # Difficulty
+                    difficulty_menu()
+
+def settings_menu():
+    """Key rebinding configuration menu"""
+    global keybinds
+    selected_action = None  # Currently selected action to rebind
+    message = ""  # Status message to display
+
+    while True:
+        screen.fill((30, 30, 30))  # Dark gray background
+        title = render_text("Settings - Keybinds", (255, 255, 255))
+        screen.blit(title, (layout.x(200), layout.y(50)))
+
+        # Display all keybindings
+        y = layout.y(150)
+        for idx, (action, key) in enumerate(keybinds.items(), start=1):
+            # Format action text with current key
+            action_text = f"[{idx}] {action.replace('_', ' ').title()}: {pygame.key.name(key)}"
+            # Highlight selected action
+            color = (255, 255, 0) if selected_action == action else (255, 255, 255)
+            text_surface = render_text(action_text, color)
+            screen.blit(text_surface, (layout.x(200), y))
+            y += layout.px(50)
+
+        # Help instructions
+        instructions = render_text(
+            "Press 1-8 to rebind keys. Press [D] for difficulty. ESC to go back.", 
+            (150, 150, 150))
+        screen.blit(instructions, (layout.x(100), layout.y(560)))
+
+        # Display status message if exists
+        if message:
+            msg_surface = render_text(message, (0, 255, 0))
+            screen.blit(msg_surface, (layout.x(100), layout.y(610)))
+
+        present()
+
+        # Handle input events
+        for event in wait_for_input():
+            if event.type == pygame.QUIT:
+                exit_game()
+            elif event.type == pygame.KEYDOWN:
+                if selected_action:  # If waiting for new key
+                    keybinds[selected_action] = event.key  # Update binding
+                    save_settings()
+                    message = f"{selected_action.replace('_', ' ').title()} set to {pygame.key.name(event.key)}"
+                    selected_action = None
+                elif event.key == pygame.K_ESCAPE:  # Return to previous menu
+                    return
+                # Number keys select actions 1-8
+                elif event.key == pygame.K_1:
+                    selected_action = "move_up"
+                elif event.key == pygame.K_2:
+                    selected_action = "move_down"
+                elif event.key == pygame.K_3:
+                    selected_action = "move_left"
+                elif event.key == pygame.K_4:
+                    selected_action = "move_right"
+                elif event.key == pygame.K_5:
+                    selected_action = "throw_rock"
+                elif event.key == pygame.K_6:
+                    selected_action = "shoot_arrow"
+                elif event.key == pygame.K_7:
+                    selected_action = "hint"
+                elif event.key == pygame.K_8:
+                    selected_action = "frame_stats"
+                elif event.key == pygame.K_d:  # Open difficulty menu
+                    difficulty_menu()
+
+def difficulty_menu():
+    """Menu for selecting game difficulty level"""
+    global difficulty
+    # Difficulty options (configurations live in engine.DIFFICULTIES)
+    options = list(engine.DIFFICULTIES)
+    selected = 0  # Currently selected option index
+
+    while True:
+        screen.fill((10, 10, 10))  # Very dark background
+        title = render_text("Select Difficulty", (255, 255, 255))
+        screen.blit(title, (layout.cx - title.get_width() // 2, layout.y(100)))
+
+        # Draw all difficulty options
+        for i, option in enumerate(options):
+            # Highlight selected option
+            color = (0, 255, 0) if i == selected else (255, 255, 255)
+            text = render_text(option, color)
+            screen.blit(text, (layout.cx - text.get_width() // 2, layout.y(200 + i * 60)))
+
+        # Return instructions
+        back_msg = render_text("Press ESC to return", (100, 100, 100))
+        screen.blit(back_msg, (layout.cx - back_msg.get_width() // 2, layout.y(450)))
+
+        present()
+
+        # Handle input
+        for event in wait_for_input():
+            if event.type == pygame.QUIT: 
+                exit_game()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:  # Move selection up
+                    selected = (selected - 1) % len(options)
+                elif event.key == pygame.K_DOWN:  # Move selection down
+                    selected = (selected + 1) % len(options)
+                elif event.key == pygame.K_RETURN:  # Confirm selection
+                    # Update game parameters based on difficulty
+                    difficulty = options[selected]
+                    (chosen_game or game).set_difficulty(difficulty)  # A continued game keeps its settings
+                    save_settings()
+                    return
+                elif event.key == pygame.K_ESCAPE:  # Return without changes
+                    return
+                
+def reset_game():
+    """Reset game state to initial conditions"""
+    global game, chosen_game, state, pending_turn
+    if chosen_game is not None:  # A continued game is over, back to the chosen settings
+        game, chosen_game = chosen_game, None
+    # Starting arrows/rocks and a regenerated cave layout and hazards
+    state = game.new_game()
+    pending_turn = None  # The advisor starts over with the new game
+
+# --- Saved Settings and Games ---
+
+def load_settings():
+    """Apply the keybinds and difficulty saved in the config file (read once at startup)"""
+    global difficulty
+    config = load_config()
+    keybinds.update(load_keybinds(config))
+    if config.get("difficulty") in engine.DIFFICULTIES:
+        difficulty = config["difficulty"]
+        game.set_difficulty(difficulty)
+
+def save_settings():
+    """Write the keybinds and difficulty to the config file"""
+    save_config({"keybinds": keybinds, "difficulty": difficulty})
+
+def save_game():
+    """Save the current game if it is still being played"""
+    if state.seed is None or state.result is not None:
+        return  # Nothing started yet, or the game is over
+    try:
+        save_snapshots(SAVE_FILE, game, [state])
+    except OSError as error:
+        print(f"Could not save the game: {error}")
+
+def continue_game():
+    """
+    Load the game saved on quitting, returns True if there was one to load
+    The game is played with an engine built from its own settings until the
+    next reset_game(), the chosen difficulty is kept for the games after it
+    """
+    global game, chosen_game, state, pending_turn
+    try:
+        resumed, (state,) = load_snapshots(SAVE_FILE)  # The engine comes with the game's settings
+    except (OSError, ValueError) as error:
+        print(f"Could not continue the saved game: {error}")
+        return False
+    if chosen_game is None:
+        chosen_game = game
+    game = resumed
+    pending_turn = None  # The advisor starts over from what the player sees now
+    return True
+
+def delete_saved_game():
+    """Remove the saved game (once it is over it can't be continued)"""
+    if os.path.exists(SAVE_FILE):
+        os.remove(SAVE_FILE)
+
+def exit_game():
+    """Save an unfinished game, close the window and exit"""
+    save_game()
+    pygame.quit()
+    sys.exit()
+
+def get_action_from_key(key):
+    """Look up which action is bound to the given key"""
+    for action, bound_key in keybinds.items():
+        if key == bound_key:
+            return action
+    return None  # No action bound to this key
+
+def check_pygame_events():
+    """Handle all pygame events including player input"""
+    global last_direction, pending_turn
+
+    for event in wait_for_input():
+        if event.type == pygame.QUIT:  # Window close button
+            exit_game()
+
+        if event.type == pygame.KEYDOWN:  # Key press events
+            if event.key == pygame.K_ESCAPE:  # Quit on ESC
+                exit_game()
+
+            # Check if pressed key is bound to an action
+            action = get_action_from_key(event.key)
+
+            # Movement handling
+            if action in ["move_left", "move_right", "move_up", "move_down"]:
+                # Convert action to direction constant
+                if action == "move_left": direction = LEFT
+                elif action == "move_right": direction = RIGHT
+                elif action == "move_up": direction = UP
+                elif action == "move_down": direction = DOWN
+
+                last_direction = direction  # Track facing direction
+
+                # Check for modified movement (shoot/throw)
+                if pygame.key.get_mods() & pygame.KMOD_SHIFT:  # Shift+move = shoot
+                    shoot_arrow(direction)
+                elif pygame.key.get_mods() & pygame.KMOD_CTRL:  # Ctrl+move = throw
+                    throw_rock(direction)
+                # Normal movement if exit exists in that direction
+                else:
+                    events = game.act(state, engine.MOVE, direction)  # Wumpus may move after player
+                    pending_turn = (engine.MOVE, direction, events)
+
+            # Direct action keys
+            elif action == "throw_rock":
+                direction = choose_direction("Choose direction to throw rock")
+                if direction is not None:  # If direction was selected
+                    throw_rock(direction)
+                    
+            elif action == "shoot_arrow":
+                direction = choose_direction("Choose direction to shoot arrow")
+                if direction is not None:
+                    shoot_arrow(direction)
+
+            elif action == "hint":
+                show_hint()
+
+            elif action == "frame_stats":
+                frame_profiler.toggle()
+
+            # One action per pass of the main loop, so the room the player
+            # ends up in is checked before the next key is acted on
+            if pending_turn is not None:
+                return
+
+def choose_direction(prompt):
+    """Display directional choice menu and return selection"""
+    options = ["UP", "DOWN", "LEFT", "RIGHT"]
+    directions = [UP, DOWN, LEFT, RIGHT]  # Corresponding direction constants
+    selected = 0  # Currently selected option index
+
+    while True:
+        screen.fill(BLACK)
+        # Display prompt text
+        title = render_text(prompt, (255, 255, 255))
+        screen.blit(title, (layout.cx - title.get_width()//2, layout.y(100)))
+
+        # Display all direction options
+        for i, option in enumerate(options):
+            # Highlight selected option in green
+            color = (0, 255, 0) if i == selected else (200, 200, 200)
+            text = render_text(option, color)
+            screen.blit(text, (layout.cx - text.get_width()//2, layout.y(200 + i * 50)))
+
+        present()
+
+        # Handle menu navigation
+        for event in wait_for_input():
+            if event.type == pygame.QUIT:
+                exit_game()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:  # Move selection up
+                    selected = (selected - 1) % len(options)
+                elif event.key == pygame.K_DOWN:  # Move selection down
+                    selected = (selected + 1) % len(options)
+                elif event.key == pygame.K_RETURN:  # Confirm selection
+                    return directions[selected]
+                elif event.key == pygame.K_ESCAPE:  # Cancel
+                    return None
+
+# --- Game Start ---
+
+def main():
+    """Read the profiling/telemetry options and play, saving the profile/trace/events when the game exits"""
+    parser = argparse.ArgumentParser(description="Hunt the Wumpus")
+    parser.add_argument("--stats", action="store_true", help="start with the frame stats overlay shown (F3)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="run under cProfile and save the stats (snakeviz, flameprof, python -m pstats)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="save the timed frame phases as a Chrome trace (speedscope, Perfetto)")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.stats or SHOW_FRAME_STATS:
+        frame_profiler.toggle()
+    if args.trace:
+        frame_profiler.start_trace()
+    profile = None
+    if args.profile:
+        import cProfile  # Only loaded when asked for
+        profile = cProfile.Profile()
+        profile.enable()
+    recorder = telemetry.from_args(args)
+    try:
+        play()
+    finally:  # Quitting the game raises SystemExit
+        if recorder is not None:
+            recorder.close()
+            print(recorder.summary())
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(args.profile)
+            print(f"Profile saved to {args.profile}")
+        if args.trace:
+            frame_profiler.save_trace(args.trace)
+            print(f"Trace saved to {args.trace}")
+
+def play():
+    """Show the instructions, open the window and run the game"""
+    # Display game instructions and wait for player to start
+    print_instructoions()
+    input("Press <ENTER> to begin.")
+
+    init_display()
+    load_settings()  # Keybinds and difficulty from the last run
+    if not main_menu():  # Show main menu first
+        reset_game()  # Initialize game state (unless a saved game was continued)
+
+    # Main game loop - the room is only redrawn after input or a state change
+    while True:
+        if update_overlays():  # Messages and animations play without blocking
+            continue
+        show_room()  # Render current room (only what changed) and update display
+        if check_room(state.player_pos):  # Check for hazards/items in current room
+            continue  # A message covered the room, draw it again
+        check_pygame_events()  # Wait for and handle input
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,359 @@
+# Belief-state AI player for Hunt the Wumpus
+# The agent only uses what a human player is told: the room it is in, the
+# red floor / squeaking / draft percepts and the messages (events) after
+# each action. From those it keeps
+#   - occupancy masks of rooms known to be free of pits / bats and the
+#     "at least one of these rooms" hints from drafts and squeaking, turned
+#     into per-room odds by counting every placement that fits the hints
+#   - a probability for every room of holding the Wumpus, moved forward
+#     with the Wumpus movement rules after each step and filtered by the
+#     red floor percept
+# and picks the action that looks best: shoot when the Wumpus is probably
+# next door, throw a rock to make sure, otherwise walk to the safest room
+# (preferring new rooms and rooms towards where the Wumpus probably is).
+#
+# It works as a policy for Engine.play / run_games and drives the in-game
+# hint key. Usage: python agent.py [games]
+import math        # Counting hazard placements
+import sys         # For command line arguments
+import time        # For timing decisions
+
+import engine
+from engine import (DIRECTIONS, MOVE, SHOOT, THROW, BATS, BLOCKED, ARROW_MISSED,
+                    ROCK_WUMPUS, ROCK_BATS, ROCK_PIT, ROCK_EMPTY, rooms_in)
+
+# Hazard odds are exact for up to this many independent hints, above that
+# each hint just spreads its odds over its rooms
+MAX_HINTS = 10
+
+# Decision settings
+SHOOT_ODDS = 0.5        # Shoot when the Wumpus is at least this likely behind an exit
+LAST_ARROW_ODDS = 0.75  # ... the same for the last arrow (a miss makes the Wumpus hunt)
+PROBE_ODDS = 0.2        # Throw a rock first when the Wumpus is at least this likely there
+PROBE_RISK = 0.15       # Throw a rock before walking into a room this dangerous
+BAT_RISK = 0.15         # How bad a bat room is (they drop you anywhere, maybe a pit)
+NEW_ROOM_BONUS = 0.1    # Preference for rooms not visited yet
+REVISIT_COST = 0.02     # Penalty per earlier visit, stops the agent pacing back and forth
+HUNT_FOCUS = 0.3        # Walk towards the Wumpus once a room is at least this likely
+HUNT_BONUS = 0.08       # Preference for exits that get closer to that room
+
+
+def count_placements(pool, count, hints):
+    """
+    Number of ways to put count hazards in different rooms of the pool mask
+    so that every hint mask gets at least one (inclusion-exclusion over the
+    hints that are missed)
+    """
+    total = 0
+    for subset in range(1 << len(hints)):
+        missed = 0
+        for i, hint in enumerate(hints):
+            if subset >> i & 1:
+                missed |= hint
+        ways = math.comb((pool & ~missed).bit_count(), count)
+        total += -ways if subset.bit_count() & 1 else ways
+    return total
+
+
+def hazard_odds(num_rooms, count, free, sure, hints):
+    """
+    Chance of each room holding one of count hazards
+    Args:
+        num_rooms: rooms in the cave
+        count: number of hazards placed in different rooms
+        free: mask of rooms known not to hold one
+        sure: mask of rooms known to hold one
+        hints: masks that each hold at least one hazard
+    Returns a list of odds indexed by room
+    """
+    odds = [0.0] * (num_rooms + 1)
+    for room in rooms_in(sure):
+        odds[room] = 1.0
+    pool = ((1 << (num_rooms + 1)) - 2) & ~free & ~sure  # Rooms still undecided
+    left = count - sure.bit_count()                       # Hazards not found yet
+    if left <= 0 or not pool:
+        return odds
+    left = min(left, pool.bit_count())
+
+    # Hints already explained by a known hazard say nothing more, and a hint
+    # that contains a smaller one is always satisfied with it
+    hints = {hint & pool for hint in hints if not hint & sure}
+    hints = [hint for hint in hints if not any(other != hint and other & hint == other for other in hints)]
+
+    total = count_placements(pool, left, hints) if len(hints) <= MAX_HINTS else 0
+    if total > 0:
+        # Share of the placements that use each room
+        for room in rooms_in(pool):
+            bit = 1 << room
+            odds[room] = count_placements(pool & ~bit, left - 1,
+                                          [hint for hint in hints if not hint & bit]) / total
+        return odds
+
+    # Too many hints (or none fit, e.g. after bats moved): spread the
+    # hazards evenly and give each hint at least one of them
+    base = left / pool.bit_count()
+    for room in rooms_in(pool):
+        odds[room] = base
+    for hint in hints:
+        rooms = rooms_in(hint)
+        for room in rooms:
+            odds[room] = max(odds[room], 1 / len(rooms))
+    return odds
+
+
+class Agent:
+    """
+    Policy that plays from the player's point of view
+    Call it like any policy (agent(engine, state) -> (action, direction));
+    observe() must see the events after every action, Engine.play does that
+    """
+    def __init__(self):
+        self.state = None  # Game the beliefs belong to
+
+    def reset(self, game, state):
+        """Start over with no knowledge for a new game"""
+        self.state = state
+        self.num_rooms = game.num_rooms
+        self.all_rooms = (1 << (self.num_rooms + 1)) - 2  # Mask of every room
+        self.room = state.player_pos
+        self.visits = [0] * (self.num_rooms + 1)
+        self.pit_free = self.pit_sure = 0
+        self.pit_hints = set()
+        self.bat_free = self.bat_sure = 0
+        self.bat_hints = set()
+        self.odds = {}  # (hazard count, free, sure, hints) -> odds, for the current knowledge
+        # The Wumpus starts anywhere but the player's room
+        self.wumpus = self.spread(1 << self.room)
+
+    def spread(self, excluded):
+        """Uniform Wumpus odds over every room outside the excluded mask"""
+        rooms = [room for room in range(1, self.num_rooms + 1) if not excluded >> room & 1]
+        wumpus = [0.0] * (self.num_rooms + 1)
+        for room in rooms:
+            wumpus[room] = 1 / len(rooms)
+        return wumpus
+
+    def around(self, game, room):
+        """Occupancy mask of the rooms next to room"""
+        if game.neighbor_masks is not None:
+            return game.neighbor_masks[room]
+        mask = 0
+        for next_room in game.cave[room]:
+            if next_room:
+                mask |= 1 << next_room
+        return mask
+
+    # --- Beliefs ---
+
+    def observe(self, game, state, action, direction, events):
+        """
+        Update the beliefs after an action
+        Args:
+            game: the Engine being played
+            state: the GameState (only its visible parts are used)
+            action, direction: what was done (None for the start of the game)
+            events: every event code the action and check_room produced
+        """
+        if state is not self.state:
+            self.reset(game, state)
+        if state.result is not None:
+            return
+        before = self.room
+
+        if action == MOVE and BLOCKED not in events:
+            target = game.cave[before][direction]
+            # The Wumpus hunts when the player had no arrows as they walked in
+            arrows = state.num_arrows - events.count(engine.FOUND_ARROW)
+            self.move_wumpus(game, target, arrows == 0)
+            if BATS in events:
+                # Still alive in the bat room, then carried off
+                self.pit_free |= 1 << target
+                self.wumpus[target] = 0.0
+                self.normalize(self.all_rooms & ~(1 << target | 1 << state.player_pos))
+        elif action == SHOOT and ARROW_MISSED in events:
+            self.wumpus = self.spread(1 << before)  # The Wumpus ran off somewhere
+        elif action == THROW and events[0] != engine.NO_ROCKS:
+            target = game.cave[before][direction]
+            self.rock_landed(target, events[0])
+
+        if BATS in events:
+            # A bat colony moved, what we knew about bats is out of date
+            self.bat_free = self.bat_sure = 0
+            self.bat_hints.clear()
+
+        # What the current room tells us
+        room = self.room = state.player_pos
+        here = 1 << room
+        self.visits[room] += 1
+        self.pit_free |= here
+        self.bat_free |= here
+        self.bat_sure &= ~here
+        nearby = self.around(game, room)
+        if game.pit_nearby(state):
+            self.pit_hints.add(nearby)
+        else:
+            self.pit_free |= nearby
+        if game.bats_nearby(state):
+            self.bat_hints.add(nearby)
+        else:
+            self.bat_free |= nearby
+        self.sense_wumpus(room, nearby, game.wumpus_nearby(state))
+
+    def rock_landed(self, target, event):
+        """Learn from where a rock landed"""
+        if event == ROCK_WUMPUS:
+            self.wumpus = [0.0] * (self.num_rooms + 1)
+            self.wumpus[target] = 1.0
+            return
+        bit = 1 << target
+        self.wumpus[target] = 0.0
+        self.normalize(self.all_rooms & ~(bit | 1 << self.room))
+        if event == ROCK_BATS:
+            self.bat_sure |= bit
+        elif event == ROCK_PIT:
+            self.pit_sure |= bit
+            self.bat_free |= bit
+        elif event == ROCK_EMPTY:
+            self.pit_free |= bit
+            self.bat_free |= bit
+
+    def move_wumpus(self, game, target, hunting):
+        """Move the Wumpus odds forward one player move (player walked into target)"""
+        old = self.wumpus
+        new = [0.0] * (self.num_rooms + 1)
+        hazards = self.pit_sure | self.bat_sure  # The Wumpus never steps into a known pit or bat room
+        if hunting:
+            # Straight along a shortest path towards the player, or the
+            # closest safe room when a hazard blocks it (as Engine.move_wumpus)
+            distances = game.distances
+            for room, chance in enumerate(old):
+                if not chance:
+                    continue
+                hop = distances.next_hop(room, target)
+                if hop != target and (not hop or hazards >> hop & 1):
+                    safe = [next_room for next_room in game.cave[room]
+                            if next_room and not hazards >> next_room & 1]
+                    hop = min(safe, key=lambda next_room: distances.distance(next_room, target),
+                              default=room)
+                new[hop] += chance
+        else:
+            move = game.wumpus_move_chance / 100 if game.mobile_wumpus else 0.0
+            for room, chance in enumerate(old):
+                if not chance:
+                    continue
+                exits = [next_room for next_room in game.cave[room]
+                         if next_room and next_room != target and not hazards >> next_room & 1]
+                if not exits or not move:
+                    new[room] += chance
+                    continue
+                new[room] += chance * (1 - move)
+                share = chance * move / len(exits)
+                for next_room in exits:
+                    new[next_room] += share
+        self.wumpus = new
+
+    def sense_wumpus(self, room, nearby, red):
+        """Keep only the Wumpus rooms that fit the red floor percept"""
+        wumpus = self.wumpus
+        wumpus[room] = 0.0
+        for other in range(1, self.num_rooms + 1):
+            if wumpus[other] and bool(nearby >> other & 1) != red:
+                wumpus[other] = 0.0
+        self.normalize(nearby if red else self.all_rooms & ~(nearby | 1 << room))
+
+    def normalize(self, allowed):
+        """
+        Rescale the Wumpus odds to 1
+        If nothing is left our model of the Wumpus went wrong (e.g. it walked
+        around a hazard we didn't know about), so start over with every room
+        in the allowed mask equally likely
+        """
+        total = sum(self.wumpus)
+        if total > 0:
+            self.wumpus = [chance / total for chance in self.wumpus]
+        else:
+            self.wumpus = self.spread(self.all_rooms & ~allowed)
+
+    def hazard_odds(self, game):
+        """(pit odds, bat odds) per room, recomputed only after new information"""
+        cache = {}
+        results = []
+        for key in ((game.num_pits, self.pit_free, self.pit_sure, frozenset(self.pit_hints)),
+                    (game.num_bats, self.bat_free, self.bat_sure, frozenset(self.bat_hints))):
+            odds = self.odds.get(key)
+            if odds is None:
+                odds = hazard_odds(self.num_rooms, *key)
+            cache[key] = odds
+            results.append(odds)
+        self.odds = cache  # Only what we know now is worth keeping
+        return results
+
+    # --- Decisions ---
+
+    def __call__(self, game, state):
+        """Pick (action, direction) for the current turn"""
+        if state is not self.state:
+            self.observe(game, state, None, None, [])
+        room = state.player_pos
+        exits = game.cave[room]
+        directions = [d for d in DIRECTIONS if exits[d]]
+        wumpus = self.wumpus
+
+        # Shoot (or scout with a rock) when the Wumpus is probably next door
+        if state.num_arrows:
+            best = max(directions, key=lambda d: wumpus[exits[d]])
+            chance = wumpus[exits[best]]
+            if chance >= (SHOOT_ODDS if state.num_arrows > 1 else LAST_ARROW_ODDS):
+                return SHOOT, best
+            if state.num_rocks and chance >= PROBE_ODDS:
+                return THROW, best
+
+        # Otherwise walk to the exit with the best mix of safety and progress
+        pits, bats = self.hazard_odds(game)
+        hunting = state.num_arrows == 0
+        move = game.wumpus_move_chance / 100 if game.mobile_wumpus else 0.0
+        target = max(range(1, self.num_rooms + 1), key=wumpus.__getitem__)
+        chase = state.num_arrows and wumpus[target] >= HUNT_FOCUS
+        distance = game.distances.distance
+        best = None
+        best_score = best_risk = 0.0
+        for d in directions:
+            next_room = exits[d]
+            if hunting:
+                # A hunting Wumpus next to that room walks straight in
+                risk = wumpus[next_room] + sum(wumpus[other] for other in rooms_in(self.around(game, next_room)))
+            else:
+                risk = wumpus[next_room] * (1 - move)  # It may step out as we walk in
+            risk = min(1.0, risk + pits[next_room]) + BAT_RISK * bats[next_room]
+            score = -risk - REVISIT_COST * self.visits[next_room]
+            if not self.visits[next_room]:
+                score += NEW_ROOM_BONUS
+            if chase and next_room != target and distance(next_room, target) < distance(room, target):
+                score += HUNT_BONUS
+            if best is None or score > best_score:
+                best, best_score, best_risk = d, score, risk
+
+        # Check a dangerous room with a rock before walking in, unless its
+        # hazard is already certain and a rock would only say so again
+        known = (self.bat_sure | self.pit_sure) >> exits[best] & 1
+        if best_risk >= PROBE_RISK and state.num_rocks and not known:
+            return THROW, best
+        return MOVE, best
+
+    def hint(self, game, state):
+        """Advice for the human player as (action, direction)"""
+        return self(game, state)
+
+
+if __name__ == "__main__":
+    # Compare the agent with the random baseline on every difficulty preset
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for name in engine.DIFFICULTIES:
+        game = engine.Engine.from_difficulty(name)
+        baseline = game.run_games(num_games, seed=0)
+        start = time.perf_counter()
+        stats = game.run_games(num_games, policy=Agent(), seed=0)
+        elapsed = time.perf_counter() - start
+        print(f"{name:6} agent win {stats['win_rate']:.1%} (random {baseline['win_rate']:.1%})  "
+              f"eaten {stats['eaten']}  fell {stats['fell']}  timeouts {stats['timeouts']}  "
+              f"{elapsed / max(1, num_games * stats['avg_turns']) * 1e6:.0f} us/turn")
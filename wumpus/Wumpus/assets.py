@@ -0,0 +1,136 @@
+# Sprite loading for the Pygame front end
+# Images are decoded once, converted to the display's pixel format (so
+# blits don't convert every frame), scaled for the current resolution and
+# memoized. Decoded pixels can also be kept in one packed cache file so a
+# cold start reads a single file instead of decoding every PNG.
+#
+# Cache file layout (little endian):
+#   header: b"WAST", version (u8), image count (u32)
+#   then per image: name length (u16), name (UTF-8), file mtime (f64),
+#                   width, height (u32 each), width * height * 4 RGBA bytes
+# Only plain bytes are read back, and a file that doesn't match the layout
+# exactly is ignored, so the images are decoded from the PNGs again.
+import os          # For building paths to the image folder
+import struct      # For the packed asset cache file
+
+import pygame      # Image loading, conversion and scaling
+
+# Folder holding the game images (next to the folder this file is in)
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "images")
+
+# Cache file layout, bump the version when it changes so old files are ignored
+CACHE_MAGIC = b"WAST"
+CACHE_VERSION = 2
+CACHE_HEADER = struct.Struct("<4sBI")
+ENTRY_NAME = struct.Struct("<H")
+ENTRY_IMAGE = struct.Struct("<dII")
+
+
+def read_cache(data):
+    """
+    Images of a packed cache file as {name: (mtime, width, height, RGBA bytes)}
+    Raises ValueError if data doesn't follow the cache layout
+    """
+    if len(data) < CACHE_HEADER.size:
+        raise ValueError("cache file cut short")
+    magic, version, count = CACHE_HEADER.unpack_from(data, 0)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION:
+        raise ValueError(f"not a version {CACHE_VERSION} asset cache")
+    images = {}
+    offset = CACHE_HEADER.size
+    for _ in range(count):
+        if offset + ENTRY_NAME.size > len(data):
+            raise ValueError("cache file cut short")
+        (length,) = ENTRY_NAME.unpack_from(data, offset)
+        offset += ENTRY_NAME.size
+        name = data[offset:offset + length]
+        offset += length
+        if len(name) != length or offset + ENTRY_IMAGE.size > len(data):
+            raise ValueError("cache file cut short")
+        name = name.decode("utf-8")  # UnicodeDecodeError is a ValueError too
+        mtime, width, height = ENTRY_IMAGE.unpack_from(data, offset)
+        offset += ENTRY_IMAGE.size
+        size = width * height * 4
+        pixels = data[offset:offset + size]
+        offset += size
+        if not width or not height or len(pixels) != size:
+            raise ValueError(f"bad image {name!r} in cache file")
+        images[name] = (mtime, width, height, pixels)
+    if offset != len(data):
+        raise ValueError("trailing bytes after the cached images")
+    return images
+
+
+class AssetManager:
+    """
+    Loads, converts, scales and memoizes sprite images
+    Args:
+        image_dir: folder the image files are loaded from
+        scale: size multiplier for the current resolution (1.0 = original size)
+        cache_path: packed cache file to read/write decoded images (None = no cache)
+    """
+    def __init__(self, image_dir=IMAGE_DIR, scale=1.0, cache_path=None):
+        self.image_dir = image_dir
+        self.scale = scale
+        self.cache_path = cache_path
+        self.raw = {}       # name -> (file mtime, width, height, RGBA bytes) decoded pixels
+        self.images = {}    # (name, scale) -> converted, scaled Surface
+        self.dirty = False  # True when raw has entries the cache file doesn't
+        if cache_path:
+            self.load_cache()
+
+    def image(self, name):
+        """Converted sprite scaled for the current resolution (memoized)"""
+        key = (name, self.scale)
+        surface = self.images.get(key)
+        if surface is None:
+            width, height, pixels = self.decode(name)
+            surface = pygame.image.frombytes(pixels, (width, height), "RGBA").convert_alpha()
+            if self.scale != 1.0:
+                size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+                surface = pygame.transform.smoothscale(surface, size)
+            surface = self.images[key] = surface
+        return surface
+
+    def set_scale(self, scale):
+        """Change the resolution scale, sprites are rescaled on next use"""
+        self.scale = scale
+        # Sprites of other scales are dropped so resizing the window doesn't pile them up
+        self.images = {key: surface for key, surface in self.images.items() if key[1] == scale}
+
+    def decode(self, name):
+        """Decoded RGBA pixels of an image file, from the packed cache if possible"""
+        entry = self.raw.get(name)
+        path = os.path.join(self.image_dir, name)
+        mtime = os.path.getmtime(path)
+        if entry is None or entry[0] != mtime:  # Missing or the file changed
+            surface = pygame.image.load(path)
+            entry = (mtime, surface.get_width(), surface.get_height(),
+                     pygame.image.tobytes(surface, "RGBA"))
+            self.raw[name] = entry
+            self.dirty = True
+        return entry[1:]
+
+    def load_cache(self):
+        """Read every decoded image from the packed cache file in one go"""
+        try:
+            with open(self.cache_path, "rb") as f:
+                self.raw = read_cache(f.read())
+        except (OSError, ValueError):
+            self.raw = {}  # No usable cache, images are decoded on first use and the file rewritten
+
+    def save_cache(self):
+        """Write all decoded images to the packed cache file (if anything changed)"""
+        if not self.cache_path or not self.dirty:
+            return
+        parts = [CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(self.raw))]
+        for name, (mtime, width, height, pixels) in self.raw.items():
+            encoded = name.encode("utf-8")
+            parts += [ENTRY_NAME.pack(len(encoded)), encoded,
+                      ENTRY_IMAGE.pack(mtime, width, height), pixels]
+        try:
+            with open(self.cache_path, "wb") as f:
+                f.write(b"".join(parts))
+            self.dirty = False
+        except OSError:
+            pass  # A read-only install just keeps decoding the PNGs
@@ -0,0 +1,371 @@
+# Vectorized batch simulator for Hunt the Wumpus
+# Holds N games as NumPy arrays and advances all of them in lock-step,
+# following exactly the same rules as engine.Engine (which plays one game
+# at a time). Used for win-rate curves over millions of games.
+import sys         # For command line arguments
+import time        # For timing simulation runs
+
+import numpy as np  # Array maths for running many games at once
+
+import engine      # Rules, constants and the classic cave layout
+from distances import DistanceTable, UNREACHABLE  # Shortest paths for the hunting Wumpus
+from engine import (MOVE, SHOOT, THROW, EATEN, FELL, KILLED_WUMPUS,
+                    ROCK_WUMPUS, ROCK_BATS, ROCK_PIT, ROCK_EMPTY)
+
+# Result code for games stopped by the turn limit (0 means still playing)
+TIMED_OUT = -1
+
+# Rooms are stored as bits of a uint64 mask per game
+MAX_ROOMS = 63
+ONE = np.uint64(1)
+
+
+def cave_array(cave):
+    """
+    Convert a cave dict into an (rooms + 1) x 4 int array of exits
+    Row 0 is all zeros so room numbers can index the array directly
+    """
+    exits = np.zeros((len(cave) + 1, 4), dtype=np.int64)
+    for room, room_exits in cave.items():
+        exits[room] = room_exits
+    return exits
+
+
+def room_bits(rooms):
+    """Bitmask with the bit of every room in the int array set"""
+    return ONE << rooms.astype(np.uint64)
+
+
+class BatchState:
+    """
+    State of N games stored column-wise (one array per game variable)
+    Pits, arrows and rocks are room bitmasks, bats also keep one room per
+    colony because two colonies can end up sharing a room after a teleport
+    """
+    __slots__ = ("player", "wumpus", "num_arrows", "num_rocks",
+                 "bats", "bat_mask", "pit_mask", "arrow_mask", "rock_mask",
+                 "turns", "result", "rock_result", "carried")
+
+    def __init__(self, n, num_bats):
+        self.player = np.zeros(n, dtype=np.int64)                    # Player room per game
+        self.wumpus = np.zeros(n, dtype=np.int64)                    # Wumpus room per game
+        self.num_arrows = np.full(n, engine.START_ARROWS, dtype=np.int32)
+        self.num_rocks = np.full(n, engine.START_ROCKS, dtype=np.int32)
+        self.bats = np.zeros((n, num_bats), dtype=np.int64)          # Room of each bat colony
+        self.bat_mask = np.zeros(n, dtype=np.uint64)                 # Rooms with bats
+        self.pit_mask = np.zeros(n, dtype=np.uint64)                 # Rooms with pits
+        self.arrow_mask = np.zeros(n, dtype=np.uint64)               # Rooms with arrow pickups
+        self.rock_mask = np.zeros(n, dtype=np.uint64)                # Rooms with rock pickups
+        self.turns = np.zeros(n, dtype=np.int32)                     # Actions taken so far
+        self.result = np.zeros(n, dtype=np.int8)                     # Game over event (0 = playing)
+        self.rock_result = np.zeros(n, dtype=np.int8)                # Outcome of the rock thrown this step
+        self.carried = np.zeros(n, dtype=bool)                       # Bats carried the player this step
+
+    def __len__(self):
+        return len(self.player)
+
+    def take(self, mask):
+        """Keep only the games selected by a boolean mask (in place)"""
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name)[mask])
+
+    def put(self, rows, other):
+        """Overwrite the games at the row indexes with the games of another BatchState"""
+        for name in self.__slots__:
+            getattr(self, name)[rows] = getattr(other, name)
+
+
+class BatchEngine:
+    """
+    Applies the engine.Engine rules to a BatchState, all games at once
+    Args:
+        num_bats, num_pits, num_arrows, num_rocks: hazard/item counts per game
+        wumpus_move_chance: percentage chance the Wumpus moves each turn
+        mobile_wumpus: whether the Wumpus can move between rooms at all
+        cave: room layout in the same format as engine.cave
+        seed: seed for the NumPy random generator
+    """
+    def __init__(self, num_bats=engine.NUM_BATS, num_pits=engine.NUM_PITS,
+                 num_arrows=engine.NUM_ARROWS, num_rocks=engine.NUM_ROCKS,
+                 wumpus_move_chance=engine.WUMPUS_MOVE_CHANCE,
+                 mobile_wumpus=True, cave=engine.cave, seed=None):
+        self.num_bats = num_bats
+        self.num_pits = num_pits
+        self.num_arrows = num_arrows
+        self.num_rocks = num_rocks
+        self.wumpus_move_chance = wumpus_move_chance
+        self.mobile_wumpus = mobile_wumpus
+        if len(cave) > MAX_ROOMS:
+            raise ValueError(f"batch simulation supports at most {MAX_ROOMS} rooms, got {len(cave)}")
+        self.cave = cave_array(cave)
+        self.num_rooms = len(cave)
+        self.distance = np.array(DistanceTable(cave).dist, dtype=np.int64)
+        self.rng = np.random.default_rng(seed)
+
+        # Bitmask of the rooms next to each room
+        self.neighbor_mask = np.bitwise_or.reduce(
+            np.where(self.cave > 0, room_bits(self.cave), np.uint64(0)), axis=1)
+        # Open exit directions of each room packed to the front, for random walks
+        self.open_count = (self.cave > 0).sum(axis=1)
+        self.open_dirs = np.argsort(self.cave == 0, axis=1, kind="stable")
+
+    @classmethod
+    def from_difficulty(cls, name, **kwargs):
+        """Build a batch engine using one of the engine.DIFFICULTIES presets"""
+        bats, pits, arrows, rocks, move_chance = engine.DIFFICULTIES[name]
+        return cls(bats, pits, arrows, rocks, move_chance, **kwargs)
+
+    # --- Setup ---
+
+    def new_games(self, n):
+        """
+        Create n freshly populated games (same placement rules as populate_cave)
+        Each game deals its rooms from a partial Fisher-Yates shuffle, so there
+        are no re-rolls and the cost only depends on the number of items
+        """
+        engine.check_placement(self.num_rooms, self.num_bats, self.num_pits,
+                               self.num_arrows, self.num_rocks)
+        s = BatchState(n, self.num_bats)
+        deck = np.tile(np.arange(1, self.num_rooms + 1, dtype=np.int64), (n, 1))
+
+        # Player, wumpus, bats and pits each get their own room
+        s.player[:] = self.deal_rooms(deck, 0, 1)[:, 0]
+        s.wumpus[:] = self.deal_rooms(deck, 1, 1)[:, 0]
+        hazards = 2 + self.num_bats + self.num_pits
+        s.bats[:] = self.deal_rooms(deck, 2, self.num_bats)
+        s.bat_mask = np.bitwise_or.reduce(room_bits(s.bats), axis=1)
+        pits = self.deal_rooms(deck, 2 + self.num_bats, self.num_pits)
+        s.pit_mask = np.bitwise_or.reduce(room_bits(pits), axis=1)
+
+        # Arrows and rocks are each dealt from the rooms left after the hazards,
+        # so an arrow and a rock may share a room but never two of a kind
+        arrows = self.deal_rooms(deck, hazards, self.num_arrows)
+        s.arrow_mask = np.bitwise_or.reduce(room_bits(arrows), axis=1)
+        rocks = self.deal_rooms(deck, hazards, self.num_rocks)
+        s.rock_mask = np.bitwise_or.reduce(room_bits(rocks), axis=1)
+
+        return s
+
+    def deal_rooms(self, deck, start, count):
+        """
+        Partial Fisher-Yates shuffle of every row of deck (in place)
+        Args:
+            deck: n x rooms array, each row a permutation of the room numbers
+            start: first column to fill
+            count: how many columns to fill with random rooms from deck[:, start:]
+        Returns the n x count array of rooms dealt
+        """
+        rows = np.arange(len(deck))
+        for col in range(start, start + count):
+            pick = self.rng.integers(col, self.num_rooms, len(deck))
+            deck[rows, col], deck[rows, pick] = deck[rows, pick], deck[rows, col]
+        return deck[:, start:start + count]
+
+    def random_other_room(self, pos):
+        """Pick a uniformly random room that is not pos, for every game"""
+        room = self.rng.integers(1, self.num_rooms, len(pos))
+        return room + (room >= pos)
+
+    # --- Percepts ---
+
+    def wumpus_nearby(self, s):
+        """True for games where the Wumpus is next to the player (red floor)"""
+        return ((self.neighbor_mask[s.player] >> s.wumpus.astype(np.uint64)) & ONE).astype(bool)
+
+    def bats_nearby(self, s):
+        """True for games where bats are next to the player (squeaking)"""
+        return (self.neighbor_mask[s.player] & s.bat_mask) != 0
+
+    def pit_nearby(self, s):
+        """True for games where a pit is next to the player (draft)"""
+        return (self.neighbor_mask[s.player] & s.pit_mask) != 0
+
+    # --- Rules ---
+
+    def check_room(self, s):
+        """
+        Apply deaths, bat teleports and pickups for every running game
+        Games the bats carried off get their carried flag set
+        """
+        pending = s.result == 0
+        while pending.any():
+            here = room_bits(s.player)
+
+            # Death conditions
+            eaten = pending & (s.player == s.wumpus)
+            s.result[eaten] = EATEN
+            fell = pending & ~eaten & ((s.pit_mask & here) != 0)
+            s.result[fell] = FELL
+            pending &= ~(eaten | fell)
+
+            # Bat encounter - move one bat colony and teleport the player
+            batted = pending & ((s.bat_mask & here) != 0)
+            rows = np.flatnonzero(batted)
+            if len(rows):
+                old = s.player[rows]
+                bats = s.bats[rows]
+                cols = (bats == old[:, None]).argmax(axis=1)  # First matching colony, like list.remove
+                bats[np.arange(len(rows)), cols] = self.random_other_room(old)
+                s.bats[rows] = bats
+                s.bat_mask[rows] = np.bitwise_or.reduce(room_bits(bats), axis=1)
+                s.player[rows] = self.random_other_room(old)
+                s.carried[rows] = True
+                here[rows] = room_bits(s.player[rows])
+
+            # Arrow and rock pickups (each room holds at most one of each)
+            found = np.where(pending, s.arrow_mask & here, np.uint64(0))
+            s.arrow_mask ^= found
+            s.num_arrows += found != 0
+            found = np.where(pending, s.rock_mask & here, np.uint64(0))
+            s.rock_mask ^= found
+            s.num_rocks += found != 0
+
+            # The bats may have dropped the player somewhere dangerous
+            pending &= batted
+
+    def move_wumpus(self, s, mask):
+        """Handle Wumpus movement AI for the games selected by mask"""
+        hunting = s.num_arrows == 0
+
+        # Passive random movement mode
+        if self.mobile_wumpus:
+            rows = np.flatnonzero(mask & ~hunting)
+            rows = rows[self.rng.integers(1, 101, len(rows)) <= self.wumpus_move_chance]
+            if len(rows):
+                neighbors = self.cave[s.wumpus[rows]]
+                hazards = (s.pit_mask[rows] | s.bat_mask[rows])[:, None]
+                blocked = ((hazards >> neighbors.astype(np.uint64)) & ONE).astype(bool)
+                safe = (neighbors > 0) & (neighbors != s.player[rows, None]) & ~blocked
+                # A uniformly random safe neighbour is the first safe one after a shuffle
+                keys = self.rng.random(neighbors.shape, dtype=np.float32)
+                keys[~safe] = -1.0
+                new_room = neighbors[np.arange(len(rows)), keys.argmax(axis=1)]
+                moved = safe.any(axis=1)
+                s.wumpus[rows[moved]] = new_room[moved]
+
+        # Aggressive chase mode when player is out of arrows
+        rows = np.flatnonzero(mask & hunting)
+        if len(rows):
+            player = s.player[rows]
+            neighbors = self.cave[s.wumpus[rows]]
+            adjacent = (neighbors == player[:, None]).any(axis=1)
+            # Move directly to player if adjacent, otherwise the first safe
+            # neighbour on a shortest path (same choice as the next-hop table)
+            hazards = (s.pit_mask[rows] | s.bat_mask[rows])[:, None]
+            blocked = ((hazards >> neighbors.astype(np.uint64)) & ONE).astype(bool)
+            dist = self.distance[neighbors, player[:, None]]
+            open_rooms = (neighbors > 0) & ~blocked & (dist < UNREACHABLE)
+            dist[~open_rooms] = UNREACHABLE
+            best = neighbors[np.arange(len(rows)), dist.argmin(axis=1)]
+            new_room = np.where(adjacent, player, np.where(open_rooms.any(axis=1), best, s.wumpus[rows]))
+            s.wumpus[rows] = new_room
+
+    def step(self, s, action, direction):
+        """
+        Apply one action per game and resolve the rooms the players end up in
+        Args:
+            s: BatchState to advance (finished games are left alone)
+            action: int array of MOVE, SHOOT or THROW per game
+            direction: int array of UP, DOWN, LEFT or RIGHT per game
+        """
+        live = s.result == 0
+        s.turns += live
+        s.rock_result[:] = 0  # Only games that throw this step have a rock outcome
+        s.carried[:] = False
+        target = self.cave[s.player, direction]  # Room behind the chosen exit
+
+        # Movement (blocked exits leave the player where they are)
+        move = live & (action == MOVE) & (target > 0)
+        s.player[move] = target[move]
+        self.move_wumpus(s, move)
+
+        # Arrow shooting
+        shoot = live & (action == SHOOT) & (s.num_arrows > 0)
+        s.num_arrows -= shoot
+        hit = shoot & (s.wumpus == target)
+        s.result[hit] = KILLED_WUMPUS
+        miss = np.flatnonzero(shoot & ~hit)
+        s.wumpus[miss] = self.random_other_room(s.player[miss])  # Wumpus relocates after missed shot
+
+        # Rock throwing
+        throw = np.flatnonzero(live & (action == THROW) & (s.num_rocks > 0))
+        if len(throw):
+            s.num_rocks[throw] -= 1
+            target = target[throw]
+            bit = room_bits(target)
+            outcome = np.select([s.wumpus[throw] == target, (s.bat_mask[throw] & bit) != 0,
+                                 (s.pit_mask[throw] & bit) != 0],
+                                [ROCK_WUMPUS, ROCK_BATS, ROCK_PIT], ROCK_EMPTY)
+            s.rock_result[throw] = outcome
+
+        self.check_room(s)
+
+    # --- Batch simulation ---
+
+    def run_games(self, num_games, policy=None, max_turns=1000, chunk_size=1 << 16):
+        """
+        Play many games in chunks of chunk_size and collect summary statistics
+        Args:
+            num_games: how many games to play
+            policy: callable(batch_engine, state) -> (actions, directions), random_policy by default
+            max_turns: turn limit per game
+            chunk_size: games held in memory at once
+        Returns the same dict as engine.Engine.run_games
+        """
+        policy = policy or random_policy
+        counts = {EATEN: 0, FELL: 0, KILLED_WUMPUS: 0, TIMED_OUT: 0}
+        total_turns = 0
+        start = time.perf_counter()
+
+        remaining = num_games
+        while remaining:
+            s = self.new_games(min(chunk_size, remaining))
+            remaining -= len(s)
+            self.check_room(s)  # The starting room can already be dangerous
+            while True:
+                s.result[(s.result == 0) & (s.turns >= max_turns)] = TIMED_OUT
+                live = s.result == 0
+                # Drop finished games once they are the majority to keep arrays small
+                if not live.all() and live.sum() * 2 < len(s):
+                    for code in counts:
+                        counts[code] += np.count_nonzero(s.result == code)
+                    total_turns += int(s.turns[~live].sum())
+                    s.take(live)
+                if not len(s) or not live.any():
+                    break
+                action, direction = policy(self, s)
+                self.step(s, action, direction)
+            for code in counts:
+                counts[code] += np.count_nonzero(s.result == code)
+            total_turns += int(s.turns.sum())
+
+        elapsed = time.perf_counter() - start
+        return {
+            "games": num_games,
+            "wins": counts[KILLED_WUMPUS],
+            "eaten": counts[EATEN],
+            "fell": counts[FELL],
+            "timeouts": counts[TIMED_OUT],
+            "win_rate": counts[KILLED_WUMPUS] / num_games if num_games else 0.0,
+            "avg_turns": total_turns / num_games if num_games else 0.0,
+            "games_per_sec": num_games / elapsed if elapsed > 0 else float("inf"),
+        }
+
+
+def random_policy(batch, s):
+    """Vectorized engine.random_policy: random open exit, shoot when the floor is red"""
+    count = batch.open_count[s.player]
+    pick = (batch.rng.random(len(s), dtype=np.float32) * count).astype(np.int64)
+    direction = batch.open_dirs[s.player, np.minimum(pick, count - 1)]
+    action = np.where((s.num_arrows > 0) & batch.wumpus_nearby(s), SHOOT, MOVE)
+    return action, direction
+
+
+if __name__ == "__main__":
+    # Win rates for every difficulty preset: python batch.py [games]
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for name in engine.DIFFICULTIES:
+        stats = BatchEngine.from_difficulty(name, seed=0).run_games(num_games)
+        print(f"{name:6} win {stats['win_rate']:.1%}  eaten {stats['eaten']}  "
+              f"fell {stats['fell']}  avg turns {stats['avg_turns']:.1f}  "
+              f"{stats['games_per_sec']:.0f} games/s")
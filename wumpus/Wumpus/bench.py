@@ -0,0 +1,236 @@
+# Benchmark suite for Hunt the Wumpus
+# Times the hot paths headlessly on fixed seeds (rendering goes to SDL's
+# dummy video driver, so no window opens) and compares each throughput
+# with a saved JSON baseline. A benchmark that got slower than the
+# baseline by more than the threshold counts as a regression.
+# Usage: python bench.py            (exits with status 1 on a regression)
+#        python bench.py --save     (store this machine's baseline)
+#        python bench.py --only play --threshold 0.1
+import argparse    # Command line options
+import json        # Baseline file
+import os          # Paths and the SDL video driver
+import platform    # Recorded with the baseline
+import random      # Fixed-seed inputs
+import sys         # Exit status
+import time        # Timing
+
+# Rendering benchmarks draw into SDL's dummy driver unless told otherwise
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import engine
+
+# Folder holding the game modules (and the default baseline file)
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(HERE, "bench_baseline.json")
+
+# Fail when a throughput drops more than this fraction below its baseline
+THRESHOLD = 0.2
+
+# Every benchmark runs this many times and the fastest run counts
+REPEATS = 3
+
+# Seed of all benchmark inputs
+SEED = 0
+
+
+# --- Headless benchmarks ---
+# Each one sets up its inputs and returns (run, unit): run() does the timed
+# work from the same seeds every time and returns how many units it did
+
+def bench_populate_cave():
+    """Games dealt by Engine.populate_cave"""
+    game = engine.Engine()
+    state = engine.GameState()
+
+    def run():
+        state.rng = random.Random(SEED)
+        for _ in range(20000):
+            game.populate_cave(state)
+        return 20000
+    return run, "games"
+
+
+def bench_move_wumpus():
+    """Wumpus moves, half the games passive and half hunting (no arrows)"""
+    game = engine.Engine()
+    seeds = [engine.game_seed(SEED, index) for index in range(500)]
+
+    def run():
+        states = [game.new_game(seed) for seed in seeds]
+        for state in states[::2]:
+            state.num_arrows = 0
+        for _ in range(40):
+            for state in states:
+                game.move_wumpus(state)
+        return 40 * len(states)
+    return run, "moves"
+
+
+def bench_check_neighbor_rooms():
+    """Percept checks (Engine.check_neighbor_rooms) on random rooms and masks"""
+    game = engine.Engine()
+    rng = random.Random(SEED)
+    queries = [(rng.randint(1, game.num_rooms), rng.getrandbits(game.num_rooms + 1))
+               for _ in range(100000)]
+
+    def run():
+        check = game.check_neighbor_rooms
+        for pos, mask in queries:
+            check(pos, mask)
+        return len(queries)
+    return run, "checks"
+
+
+def bench_play(name):
+    """Complete games of a difficulty preset with the random policy"""
+    game = engine.Engine.from_difficulty(name)
+
+    def run():
+        return game.run_games(2000, seed=SEED)["games"]
+    return run, "games"
+
+
+# --- Rendering benchmarks (need pygame) ---
+
+def load_gui():
+    """Import the Pygame front end and open its (dummy) window"""
+    import HuntTheWumpus as gui
+    gui.init_display()
+    gui.get_font()
+    gui.state = gui.game.new_game(SEED)
+    return gui
+
+
+def bench_draw_room():
+    """Frames of draw_room + flip, walking through every room of the cave"""
+    gui = load_gui()
+    import pygame
+    rooms = list(gui.cave)
+
+    def run():
+        for frame in range(300):
+            gui.state.player_pos = rooms[frame % len(rooms)]
+            gui.draw_room(gui.state.player_pos, gui.screen)
+            pygame.display.flip()
+        return 300
+    return run, "frames"
+
+
+def bench_animate_projectile():
+    """Frames of the arrow animation queued by animate_projectile"""
+    gui = load_gui()
+    frames = 36  # One flight at 60 fps
+
+    def run():
+        for direction in engine.DIRECTIONS:
+            gui.animate_projectile(gui.arrow_img, direction)
+            overlay = gui.overlays.current()
+            for frame in range(frames):
+                gui.present(overlay.draw(gui.screen, frame / (frames - 1)))
+            gui.overlays.clear()
+        return frames * len(engine.DIRECTIONS)
+    return run, "frames"
+
+
+def bench_frames(name):
+    """Frames of random-policy games of a difficulty preset, showing the room after every turn"""
+    gui = load_gui()
+    game = engine.Engine.from_difficulty(name)
+
+    def run():
+        gui.game = game
+        frames = 0
+        for index in range(20):
+            gui.state = state = game.new_game(engine.game_seed(SEED, index))
+            state.policy_rng = random.Random(state.seed ^ engine.POLICY_STREAM)
+            game.check_room(state)
+            while state.result is None and state.turns < 200:
+                game.step(state, *engine.random_policy(game, state))
+                gui.show_room()
+                frames += 1
+        return frames
+    return run, "frames"
+
+
+def benchmarks():
+    """Every benchmark as {name: setup function}, rendering ones only if pygame is installed"""
+    suite = {
+        "populate_cave": bench_populate_cave,
+        "move_wumpus": bench_move_wumpus,
+        "check_neighbor_rooms": bench_check_neighbor_rooms,
+    }
+    for name in engine.DIFFICULTIES:
+        suite[f"play {name}"] = lambda name=name: bench_play(name)
+    try:
+        import pygame  # noqa: F401 (only checking that it is there)
+    except ImportError:
+        print("pygame not installed, skipping the rendering benchmarks")
+        return suite
+    suite["draw_room"] = bench_draw_room
+    suite["animate_projectile"] = bench_animate_projectile
+    for name in engine.DIFFICULTIES:
+        suite[f"frames {name}"] = lambda name=name: bench_frames(name)
+    return suite
+
+
+def measure(setup, repeats=REPEATS):
+    """Best throughput (units per second) of a benchmark over several runs, and its unit"""
+    run, unit = setup()
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        count = run()
+        elapsed = time.perf_counter() - start
+        best = max(best, count / elapsed if elapsed > 0 else float("inf"))
+    return best, unit
+
+
+def main():
+    """Run the suite, compare with the baseline and return the exit status"""
+    parser = argparse.ArgumentParser(description="Benchmark the Hunt the Wumpus hot paths")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="JSON baseline file")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown before failing (0.2 = 20%%)")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="runs per benchmark (best counts)")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    regressions = []
+    for name, setup in benchmarks().items():
+        if args.only and args.only not in name:
+            continue
+        rate, unit = measure(setup, args.repeats)
+        results[name] = {"rate": rate, "unit": unit}
+        line = f"{name:22} {rate:12,.0f} {unit}/s"
+        old = baseline.get(name)
+        if old:
+            change = rate / old["rate"] - 1
+            line += f"  {change:+7.1%} vs baseline"
+            if change < -args.threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        baseline.update(results)  # Benchmarks left out with --only keep their old numbers
+        with open(args.baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "results": baseline}, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+# Cave layouts for Hunt the Wumpus
+# A Cave stores the exits of every room in one flat array of ints (four per
+# room, 0 = no exit), so even a million-room cave only takes a few bytes
+# per room. It can be used anywhere the engine expects the classic cave
+# dict: cave[room] gives that room's [up, down, left, right] exits as a
+# read-only view. Caves can also be put in shared memory so worker
+# processes use one copy without pickling it.
+# The generators below build caves of any size that are always connected.
+import random      # For random cave generation
+import sys         # For command line arguments
+import time        # For timing cave generation
+from array import array  # Compact storage for the exits
+
+from engine import UP, DOWN, LEFT, RIGHT
+
+# Exits stored per room (up, down, left, right)
+EXITS = 4
+
+# How often a random-regular cave tries to fix a clashing room pair
+MAX_SWAP_TRIES = 1000
+
+
+class Cave:
+    """
+    Room layout backed by a flat array('i') of exits
+    exits[4 * room + direction] is the room through that exit (0 = none),
+    row 0 is unused so room numbers index the array directly. Only the
+    generators write to exits, everything else sees read-only rows
+    Args:
+        num_rooms: number of rooms (numbered 1 to num_rooms)
+        exits: existing array (or 'i' memoryview) of 4 * (num_rooms + 1)
+               ints (default all walls)
+    """
+    __slots__ = ("num_rooms", "exits", "rows", "block")
+
+    def __init__(self, num_rooms, exits=None):
+        if exits is None:
+            exits = array("i", [0]) * (EXITS * (num_rooms + 1))
+        if len(exits) != EXITS * (num_rooms + 1):
+            raise ValueError(f"expected {EXITS * (num_rooms + 1)} exits, got {len(exits)}")
+        self.num_rooms = num_rooms
+        self.exits = exits
+        self.rows = memoryview(exits).toreadonly()  # Slices of this are the per-room rows
+        self.block = None  # Shared memory the exits live in (see attach)
+
+    @classmethod
+    def from_dict(cls, cave):
+        """Build a Cave from a {room: [up, down, left, right]} dict like engine.cave"""
+        result = cls(len(cave))
+        for room, room_exits in cave.items():
+            result.exits[EXITS * room:EXITS * room + EXITS] = array("i", room_exits)
+        return result
+
+    def to_dict(self):
+        """The layout as a {room: [up, down, left, right]} dict"""
+        return {room: list(room_exits) for room, room_exits in self.items()}
+
+    def as_array(self):
+        """Read-only (rooms + 1) x 4 NumPy view of the exits (needs numpy, shares memory)"""
+        import numpy as np  # Only needed by the batch tools
+        return np.frombuffer(self.rows, dtype=np.intc).reshape(-1, EXITS)
+
+    # --- Sharing between processes ---
+
+    def share(self):
+        """
+        Copy the exits into a new shared memory block
+        Workers call Cave.attach(block.name, num_rooms) to use it without a
+        copy. The caller owns the block and must close() and unlink() it
+        once the workers are done
+        """
+        from multiprocessing import shared_memory  # Only needed when sharing
+        data = self.rows.cast("B")
+        block = shared_memory.SharedMemory(create=True, size=len(data))
+        block.buf[:len(data)] = data
+        return block
+
+    @classmethod
+    def attach(cls, name, num_rooms):
+        """Read-only Cave over a shared memory block made by Cave.share()"""
+        from multiprocessing import shared_memory  # Only needed when sharing
+        block = shared_memory.SharedMemory(name=name)
+        size = EXITS * (num_rooms + 1) * array("i").itemsize
+        cave = cls(num_rooms, block.buf[:size].cast("i").toreadonly())
+        cave.block = block  # Keeps the mapping open as long as the cave lives
+        return cave
+
+    def close(self):
+        """Let go of the shared memory block of an attached cave (unusable afterwards)"""
+        if self.block is not None:
+            self.rows.release()
+            self.exits.release()
+            self.block.close()
+            self.block = None
+
+    def __del__(self):
+        self.close()  # The views must go before the block they point into
+
+    # --- Dict-style access (same interface as engine.cave) ---
+
+    def __len__(self):
+        return self.num_rooms
+
+    def __getitem__(self, room):
+        """Exits of a room as a 4-int memoryview [up, down, left, right]"""
+        if not 0 < room <= self.num_rooms:
+            raise KeyError(room)
+        return self.rows[EXITS * room:EXITS * room + EXITS]
+
+    def __contains__(self, room):
+        return 0 < room <= self.num_rooms
+
+    def __iter__(self):
+        return iter(range(1, self.num_rooms + 1))
+
+    def keys(self):
+        return range(1, self.num_rooms + 1)
+
+    def values(self):
+        return (self[room] for room in self)
+
+    def items(self):
+        return ((room, self[room]) for room in self)
+
+    # --- Building ---
+
+    def connect(self, a, direction, b, back):
+        """Join room a's exit in direction to room b's exit in direction back"""
+        self.exits[EXITS * a + direction] = b
+        self.exits[EXITS * b + back] = a
+
+    def is_connected(self):
+        """True if every room can be reached from room 1"""
+        if self.num_rooms == 0:
+            return True
+        exits = self.exits
+        seen = bytearray(self.num_rooms + 1)
+        seen[1] = 1
+        stack = [1]
+        count = 1
+        while stack:
+            base = EXITS * stack.pop()
+            for next_room in exits[base:base + EXITS]:
+                if next_room and not seen[next_room]:
+                    seen[next_room] = 1
+                    count += 1
+                    stack.append(next_room)
+        return count == self.num_rooms
+
+
+# --- Generators ---
+
+def grid_cave(width, height, openness=1.0, rng=None):
+    """
+    Rectangular grid of rooms numbered row by row from the top left
+    Args:
+        width, height: size of the grid in rooms
+        openness: chance that each passage between neighbouring rooms is open,
+                  1.0 opens all of them, anything lower keeps a random spanning
+                  tree open first so every room stays reachable
+        rng: random.Random instance (defaults to the global random module)
+    Returns a Cave
+    """
+    if width < 1 or height < 1:
+        raise ValueError(f"grid must be at least 1 x 1, got {width} x {height}")
+    rng = rng if rng is not None else random
+    num_rooms = width * height
+    cave = Cave(num_rooms)
+
+    def right_of(room):
+        return room + 1
+
+    def below(room):
+        return room + width
+
+    # Every passage of the full grid as (room << 1 | 1 if it goes down)
+    passages = array("i")
+    for room in range(1, num_rooms + 1):
+        if room % width:  # Not in the last column
+            passages.append(room << 1)
+        if room <= num_rooms - width:  # Not in the bottom row
+            passages.append(room << 1 | 1)
+
+    if openness >= 1.0:
+        for passage in passages:
+            room = passage >> 1
+            if passage & 1:
+                cave.connect(room, DOWN, below(room), UP)
+            else:
+                cave.connect(room, RIGHT, right_of(room), LEFT)
+        return cave
+
+    # Randomized Kruskal: open passages in random order when they join two
+    # separate parts of the cave (union-find with path halving)
+    parent = array("i", range(num_rooms + 1))
+
+    def find(room):
+        while parent[room] != room:
+            parent[room] = parent[parent[room]]
+            room = parent[room]
+        return room
+
+    rng.shuffle(passages)
+    for passage in passages:
+        room = passage >> 1
+        other = below(room) if passage & 1 else right_of(room)
+        a, b = find(room), find(other)
+        if a != b:
+            parent[a] = b
+        elif rng.random() >= openness:
+            continue  # Already connected, keep this wall with chance 1 - openness
+        if passage & 1:
+            cave.connect(room, DOWN, other, UP)
+        else:
+            cave.connect(room, RIGHT, other, LEFT)
+    return cave
+
+
+def dodecahedral_cave(ring=10, skip=2):
+    """
+    Generalised dodecahedron: an outer ring of rooms, each joined to a room
+    of an inner ring whose rooms link to the one skip places along
+    ring=10, skip=2 is the classic 20-room dodecahedron
+    Args:
+        ring: rooms per ring (the cave has 2 * ring rooms)
+        skip: inner ring step, 1 <= skip < ring / 2
+    Returns a Cave with three exits per room
+    """
+    if ring < 3 or not 1 <= skip < ring / 2:
+        raise ValueError(f"need ring >= 3 and 1 <= skip < ring / 2, got ring={ring}, skip={skip}")
+    cave = Cave(2 * ring)
+    for i in range(ring):
+        outer = i + 1
+        inner = ring + i + 1
+        cave.connect(outer, LEFT, (i + 1) % ring + 1, RIGHT)            # Along the outer ring
+        cave.connect(outer, DOWN, inner, UP)                            # Spoke to the inner ring
+        cave.connect(inner, LEFT, ring + (i + skip) % ring + 1, RIGHT)  # Along the inner ring
+    return cave
+
+
+def random_regular_cave(num_rooms, degree=3, rng=None):
+    """
+    Random cave where every room has the same number of exits
+    Rooms are first linked into one randomly ordered loop (so the cave is
+    always connected), then random pairings of the rooms add the other exits
+    Args:
+        num_rooms: number of rooms (must be even for degree 3 or 4)
+        degree: exits per room, 2 to 4
+        rng: random.Random instance (defaults to the global random module)
+    Returns a Cave
+    """
+    if not 2 <= degree <= EXITS:
+        raise ValueError(f"degree must be between 2 and {EXITS}, got {degree}")
+    if num_rooms <= degree or (degree > 2 and num_rooms % 2):
+        raise ValueError(f"can't build a {degree}-regular cave with {num_rooms} rooms")
+    rng = rng if rng is not None else random
+    cave = Cave(num_rooms)
+    exits = cave.exits
+    used = bytearray(num_rooms + 1)  # Exits filled so far in each room
+
+    def link(a, b):
+        exits[EXITS * a + used[a]] = b
+        exits[EXITS * b + used[b]] = a
+        used[a] += 1
+        used[b] += 1
+
+    def linked(a, b):
+        return b in exits[EXITS * a:EXITS * a + used[a]]
+
+    # One big loop through every room in random order
+    rooms = array("i", range(1, num_rooms + 1))
+    rng.shuffle(rooms)
+    for i in range(num_rooms):
+        link(rooms[i - 1], rooms[i])
+
+    # Each extra exit comes from pairing up all the rooms at random,
+    # pairs that are already linked swap partners with another pair
+    for _ in range(degree - 2):
+        rng.shuffle(rooms)
+        for i in range(0, num_rooms, 2):
+            if not linked(rooms[i], rooms[i + 1]):
+                continue
+            for _ in range(MAX_SWAP_TRIES):
+                j = rng.randrange(0, num_rooms, 2)
+                if j != i and not linked(rooms[i], rooms[j + 1]) and not linked(rooms[j], rooms[i + 1]):
+                    rooms[i + 1], rooms[j + 1] = rooms[j + 1], rooms[i + 1]
+                    break
+            else:
+                raise ValueError(f"couldn't pair up the rooms of a {degree}-regular "
+                                 f"cave with {num_rooms} rooms, try another seed")
+        for i in range(0, num_rooms, 2):
+            link(rooms[i], rooms[i + 1])
+    return cave
+
+
+if __name__ == "__main__":
+    # Build one cave of each kind and play a few games in it
+    # Usage: python caves.py [rooms]
+    import engine
+    num_rooms = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5
+    side = max(2, int(num_rooms ** 0.5))
+    builders = {
+        "grid": lambda rng: grid_cave(side, side, 0.5, rng),
+        "dodecahedral": lambda rng: dodecahedral_cave(max(5, num_rooms // 2), 2),
+        "random-regular": lambda rng: random_regular_cave(num_rooms + num_rooms % 2, 3, rng),
+    }
+    for name, build in builders.items():
+        rng = random.Random(0)
+        start = time.perf_counter()
+        cave = build(rng)
+        built = time.perf_counter() - start
+        stats = engine.Engine(cave=cave, rng=rng).run_games(20, max_turns=200)
+        print(f"{name:14} {len(cave):8} rooms  {cave.exits.itemsize * len(cave.exits) / len(cave):.0f} bytes/room  "
+              f"built in {built:.2f} s  connected {cave.is_connected()}  "
+              f"{stats['games_per_sec']:.1f} games/s")
@@ -0,0 +1,61 @@
+# Player settings for Hunt the Wumpus
+# The keybinds and difficulty picked in the menus are kept in a small JSON
+# file next to the game. It is read once when the game starts and written
+# again whenever the player changes one of them. The Pygame window and the
+# terminal front end read the same file and the same default keybinds.
+import json        # Settings file format
+import os          # Paths and atomic replace
+
+# Settings file next to the game modules
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
+
+# Pygame key codes are SDL key codes: a printable key is its character code,
+# the others are fixed numbers, so front ends without Pygame can read the
+# same bindings (pygame.K_UP == SDL_UP and so on)
+SDL_UP = 0x40000052
+SDL_DOWN = 0x40000051
+SDL_LEFT = 0x40000050
+SDL_RIGHT = 0x4000004F
+SDL_F1 = 0x4000003A  # F2 to F12 follow on
+
+# Keys each action is bound to until the player changes them in the settings menu
+DEFAULT_KEYBINDS = {
+    "move_up": SDL_UP,
+    "move_down": SDL_DOWN,
+    "move_left": SDL_LEFT,
+    "move_right": SDL_RIGHT,
+    "throw_rock": ord("r"),  # 'R' for rock
+    "shoot_arrow": ord("a"),  # 'A' for arrow
+    "hint": ord("h"),  # 'H' for a hint from the AI
+    "frame_stats": SDL_F1 + 2  # F3 shows/hides the frame stats overlay
+}
+
+
+def load_config(path=CONFIG_FILE):
+    """Saved settings as a dict (empty if there is no usable file yet)"""
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return config if isinstance(config, dict) else {}
+
+
+def save_config(config, path=CONFIG_FILE):
+    """Write the settings dict (a read-only install just doesn't remember them)"""
+    temp = path + ".tmp"
+    try:
+        with open(temp, "w") as f:
+            json.dump(config, f, indent=2, sort_keys=True)
+        os.replace(temp, path)
+    except OSError:
+        pass
+
+
+def load_keybinds(config):
+    """The default keybinds with the ones saved in a settings dict applied"""
+    keybinds = dict(DEFAULT_KEYBINDS)
+    for action, key in config.get("keybinds", {}).items():
+        if action in keybinds and isinstance(key, int):
+            keybinds[action] = key
+    return keybinds
@@ -0,0 +1,145 @@
+# All-pairs shortest paths over the cave
+# Built once per cave layout with a breadth-first search from every room,
+# after that any distance or "which exit gets me closer" question is a
+# plain table lookup (used by the hunting Wumpus, AI players and analytics).
+# Caves too big for an all-pairs table search from one room at a time instead.
+from array import array  # Compact distance rows for big caves
+from collections import OrderedDict, deque  # LRU of rows, queue for breadth-first search
+
+# Distance reported between rooms that are not connected
+UNREACHABLE = 1 << 30
+
+# Largest cave that gets a full all-pairs table (the table grows with rooms squared)
+ALL_PAIRS_LIMIT = 1024
+
+
+def distance_table(cave):
+    """DistanceTable for small caves, LazyDistances for big ones"""
+    if len(cave) <= ALL_PAIRS_LIMIT:
+        return DistanceTable(cave)
+    return LazyDistances(cave)
+
+
+class DistanceTable:
+    """
+    Exact exit-count distances and next hops between every pair of rooms
+    Args:
+        cave: room layout in the same format as engine.cave
+    """
+    __slots__ = ("num_rooms", "dist", "hop")
+
+    def __init__(self, cave):
+        self.num_rooms = len(cave)
+        size = self.num_rooms + 1  # Room numbers index the rows directly
+
+        # dist[a][b] - number of moves from room a to room b
+        self.dist = [[UNREACHABLE] * size for _ in range(size)]
+        for start in cave:
+            row = self.dist[start]
+            row[start] = 0
+            queue = deque([start])
+            while queue:
+                room = queue.popleft()
+                for next_room in cave[room]:
+                    if next_room and row[next_room] == UNREACHABLE:
+                        row[next_room] = row[room] + 1
+                        queue.append(next_room)
+
+        # hop[a][b] - first exit of room a on a shortest path to room b (0 if none)
+        self.hop = [[0] * size for _ in range(size)]
+        for start in cave:
+            exits = [room for room in cave[start] if room]
+            hop_row = self.hop[start]
+            for target in range(1, size):
+                best = self.dist[start][target]
+                if target == start or best == UNREACHABLE:
+                    continue
+                for room in exits:  # First exit in [up, down, left, right] order
+                    if self.dist[room][target] == best - 1:
+                        hop_row[target] = room
+                        break
+
+    def distance(self, a, b):
+        """Number of moves needed to get from room a to room b"""
+        return self.dist[a][b]
+
+    def next_hop(self, a, b):
+        """Room to move to from a to get one step closer to b (0 if already there)"""
+        return self.hop[a][b]
+
+    def path(self, a, b):
+        """List of rooms on a shortest path from a to b, including both ends"""
+        if self.dist[a][b] == UNREACHABLE:
+            return []
+        rooms = [a]
+        while a != b:
+            a = self.hop[a][b]
+            rooms.append(a)
+        return rooms
+
+
+class LazyDistances:
+    """
+    Same questions as DistanceTable for caves too big for an all-pairs table
+    The distances to a room come from one breadth-first search the first time
+    they are needed, the most recently used rows are kept. Exits must work
+    both ways (true for every cave the generators in caves.py build)
+    Args:
+        cave: room layout in the same format as engine.cave
+        max_rows: how many rooms' distance rows to keep
+    """
+    __slots__ = ("cave", "num_rooms", "max_rows", "rows")
+
+    def __init__(self, cave, max_rows=8):
+        self.cave = cave
+        self.num_rooms = len(cave)
+        self.max_rows = max_rows
+        self.rows = OrderedDict()  # target room -> array of distances to it
+
+    def row(self, target):
+        """array('i') of the number of moves from every room to target"""
+        row = self.rows.get(target)
+        if row is not None:
+            self.rows.move_to_end(target)  # Most recently used goes last
+            return row
+
+        cave = self.cave
+        row = array("i", [UNREACHABLE]) * (self.num_rooms + 1)
+        row[target] = 0
+        queue = deque([target])
+        while queue:
+            room = queue.popleft()
+            for next_room in cave[room]:
+                if next_room and row[next_room] == UNREACHABLE:
+                    row[next_room] = row[room] + 1
+                    queue.append(next_room)
+
+        self.rows[target] = row
+        if len(self.rows) > self.max_rows:
+            self.rows.popitem(last=False)  # Evict least recently used
+        return row
+
+    def distance(self, a, b):
+        """Number of moves needed to get from room a to room b"""
+        return self.row(b)[a]
+
+    def next_hop(self, a, b):
+        """Room to move to from a to get one step closer to b (0 if already there)"""
+        row = self.row(b)
+        best = row[a]
+        if best == 0 or best == UNREACHABLE:
+            return 0
+        for room in self.cave[a]:  # First exit in [up, down, left, right] order
+            if room and row[room] == best - 1:
+                return room
+        return 0
+
+    def path(self, a, b):
+        """List of rooms on a shortest path from a to b, including both ends"""
+        if self.distance(a, b) == UNREACHABLE:
+            return []
+        rooms = [a]
+        while a != b:
+            a = self.next_hop(a, b)
+            rooms.append(a)
+        return rooms
@@ -0,0 +1,715 @@
+# Pure game logic for Hunt the Wumpus
+# This module has no pygame dependency and never touches the screen, so the
+# rules can be run headless (tests, tools, batch simulation) and the Pygame
+# front end in HuntTheWumpus.py only has to draw what the engine reports.
+import random      # For random number generation (hazard placement, etc.)
+import time        # For timing batch simulation runs
+from types import MappingProxyType  # Read-only view of the cave dict
+
+from distances import distance_table, UNREACHABLE  # Shortest paths between rooms
+
+# --- Constants ---
+# Direction constants (matches indices in cave layout)
+UP = 0    # Index for upward exit
+DOWN = 1  # Index for downward exit
+LEFT = 2  # Index for left exit
+RIGHT = 3 # Index for right exit
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+# Default game configuration - number of hazards/items and Wumpus behaviour
+NUM_BATS = 2            # Number of rooms with bats (teleport player)
+NUM_PITS = 1            # Number of rooms with bottomless pits (instant death)
+NUM_ARROWS = 3          # Number of extra arrows available in cave
+NUM_ROCKS = 3           # Number of extra rocks available in cave
+WUMPUS_MOVE_CHANCE = 70 # Percentage chance Wumpus moves each turn (when mobile)
+
+# Starting inventory after a reset
+START_ARROWS = 1
+START_ROCKS = 2
+
+# Difficulty presets used by the difficulty menu
+# Format: name: (bats, pits, arrows, rocks, move_chance%)
+DIFFICULTIES = {
+    "Easy": (1, 1, 5, 5, 30),
+    "Medium": (2, 1, 3, 3, 60),
+    "Hard": (3, 2, 1, 1, 90)
+}
+
+# --- Cave Layout ---
+def freeze_cave(cave):
+    """
+    Read-only copy of a {room: [up, down, left, right]} cave dict
+    Rooms become tuples inside a read-only mapping, so nothing (not even a
+    random Wumpus move) can reorder a room's exits. caves.Cave objects are
+    already read-only and are returned unchanged
+    """
+    if not isinstance(cave, dict):
+        return cave
+    return MappingProxyType({room: tuple(exits) for room, exits in cave.items()})
+
+
+# Dictionary representing the 20-room cave as a dodecahedron
+# Format: {room_number: (up_exit, down_exit, left_exit, right_exit)}
+# 0 indicates no exit in that direction
+# Rooms are interconnected to form the cave structure
+cave = freeze_cave({
+    1: [0, 8, 2, 5], 2: [0, 10, 3, 1], 3: [0, 12, 4, 2], 4: [0, 14, 5, 3],
+    5: [0, 6, 1, 4], 6: [5, 0, 7, 15], 7: [0, 17, 8, 6], 8: [1, 0, 9, 7],
+    9: [0, 18, 10, 8], 10: [2, 0, 11, 9], 11: [0, 19, 12, 10], 12: [3, 0, 13, 11],
+    13: [0, 20, 14, 12], 14: [4, 0, 15, 13], 15: [0, 16, 6, 14], 16: [15, 0, 17, 20],
+    17: [7, 0, 18, 16], 18: [9, 0, 19, 17], 19: [11, 0, 20, 18], 20: [13, 0, 16, 19]
+})
+NUM_ROOMS = len(cave)
+
+# Largest cave that gets a precomputed neighbour mask per room (each mask
+# is as long as the cave, so bigger caves check the exits one by one)
+NEIGHBOR_MASK_LIMIT = 1024
+
+# Masks of bigger caves are looked up in sets of their rooms instead (a bit
+# test shifts the whole mask, which takes time in proportion to the cave),
+# the sets of this many recently used masks are kept
+ROOM_SET_CACHE = 8
+
+# --- Events ---
+# Every rule returns a list of these codes describing what happened,
+# the front end decides how to show them (message box, print, game over)
+EATEN = 1           # Player walked into (or was caught by) the Wumpus
+FELL = 2            # Player fell into a bottomless pit
+BATS = 3            # Bats carried the player to another room
+FOUND_ARROW = 4     # Player picked up an arrow
+FOUND_ROCK = 5      # Player picked up a rock
+KILLED_WUMPUS = 6   # Arrow hit the Wumpus
+ARROW_MISSED = 7    # Arrow flew into an empty room
+OUT_OF_ARROWS = 8   # Last arrow was just used, the Wumpus starts hunting
+NO_ARROWS = 9       # Tried to shoot with no arrows
+ROCK_WUMPUS = 10    # Rock landed next to the Wumpus
+ROCK_BATS = 11      # Rock landed in a bat room
+ROCK_PIT = 12       # Rock fell into a pit
+ROCK_EMPTY = 13     # Rock landed in an empty room
+NO_ROCKS = 14       # Tried to throw with no rocks
+LAST_ROCK = 15      # Last rock was just thrown
+MOVED = 16          # Player walked through an exit
+BLOCKED = 17        # No exit in the chosen direction
+
+# Events that end the game
+GAME_OVER_EVENTS = (EATEN, FELL, KILLED_WUMPUS)
+
+# Text shown to the player for each event
+MESSAGES = {
+    EATEN: "You were eaten by a WUMPUS!!!",
+    FELL: "You fell into a bottomless pit!!",
+    BATS: "Bats pick you up and place you elsewhere in the cave!",
+    FOUND_ARROW: "You have found an arrow!",
+    FOUND_ROCK: "You have found a rock!",
+    KILLED_WUMPUS: "Your aim was true and you have killed the Wumpus!",
+    ARROW_MISSED: "Your arrow sails into the darkness...",
+    OUT_OF_ARROWS: "You're out of arrows! The Wumpus begins to hunt you...",
+    NO_ARROWS: "You have no arrows!",
+    ROCK_WUMPUS: "You hear a low growl... the Wumpus is near!",
+    ROCK_BATS: "You hear frantic squeaking... bats!",
+    ROCK_PIT: "You hear the rock fall endlessly... a pit!",
+    ROCK_EMPTY: "You hear a faint clink. The room is empty.",
+    NO_ROCKS: "You have no rocks to throw!",
+    LAST_ROCK: "You have no rocks left!",
+}
+
+# Text of the percepts shown in the room (next to the bats or a pit)
+BATS_NEARBY_MESSAGE = "You hear the squeaking of bats nearby"
+PIT_NEARBY_MESSAGE = "You feel a draft nearby"
+
+# --- Actions ---
+# Player actions accepted by Engine.step()
+MOVE = 0    # Walk through an exit
+SHOOT = 1   # Shoot an arrow through an exit
+THROW = 2   # Throw a rock through an exit
+
+# --- Random streams ---
+# Every game has its own seeded random.Random for the rules, so a game can
+# be replayed from its seed and the actions taken. Policies get a second
+# stream so their choices never shift the rules' random numbers.
+SEED_MASK = (1 << 64) - 1            # Seeds are 64-bit unsigned ints
+POLICY_STREAM = 0x9E3779B97F4A7C15   # Mixed into the seed for the policy stream
+
+
+def game_seed(base_seed, index):
+    """
+    Seed of game number index in a run started from base_seed
+    (SplitMix64, so neighbouring games get unrelated streams and a run
+    can be split across workers by game index with identical results)
+    """
+    z = (base_seed + (index + 1) * POLICY_STREAM) & SEED_MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & SEED_MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & SEED_MASK
+    return z ^ (z >> 31)
+
+
+def check_placement(num_rooms, num_bats, num_pits, num_arrows, num_rocks):
+    """
+    Raise ValueError if the items can't all be placed in the cave
+    Player, Wumpus, bats and pits each need a room of their own, arrows and
+    rocks need rooms without hazards (but an arrow and a rock may share one)
+    """
+    needed = 2 + num_bats + num_pits + max(num_arrows, num_rocks)
+    if min(num_bats, num_pits, num_arrows, num_rocks) < 0 or needed > num_rooms:
+        raise ValueError(
+            f"can't place {num_bats} bats, {num_pits} pits, {num_arrows} arrows and "
+            f"{num_rocks} rocks in {num_rooms} rooms (needs at least {needed} rooms)")
+
+
+def rooms_in(mask):
+    """List of the room numbers whose bits are set in an occupancy mask"""
+    rooms = []
+    while mask:
+        low = mask & -mask  # Lowest set bit, so big caves don't walk every room
+        rooms.append(low.bit_length() - 1)
+        mask ^= low
+    return rooms
+
+
+# (mask, frozenset of its rooms) pairs, most recently built first. Masks are
+# immutable ints, so a mask that changed is a new object and gets a new set
+room_set_cache = []
+
+
+def room_set(mask):
+    """Frozenset of the rooms set in an occupancy mask (cached by mask identity)"""
+    for known, rooms in room_set_cache:
+        if known is mask:
+            return rooms
+    rooms = frozenset(rooms_in(mask))
+    room_set_cache.insert(0, (mask, rooms))
+    del room_set_cache[ROOM_SET_CACHE:]
+    return rooms
+
+
+class GameState:
+    """
+    All mutable state for one game (what used to be module globals)
+    Hazards and items are stored as occupancy masks: bit n is set when
+    room n holds one, so membership and "is any of them next to me?"
+    checks are single bitwise operations
+    Args:
+        seed: seed of this game's random stream (None = unpredictable)
+    """
+    __slots__ = ("player_pos", "wumpus_pos", "num_arrows", "num_rocks",
+                 "bats_list", "bat_mask", "pit_mask", "arrow_mask", "rock_mask",
+                 "turns", "result", "seed", "rng", "policy_rng", "actions")
+
+    def __init__(self, seed=None):
+        self.player_pos = 0              # Current room number where player is located
+        self.wumpus_pos = 0              # Current room number where Wumpus is located
+        self.num_arrows = START_ARROWS   # Player's current arrow count
+        self.num_rocks = START_ROCKS     # Player's current rock count
+        # Bat colonies keep a list too, two of them can end up in one room
+        self.bats_list = []
+        # Occupancy masks tracking rooms containing each type of hazard/item
+        self.bat_mask = 0
+        self.pit_mask = 0
+        self.arrow_mask = 0
+        self.rock_mask = 0
+        self.turns = 0                   # Number of actions taken so far
+        self.result = None               # Game over event code (None while playing)
+        self.seed = seed
+        self.rng = random.Random(seed)   # Random stream used by the rules
+        self.policy_rng = None           # Random stream for the policy (set by Engine.play)
+        self.actions = bytearray()       # One byte per action: action << 2 | direction
+
+    def has_bats(self, room):
+        """True if bats are in the room"""
+        if self.bat_mask.bit_length() > NEIGHBOR_MASK_LIMIT:
+            return room in room_set(self.bat_mask)
+        return self.bat_mask >> room & 1 == 1
+
+    def has_pit(self, room):
+        """True if the room has a bottomless pit"""
+        if self.pit_mask.bit_length() > NEIGHBOR_MASK_LIMIT:
+            return room in room_set(self.pit_mask)
+        return self.pit_mask >> room & 1 == 1
+
+
+class Engine:
+    """
+    Applies the game rules to GameState objects
+    Args:
+        num_bats, num_pits, num_arrows, num_rocks: hazard/item counts per game
+        wumpus_move_chance: percentage chance the Wumpus moves each turn
+        mobile_wumpus: whether the Wumpus can move between rooms at all
+        cave: room layout in the same format as the module level cave
+              (or a caves.Cave, of any size), plain dicts are frozen
+        rng: random.Random used to pick seeds for games started without one
+             (defaults to the global random module)
+    """
+    def __init__(self, num_bats=NUM_BATS, num_pits=NUM_PITS, num_arrows=NUM_ARROWS,
+                 num_rocks=NUM_ROCKS, wumpus_move_chance=WUMPUS_MOVE_CHANCE,
+                 mobile_wumpus=True, cave=cave, rng=None):
+        self.num_bats = num_bats
+        self.num_pits = num_pits
+        self.num_arrows = num_arrows
+        self.num_rocks = num_rocks
+        self.wumpus_move_chance = wumpus_move_chance
+        self.mobile_wumpus = mobile_wumpus
+        self.set_cave(cave)
+        self.rng = rng if rng is not None else random
+
+    def set_cave(self, cave):
+        """Switch to a new room layout and rebuild the distance table for it"""
+        cave = self.cave = freeze_cave(cave)
+        self.num_rooms = len(cave)
+        self.distances = distance_table(cave)  # Only rebuilt when the map changes
+        # Occupancy mask of the rooms next to each room (small caves only)
+        self.neighbor_masks = None
+        if self.num_rooms <= NEIGHBOR_MASK_LIMIT:
+            self.neighbor_masks = [0] * (self.num_rooms + 1)
+            for room, exits in cave.items():
+                for next_room in exits:
+                    if next_room:
+                        self.neighbor_masks[room] |= 1 << next_room
+
+    @classmethod
+    def from_difficulty(cls, name, **kwargs):
+        """Build an engine using one of the DIFFICULTIES presets"""
+        bats, pits, arrows, rocks, move_chance = DIFFICULTIES[name]
+        return cls(bats, pits, arrows, rocks, move_chance, **kwargs)
+
+    def set_difficulty(self, name):
+        """Switch this engine to one of the DIFFICULTIES presets"""
+        (self.num_bats, self.num_pits, self.num_arrows,
+         self.num_rocks, self.wumpus_move_chance) = DIFFICULTIES[name]
+
+    # --- Setup ---
+
+    def new_game(self, seed=None):
+        """
+        Create a freshly populated game with the starting inventory
+        Args:
+            seed: seed of the game's random stream (None = pick one with self.rng)
+        """
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        state = GameState(seed)
+        self.populate_cave(state)
+        return state
+
+    def populate_cave(self, state):
+        """
+        Initialize cave with random placement of player, wumpus, and items
+        Every room is drawn from one partial Fisher-Yates shuffle of the room
+        numbers, so placement takes one random number per item (no retries)
+        Raises ValueError if the current settings don't fit in the cave
+        """
+        check_placement(self.num_rooms, self.num_bats, self.num_pits,
+                        self.num_arrows, self.num_rocks)
+
+        # Clear all existing item/hazard rooms
+        state.bats_list.clear()
+        state.bat_mask = state.pit_mask = state.arrow_mask = state.rock_mask = 0
+
+        # Rooms are dealt from the front of a shuffled deck of all rooms,
+        # swaps only remembers the positions that were moved
+        swaps = {}
+        draw = self.draw_room
+        rng = state.rng
+
+        # Player and wumpus each get their own room
+        state.player_pos = draw(rng, swaps, 0)
+        state.wumpus_pos = draw(rng, swaps, 1)
+
+        # Bats and pits never share a room
+        dealt = 2
+        for _ in range(self.num_bats):
+            pos = draw(rng, swaps, dealt)
+            state.bats_list.append(pos)
+            state.bat_mask |= 1 << pos
+            dealt += 1
+        for _ in range(self.num_pits):
+            state.pit_mask |= 1 << draw(rng, swaps, dealt)
+            dealt += 1
+
+        # Arrows and rocks are each dealt from the rooms left after the hazards,
+        # so an arrow and a rock may share a room but never two of a kind
+        for i in range(self.num_arrows):
+            state.arrow_mask |= 1 << draw(rng, swaps, dealt + i)
+        for i in range(self.num_rocks):
+            state.rock_mask |= 1 << draw(rng, swaps, dealt + i)
+
+    def draw_room(self, rng, swaps, index):
+        """
+        One partial Fisher-Yates step: pick a random room from deck[index:]
+        and move it to deck[index]
+        Args:
+            rng: the game's random stream
+            swaps: {deck position: room} for positions that no longer hold
+                   their starting room (deck[i] starts as room i + 1)
+            index: deck position to fill
+        Returns the room placed at deck[index]
+        """
+        pick = rng.randrange(index, self.num_rooms)
+        room = swaps.get(pick, pick + 1)
+        swaps[pick] = swaps.get(index, index + 1)
+        swaps[index] = room
+        return room
+
+    def place_wumpus(self, state):
+        """Place the Wumpus in a random room not containing the player"""
+        state.wumpus_pos = self.random_other_room(state, state.player_pos)
+
+    # --- Percepts ---
+
+    def check_neighbor_rooms(self, pos, mask):
+        """Check if any rooms adjacent to pos are set in an occupancy mask"""
+        if self.neighbor_masks is None:
+            rooms = room_set(mask)
+            return any(room in rooms for room in self.cave[pos])
+        return self.neighbor_masks[pos] & mask != 0
+
+    def wumpus_nearby(self, state):
+        """True if the Wumpus is in a room next to the player (red floor)"""
+        if self.neighbor_masks is None:
+            return state.wumpus_pos in self.cave[state.player_pos]
+        return self.neighbor_masks[state.player_pos] >> state.wumpus_pos & 1 == 1
+
+    def bats_nearby(self, state):
+        """True if bats are in a room next to the player (squeaking)"""
+        return self.check_neighbor_rooms(state.player_pos, state.bat_mask)
+
+    def pit_nearby(self, state):
+        """True if a pit is in a room next to the player (draft)"""
+        return self.check_neighbor_rooms(state.player_pos, state.pit_mask)
+
+    # --- Rules ---
+
+    def check_room(self, state):
+        """
+        Check the player's room for hazards/items and apply the consequences
+        Returns a list of event codes, a game over event is always last
+        """
+        if self.neighbor_masks is None:
+            return self.check_big_room(state)
+        events = []
+        while True:
+            # Death conditions
+            if state.player_pos == state.wumpus_pos:
+                state.result = EATEN
+                events.append(EATEN)
+                return events
+            here = 1 << state.player_pos
+            if state.pit_mask & here:
+                state.result = FELL
+                events.append(FELL)
+                return events
+
+            # Bat encounter - teleport player
+            bats = state.bat_mask & here
+            if bats:
+                # Move bats and teleport player to another room
+                self.bat_teleport(state)
+                events.append(BATS)
+                here = 1 << state.player_pos
+
+            # Arrow and rock pickups
+            if state.arrow_mask & here:
+                state.num_arrows += 1
+                state.arrow_mask ^= here
+                events.append(FOUND_ARROW)
+            if state.rock_mask & here:
+                state.num_rocks += 1
+                state.rock_mask ^= here
+                events.append(FOUND_ROCK)
+
+            # The bats may have dropped the player somewhere dangerous
+            if not bats:
+                return events
+
+    def check_big_room(self, state):
+        """check_room for big caves, looking the room up in sets of the mask rooms"""
+        events = []
+        while True:
+            pos = state.player_pos
+            if pos == state.wumpus_pos:
+                state.result = EATEN
+                events.append(EATEN)
+                return events
+            if pos in room_set(state.pit_mask):
+                state.result = FELL
+                events.append(FELL)
+                return events
+
+            bats = pos in room_set(state.bat_mask)
+            if bats:
+                self.bat_teleport(state)
+                events.append(BATS)
+                pos = state.player_pos
+
+            if pos in room_set(state.arrow_mask):
+                state.num_arrows += 1
+                state.arrow_mask ^= 1 << pos
+                events.append(FOUND_ARROW)
+            if pos in room_set(state.rock_mask):
+                state.num_rocks += 1
+                state.rock_mask ^= 1 << pos
+                events.append(FOUND_ROCK)
+
+            if not bats:
+                return events
+
+    def bat_teleport(self, state):
+        """Move the bats out of the player's room and drop the player elsewhere"""
+        pos = state.player_pos
+        state.bats_list.remove(pos)
+        state.bats_list.append(self.random_other_room(state, pos))
+        state.bat_mask = 0
+        for room in state.bats_list:
+            state.bat_mask |= 1 << room
+        state.player_pos = self.random_other_room(state, pos)
+
+    def random_other_room(self, state, pos):
+        """Pick a uniformly random room that is not pos (using the game's stream)"""
+        room = state.rng.randint(1, self.num_rooms - 1)
+        return room + 1 if room >= pos else room
+
+    def move_player(self, state, direction):
+        """Walk through the exit in direction, then give the Wumpus its turn"""
+        state.actions.append(MOVE << 2 | direction)  # Replay log
+        new_room = self.cave[state.player_pos][direction]
+        if new_room <= 0:  # No exit in that direction
+            return [BLOCKED]
+        state.player_pos = new_room
+        self.move_wumpus(state)  # Wumpus may move after player
+        return [MOVED]
+
+    def shoot_arrow(self, state, direction):
+        """Handle arrow shooting mechanics"""
+        state.actions.append(SHOOT << 2 | direction)  # Replay log
+        # Check if player has arrows
+        if state.num_arrows == 0:
+            return [NO_ARROWS]
+
+        state.num_arrows -= 1
+
+        # Check if arrow hit the Wumpus
+        if state.wumpus_pos == self.cave[state.player_pos][direction]:
+            state.result = KILLED_WUMPUS
+            return [KILLED_WUMPUS]
+
+        events = [ARROW_MISSED]
+        self.place_wumpus(state)  # Wumpus may move after missed shot
+        # Special warning when out of arrows
+        if state.num_arrows == 0:
+            events.append(OUT_OF_ARROWS)
+        return events
+
+    def throw_rock(self, state, direction):
+        """Handle rock throwing mechanics for scouting"""
+        state.actions.append(THROW << 2 | direction)  # Replay log
+        # Check if player has rocks
+        if state.num_rocks == 0:
+            return [NO_ROCKS]
+
+        state.num_rocks -= 1
+
+        # Determine what's in the target room
+        target = self.cave[state.player_pos][direction]
+        if state.wumpus_pos == target:
+            events = [ROCK_WUMPUS]
+        elif state.has_bats(target):
+            events = [ROCK_BATS]
+        elif state.has_pit(target):
+            events = [ROCK_PIT]
+        else:
+            events = [ROCK_EMPTY]
+
+        # Warn if last rock was used
+        if state.num_rocks == 0:
+            events.append(LAST_ROCK)
+        return events
+
+    def move_wumpus(self, state):
+        """Handle Wumpus movement AI"""
+        if self.neighbor_masks is None:
+            return self.move_big_wumpus(state)
+        cave = self.cave
+        # Behavior depends on whether player has arrows
+        if state.num_arrows > 0:
+            # Passive random movement mode
+            if not self.mobile_wumpus or state.rng.randint(1, 100) > self.wumpus_move_chance:
+                return  # Chance to not move
+
+            # Move to a random adjacent safe room - count the safe exits, then
+            # pick one of them (the cave itself is never reordered or copied)
+            hazards = state.pit_mask | state.bat_mask
+            player_pos = state.player_pos
+            neighbors = cave[state.wumpus_pos]
+            safe = 0
+            for new_room in neighbors:
+                if new_room and new_room != player_pos and not hazards >> new_room & 1:
+                    safe += 1
+            if not safe:
+                return
+            pick = state.rng.randrange(safe)
+            for new_room in neighbors:
+                if new_room and new_room != player_pos and not hazards >> new_room & 1:
+                    if not pick:
+                        state.wumpus_pos = new_room
+                        return
+                    pick -= 1
+        else:
+            # Aggressive chase mode when player is out of arrows
+            player_pos = state.player_pos
+            distances = self.distances
+            hop = distances.next_hop(state.wumpus_pos, player_pos)
+            hazards = state.pit_mask | state.bat_mask
+            # Next room on a shortest path, straight onto the player if adjacent
+            if hop == player_pos or (hop and not hazards >> hop & 1):
+                state.wumpus_pos = hop
+                return
+
+            # Shortest path is blocked by a hazard - take the closest safe room
+            best = None
+            min_dist = UNREACHABLE
+            for new_room in cave[state.wumpus_pos]:
+                if new_room and not hazards >> new_room & 1:
+                    dist = distances.distance(new_room, player_pos)
+                    if dist < min_dist:
+                        min_dist = dist
+                        best = new_room
+            if best:
+                state.wumpus_pos = best
+
+    def move_big_wumpus(self, state):
+        """move_wumpus for big caves, with the hazard rooms in a set instead of a mask"""
+        hazards = room_set(state.pit_mask) | room_set(state.bat_mask)
+        player_pos = state.player_pos
+        neighbors = self.cave[state.wumpus_pos]
+        if state.num_arrows > 0:
+            if not self.mobile_wumpus or state.rng.randint(1, 100) > self.wumpus_move_chance:
+                return
+            safe = [room for room in neighbors if room and room != player_pos and room not in hazards]
+            if safe:  # Same draw and the same pick as move_wumpus
+                state.wumpus_pos = safe[state.rng.randrange(len(safe))]
+        else:
+            distances = self.distances
+            hop = distances.next_hop(state.wumpus_pos, player_pos)
+            if hop == player_pos or (hop and hop not in hazards):
+                state.wumpus_pos = hop
+                return
+            best = None
+            min_dist = UNREACHABLE
+            for new_room in neighbors:
+                if new_room and new_room not in hazards:
+                    dist = distances.distance(new_room, player_pos)
+                    if dist < min_dist:
+                        min_dist = dist
+                        best = new_room
+            if best:
+                state.wumpus_pos = best
+
+    def act(self, state, action, direction):
+        """
+        Apply one player action and count the turn, without resolving the room
+        (front ends that animate the action first call check_room afterwards)
+        Args:
+            state: GameState to advance
+            action: MOVE, SHOOT or THROW
+            direction: UP, DOWN, LEFT or RIGHT
+        Returns the list of event codes of the action
+        """
+        state.turns += 1
+        if action == MOVE:
+            return self.move_player(state, direction)
+        if action == SHOOT:
+            return self.shoot_arrow(state, direction)
+        return self.throw_rock(state, direction)
+
+    def step(self, state, action, direction):
+        """
+        Apply one player action and resolve the room the player ends up in
+        Args:
+            state: GameState to advance
+            action: MOVE, SHOOT or THROW
+            direction: UP, DOWN, LEFT or RIGHT
+        Returns the list of event codes produced this turn
+        """
+        events = self.act(state, action, direction)
+        if state.result is None:
+            events += self.check_room(state)
+        return events
+
+    # --- Batch simulation ---
+
+    def play(self, policy, max_turns=1000, seed=None):
+        """
+        Play one complete game headless
+        Args:
+            policy: callable(engine, state) -> (action, direction), a policy
+                    with an observe(engine, state, action, direction, events)
+                    method is also shown the events of every turn (and of the
+                    start of the game, with action and direction None)
+            max_turns: give up after this many actions (result stays None)
+            seed: seed of the game (None = pick one with self.rng)
+        Returns the finished GameState (state.seed and state.actions replay it)
+        """
+        state = self.new_game(seed)
+        state.policy_rng = random.Random(state.seed ^ POLICY_STREAM)
+        events = self.check_room(state)  # The starting room can already be dangerous
+        observe = getattr(policy, "observe", None)
+        if observe:
+            observe(self, state, None, None, events)
+        while state.result is None and state.turns < max_turns:
+            action, direction = policy(self, state)
+            events = self.step(state, action, direction)
+            if observe:
+                observe(self, state, action, direction, events)
+        return state
+
+    def run_games(self, num_games, policy=None, max_turns=1000, seed=None, first_game=0):
+        """
+        Play many games and collect summary statistics
+        Args:
+            num_games: how many games to play
+            policy: callable(engine, state) -> (action, direction), random_policy by default
+            max_turns: turn limit per game
+            seed: base seed of the run, game i is seeded with game_seed(seed, i)
+                  (None = pick every game's seed with self.rng)
+            first_game: index of the first game, so workers can each play a
+                        slice of the same seeded run
+        Returns a dict of counts, win rate, average turns and games per second
+        """
+        policy = policy or random_policy
+        results = {EATEN: 0, FELL: 0, KILLED_WUMPUS: 0, None: 0}
+        total_turns = 0
+        start = time.perf_counter()
+        for index in range(first_game, first_game + num_games):
+            state = self.play(policy, max_turns,
+                              None if seed is None else game_seed(seed, index))
+            results[state.result] += 1
+            total_turns += state.turns
+        elapsed = time.perf_counter() - start
+        return {
+            "games": num_games,
+            "wins": results[KILLED_WUMPUS],
+            "eaten": results[EATEN],
+            "fell": results[FELL],
+            "timeouts": results[None],
+            "win_rate": results[KILLED_WUMPUS] / num_games if num_games else 0.0,
+            "avg_turns": total_turns / num_games if num_games else 0.0,
+            "games_per_sec": num_games / elapsed if elapsed > 0 else float("inf"),
+        }
+
+
+def random_policy(engine, state):
+    """Baseline policy: walk a random open exit, shoot when the floor is red"""
+    rng = state.policy_rng or engine.rng
+    exits = engine.cave[state.player_pos]
+    if state.num_arrows and engine.wumpus_nearby(state):
+        # Guess which neighbour holds the Wumpus
+        return SHOOT, rng.choice([d for d in DIRECTIONS if exits[d]])
+    return MOVE, rng.choice([d for d in DIRECTIONS if exits[d]])
+
+
+if __name__ == "__main__":
+    # Quick headless benchmark of every difficulty preset
+    for name in DIFFICULTIES:
+        stats = Engine.from_difficulty(name).run_games(20000, seed=0)
+        print(f"{name:6} win {stats['win_rate']:.1%}  eaten {stats['eaten']}  "
+              f"fell {stats['fell']}  avg turns {stats['avg_turns']:.1f}  "
+              f"{stats['games_per_sec']:.0f} games/s")
@@ -0,0 +1,207 @@
+# Reinforcement-learning environments for Hunt the Wumpus
+# Gym-style reset() / step() wrappers around the game rules, so agents can
+# be trained without a Pygame window:
+#   - WumpusEnv plays one game with engine.Engine (same rules as the game)
+#   - VectorEnv plays K games at once with batch.BatchEngine and starts a
+#     new game in every slot that finished, all in one call
+# Both give the same observations: a small int16 array with what a player
+# can see from the current room (see the OBS_* indexes below).
+#
+# Actions are ints 0-11 in the replay byte format: action << 2 | direction
+# (MOVE, SHOOT or THROW, then UP, DOWN, LEFT or RIGHT). Rewards are +1 for
+# killing the Wumpus, -1 for dying and 0 otherwise.
+# Usage: python env.py [envs] [steps]   (VectorEnv speed test)
+import sys         # For command line arguments
+import time        # For timing steps
+
+import numpy as np  # Observation arrays
+
+import engine
+from batch import BatchEngine
+from engine import (BATS, EATEN, FELL, KILLED_WUMPUS,
+                    ROCK_WUMPUS, ROCK_BATS, ROCK_PIT, ROCK_EMPTY)
+
+# Number of actions (3 actions x 4 directions)
+NUM_ACTIONS = 12
+
+# Observation layout
+OBS_ROOM = 0          # Room the player is in
+OBS_EXITS = 1         # 4 values: room behind the up, down, left, right exit (0 = wall)
+OBS_WUMPUS_NEAR = 5   # 1 if the floor is red
+OBS_BATS_NEAR = 6     # 1 if bats squeak nearby
+OBS_PIT_NEAR = 7      # 1 if there is a draft
+OBS_ARROWS = 8        # Arrows carried
+OBS_ROCKS = 9         # Rocks carried
+OBS_ROCK = 10         # What the rock thrown this step found (ROCK_* event, 0 = no throw)
+OBS_CARRIED = 11      # 1 if bats carried the player this step
+OBS_SIZE = 12
+OBS_DTYPE = np.int16
+
+# Rewards
+WIN_REWARD = 1.0
+LOSS_REWARD = -1.0
+STEP_REWARD = 0.0
+
+ROCK_EVENTS = (ROCK_WUMPUS, ROCK_BATS, ROCK_PIT, ROCK_EMPTY)
+
+
+class WumpusEnv:
+    """
+    One game of Hunt the Wumpus behind a Gym-style interface
+    Args:
+        game: engine.Engine to play with (default settings if None)
+        max_turns: steps before an episode is cut off (truncated)
+    """
+    def __init__(self, game=None, max_turns=1000):
+        self.game = game if game is not None else engine.Engine()
+        if self.game.num_rooms > np.iinfo(OBS_DTYPE).max:
+            raise ValueError(f"observations hold room numbers up to {np.iinfo(OBS_DTYPE).max}")
+        self.max_turns = max_turns
+        self.state = None
+
+    @classmethod
+    def from_difficulty(cls, name, max_turns=1000):
+        """Build an environment using one of the engine.DIFFICULTIES presets"""
+        return cls(engine.Engine.from_difficulty(name), max_turns)
+
+    def observe(self, events):
+        """Observation array for the current state after the given events"""
+        game, state = self.game, self.state
+        rock = 0
+        for event in events:
+            if event in ROCK_EVENTS:
+                rock = event
+        carried = BATS in events and state.result is None  # Only a player who lived, as in VectorEnv
+        return np.array([state.player_pos, *game.cave[state.player_pos],
+                         game.wumpus_nearby(state), game.bats_nearby(state),
+                         game.pit_nearby(state), state.num_arrows, state.num_rocks,
+                         rock, carried], dtype=OBS_DTYPE)
+
+    def reset(self, seed=None):
+        """
+        Start a new game
+        Args:
+            seed: seed of the game (None = pick one with the engine's rng)
+        Returns (observation, info) where info holds the game's seed
+        """
+        self.state = self.game.new_game(seed)
+        events = self.game.check_room(self.state)
+        return self.observe(events), {"seed": self.state.seed, "events": events}
+
+    def step(self, action):
+        """
+        Take one action (0-11)
+        Returns (observation, reward, terminated, truncated, info), info
+        holds the turn's event codes
+        """
+        state = self.state
+        events = self.game.step(state, action >> 2, action & 3)
+        terminated = state.result is not None
+        if state.result == KILLED_WUMPUS:
+            reward = WIN_REWARD
+        elif terminated:
+            reward = LOSS_REWARD
+        else:
+            reward = STEP_REWARD
+        truncated = not terminated and state.turns >= self.max_turns
+        return self.observe(events), reward, terminated, truncated, {"events": events}
+
+
+class VectorEnv:
+    """
+    K games stepped together, finished games are replaced by new ones in
+    the same call (the observation returned for such a slot is the first
+    one of its new game)
+    Args:
+        num_envs: number of games K
+        batch: batch.BatchEngine with the game settings (default settings if None)
+        max_turns: steps before an episode is cut off (truncated)
+    """
+    def __init__(self, num_envs, batch=None, max_turns=1000):
+        self.batch = batch if batch is not None else BatchEngine()
+        self.num_envs = num_envs
+        self.max_turns = max_turns
+        self.state = None
+        self.rewards = np.array([STEP_REWARD, LOSS_REWARD, LOSS_REWARD, WIN_REWARD],
+                                dtype=np.float32)  # By result code 0, EATEN, FELL, KILLED_WUMPUS
+        self.result_index = np.zeros(256, dtype=np.int64)
+        self.result_index[[EATEN, FELL, KILLED_WUMPUS]] = (1, 2, 3)
+
+    @classmethod
+    def from_difficulty(cls, name, num_envs, max_turns=1000, seed=None):
+        """Build a vector environment using one of the engine.DIFFICULTIES presets"""
+        return cls(num_envs, BatchEngine.from_difficulty(name, seed=seed), max_turns)
+
+    def observe(self):
+        """Observation array (K x OBS_SIZE) for every game"""
+        batch, s = self.batch, self.state
+        obs = np.empty((len(s), OBS_SIZE), dtype=OBS_DTYPE)
+        obs[:, OBS_ROOM] = s.player
+        obs[:, OBS_EXITS:OBS_EXITS + 4] = batch.cave[s.player]
+        obs[:, OBS_WUMPUS_NEAR] = batch.wumpus_nearby(s)
+        obs[:, OBS_BATS_NEAR] = batch.bats_nearby(s)
+        obs[:, OBS_PIT_NEAR] = batch.pit_nearby(s)
+        obs[:, OBS_ARROWS] = s.num_arrows
+        obs[:, OBS_ROCKS] = s.num_rocks
+        obs[:, OBS_ROCK] = s.rock_result
+        obs[:, OBS_CARRIED] = s.carried & (s.result == 0)  # Only a player who lived, as in WumpusEnv
+        return obs
+
+    def new_games(self, count):
+        """count freshly started games (the starting room is already checked)"""
+        s = self.batch.new_games(count)
+        self.batch.check_room(s)
+        return s
+
+    def reset(self):
+        """Start K new games, returns (observations, info)"""
+        self.state = self.new_games(self.num_envs)
+        return self.observe(), {}
+
+    def step(self, actions):
+        """
+        Take one action (0-11) in every game
+        Returns (observations, rewards, terminated, truncated, info) as
+        arrays of length K
+        """
+        s = self.state
+        actions = np.asarray(actions)
+        action, direction = actions >> 2, actions & 3
+        self.batch.step(s, action, direction)
+        rewards = self.rewards[self.result_index[s.result]]
+        terminated = s.result != 0
+        truncated = ~terminated & (s.turns >= self.max_turns)
+        obs = self.observe()
+
+        # Batched reset of the finished games
+        done = np.flatnonzero(terminated | truncated)
+        if len(done):
+            s.put(done, self.new_games(len(done)))
+            obs[done] = self.observe()[done]
+        return obs, rewards, terminated, truncated, {}
+
+
+def random_actions(rng, count):
+    """Uniformly random actions, mostly moves (for smoke tests and speed checks)"""
+    actions = rng.integers(0, 4, count)                    # MOVE in a random direction
+    special = rng.random(count) < 0.1
+    actions[special] = rng.integers(4, NUM_ACTIONS, special.sum())  # Sometimes shoot or throw
+    return actions
+
+
+if __name__ == "__main__":
+    # Step K games with random actions and report the speed
+    num_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 1 << 16
+    num_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    env = VectorEnv.from_difficulty("Medium", num_envs, seed=0)
+    rng = np.random.default_rng(0)
+    obs, _ = env.reset()
+    episodes = wins = 0
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        obs, rewards, terminated, truncated, _ = env.step(random_actions(rng, num_envs))
+        episodes += np.count_nonzero(terminated | truncated)
+        wins += np.count_nonzero(rewards > 0)
+    elapsed = time.perf_counter() - start
+    print(f"{num_envs} envs x {num_steps} steps  {num_envs * num_steps / elapsed:,.0f} steps/s  "
+          f"{episodes} episodes  {wins} wins")
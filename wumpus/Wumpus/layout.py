@@ -0,0 +1,67 @@
+# Window layout for the Pygame front end
+# Every position and size on screen is worked out here from the size of
+# the surface the game draws on, once when the window opens and again only
+# when it is resized, instead of from fixed 1000x1000 numbers every frame.
+# The original design is a 1000 pixel square. It is scaled to the shorter
+# side of the window and centered, so nothing overflows a 720p window and a
+# 4K one is filled.
+import pygame      # Rects
+
+from engine import UP, DOWN, LEFT, RIGHT
+
+# Size of the square window the original layout was designed for
+DESIGN_SIZE = 1000
+
+# Smallest font size used however small the window gets
+MIN_FONT_SIZE = 12
+
+
+class Layout:
+    """
+    Room geometry, sizes and menu positions for one surface size
+    Args:
+        width: width of the surface everything is drawn on
+        height: height of the surface everything is drawn on
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = (width, height)
+        side = min(width, height)
+        self.scale = side / DESIGN_SIZE  # Design pixels -> surface pixels
+        # Top left corner of the centered design square
+        self.left = (width - side) // 2
+        self.top = (height - side) // 2
+        self.center = self.cx, self.cy = (width // 2, height // 2)
+
+        # Cave walls and the floor circle (red near the Wumpus, black over a pit)
+        self.wall_radius = int(side // 2 * 0.75)
+        self.floor_radius = int(side // 2 * 0.5)
+
+        # Exit passages run from the window edge a third of the way into the room
+        reach_x = self.cx - self.wall_radius + self.wall_radius // 3
+        reach_y = self.cy - self.wall_radius + self.wall_radius // 3
+        thickness = self.px(80)
+        self.exits = {
+            LEFT: pygame.Rect(0, self.cy - thickness // 2, reach_x, thickness),
+            RIGHT: pygame.Rect(width - reach_x, self.cy - thickness // 2, reach_x, thickness),
+            UP: pygame.Rect(self.cx - thickness // 2, 0, thickness, reach_y),
+            DOWN: pygame.Rect(self.cx - thickness // 2, height - reach_y, thickness, reach_y),
+        }
+
+        # Text and animation
+        self.font_size = max(MIN_FONT_SIZE, self.px(36))
+        self.line_gap = self.px(10)  # Space between status text lines
+        self.flight = self.px(300)   # How far an arrow/rock flies from the center
+
+    def px(self, length):
+        """Design length -> surface pixels"""
+        return round(length * self.scale)
+
+    def x(self, design_x):
+        """Design x position -> surface x position"""
+        return self.left + self.px(design_x)
+
+    def y(self, design_y):
+        """Design y position -> surface y position"""
+        return self.top + self.px(design_y)
@@ -0,0 +1,186 @@
+# Load generator for the Hunt the Wumpus server
+# Opens many client connections at once. Each plays games with the random
+# baseline policy (walk a random exit, shoot when the floor is red) and
+# times the round trip of every turn, so the numbers include the socket,
+# the event loop and any queueing, not just the rules. With --players N the
+# clients play shared caves instead, N to a cave, and the size of the delta
+# and percept lines they receive is reported as well.
+# Usage: python loadgen.py --clients 1000 --games 10     (server.py already running)
+#        python loadgen.py --spawn --clients 2000        (starts server.py on a Unix socket first)
+#        python loadgen.py --spawn --players 8           (shared caves of 8 players)
+import argparse    # Command line options
+import asyncio     # Concurrent clients
+import os          # Socket path
+import random      # Client policy choices
+import sys         # Interpreter path for --spawn
+import tempfile    # Folder for the spawned server's socket
+import time        # Round trip timing
+
+import engine
+import server
+
+DIRECTION_NAMES = ("UP", "DOWN", "LEFT", "RIGHT")  # In engine direction order
+
+
+async def play_client(connect, index, args, latencies, totals):
+    """
+    One client: connect, play args.games games, quit
+    Args:
+        connect: coroutine function returning (reader, writer)
+        index: client number (picks the game seeds and the policy stream)
+        latencies: list collecting the turn round trips in seconds
+        totals: dict of games and turns played, updated in place
+    """
+    reader, writer = await connect()
+    rng = random.Random(index)
+    clock = time.perf_counter
+    for game_index in range(args.games):
+        seed = engine.game_seed(args.seed, index * args.games + game_index)
+        writer.write(f"NEW {args.difficulty} {seed}\n".encode())
+        fields = (await reader.readline()).split()
+        turns = 0
+        # Reply fields: OK room up down left right wumpus bats pit arrows rocks result events
+        while fields[0] == b"OK" and fields[11] == b"0" and turns < args.max_turns:
+            exits = [direction for direction in engine.DIRECTIONS if fields[2 + direction] != b"0"]
+            action = "SHOOT" if fields[6] == b"1" and fields[9] != b"0" else "MOVE"
+            writer.write(f"{action} {DIRECTION_NAMES[rng.choice(exits)]}\n".encode())
+            start = clock()
+            fields = (await reader.readline()).split()
+            latencies.append(clock() - start)
+            turns += 1
+        totals["games"] += 1
+        totals["turns"] += turns
+    writer.write(b"QUIT\n")
+    await reader.readline()
+    writer.close()
+
+
+async def play_shared_client(connect, index, args, latencies, totals):
+    """
+    One client of a shared cave: join, play random turns until out or game
+    over, then join the next cave (same arguments as play_client)
+    Every client of a group of args.players joins the same caves
+    """
+    reader, writer = await connect()
+    rng = random.Random(index)
+    clock = time.perf_counter
+    group = index // args.players
+    for game_index in range(args.games):
+        seed = engine.game_seed(args.seed, group * args.games + game_index)
+        writer.write(f"JOIN cave{group}-{game_index} {args.difficulty} {seed}\n".encode())
+        line = await reader.readline()
+        while line[:1] in (b"D", b"N"):  # Lines still coming from the last cave
+            line = await reader.readline()
+        if not line.startswith(b"S"):
+            continue
+        me = next(token[2:] for token in line.split() if token[:2] == b"Y=")
+        out = b"O" + me + b"="
+        can_act = True   # Joined players act in the round they joined
+        start = None     # Time the last action was sent, until its line comes back
+        turns = 0
+        while True:
+            if can_act:
+                action = "SHOOT" if rng.random() < 0.1 else "MOVE"
+                writer.write(f"{action} {rng.choice(DIRECTION_NAMES)}\n".encode())
+                start = clock()
+                can_act = False
+            line = await reader.readline()
+            if not line or line.startswith(b"ERR"):
+                if not line or b"acted" not in line:
+                    break  # Out or game over
+                start = None  # Sent after a round timed out, wait for the next one
+                continue
+            totals["lines"] += 1
+            totals["bytes"] += len(line)
+            if line.startswith(b"N"):
+                continue  # Own percepts, the random players don't use them
+            fields = line.split()
+            if fields[2] == me and start is not None:
+                latencies.append(clock() - start)
+                start = None
+                turns += 1
+            elif fields[2] == b"-":
+                can_act = True  # The Wumpus moved, next round
+            if any(token[:2] == b"G=" or token.startswith(out) for token in fields[3:]):
+                break
+        totals["games"] += 1
+        totals["turns"] += turns
+    writer.write(b"QUIT\n")
+    while (await reader.readline()) not in (b"BYE\n", b""):
+        pass
+    writer.close()
+
+
+async def run_load(connect, args):
+    """Run every client at once, print the results and the server's own statistics"""
+    latencies = []
+    totals = {"games": 0, "turns": 0, "lines": 0, "bytes": 0}
+    client = play_shared_client if args.players else play_client
+    start = time.perf_counter()
+    await asyncio.gather(*(client(connect, index, args, latencies, totals)
+                           for index in range(args.clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else 0.0
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+    print(f"{args.clients} clients  {totals['games']} sessions  {totals['turns']} turns  in {elapsed:.2f} s")
+    print(f"{totals['games'] / elapsed:,.0f} sessions/s  {totals['turns'] / elapsed:,.0f} turns/s  "
+          f"round trip p50 {p50 * 1000:.2f} ms  p99 {p99 * 1000:.2f} ms")
+    if args.players:
+        # Every player gets every turn's delta line and its own percept lines,
+        # a line's size shouldn't grow with the players
+        print(f"{args.players} players a cave  delta/percept lines {totals['bytes'] / max(totals['lines'], 1):.1f} bytes avg  "
+              f"{totals['bytes'] / max(totals['turns'], 1):,.0f} bytes received per own turn")
+
+    reader, writer = await connect()
+    writer.write(b"STATS\nQUIT\n")
+    print("server:", (await reader.readline()).decode().strip())
+    await reader.readline()
+    writer.close()
+
+
+async def spawn_and_run(args):
+    """Start server.py on a Unix socket in a child process, run the load against it, stop it"""
+    path = os.path.join(tempfile.mkdtemp(), "wumpus.sock")
+    child = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"),
+        "--unix", path, "--report", "0", "--max-turns", str(args.max_turns),
+        stdout=asyncio.subprocess.PIPE)
+    await child.stdout.readline()  # "listening on ..."
+    try:
+        await run_load(lambda: asyncio.open_unix_connection(path), args)
+    finally:
+        child.terminate()
+        await child.wait()
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+def main():
+    """Generate load from the command line"""
+    parser = argparse.ArgumentParser(description="Load generator for the Hunt the Wumpus server")
+    parser.add_argument("--clients", type=int, default=1000, help="concurrent connections")
+    parser.add_argument("--games", type=int, default=10, help="games each client plays")
+    parser.add_argument("--players", type=int, default=0,
+                        help="play shared caves with this many players each (0 = one game per client)")
+    parser.add_argument("--difficulty", default="Medium", choices=list(engine.DIFFICULTIES))
+    parser.add_argument("--seed", type=int, default=0, help="base seed of the games")
+    parser.add_argument("--max-turns", type=int, default=server.MAX_TURNS, help="turn limit per game")
+    parser.add_argument("--host", default=server.HOST)
+    parser.add_argument("--port", type=int, default=server.PORT)
+    parser.add_argument("--unix", help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--spawn", action="store_true", help="start a server for the run (Unix socket)")
+    args = parser.parse_args()
+
+    if args.spawn:
+        asyncio.run(spawn_and_run(args))
+    elif args.unix:
+        asyncio.run(run_load(lambda: asyncio.open_unix_connection(args.unix), args))
+    else:
+        asyncio.run(run_load(lambda: asyncio.open_connection(args.host, args.port), args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# Frame profiler for the Pygame front end
+# Times the phases of the main loop (drawing the room, rendering text,
+# flipping the display, waiting for events or for the frame cap) by
+# swapping timed wrappers in for the functions that do the work. Nothing is
+# wrapped while the profiler is off, so the game runs the plain functions
+# and pays nothing for it.
+# When on, it can draw its numbers over the screen (FPS, frame time
+# percentiles, event queue depth, phase times, cache hit rates) and record
+# every timed call to a Chrome trace-event file, which speedscope,
+# Perfetto or chrome://tracing show as a flame chart.
+import json        # Trace file
+import time        # Timing
+from collections import deque  # Rolling window of recent frames
+
+import pygame
+
+# Frames kept for the FPS, percentile and phase figures
+WINDOW = 120
+
+# Phases that block waiting for input or the frame cap instead of working
+# (left out of the frame time, still shown on their own)
+WAIT_PHASES = ("wait", "tick")
+
+# Phase that ends a frame (showing it in the window)
+FRAME_PHASE = "present"
+
+# Overlay look
+FONT_SIZE = 24
+TEXT_COLOR = (255, 255, 0)
+BACKGROUND = (0, 0, 0, 180)  # Translucent black box behind the text
+MARGIN = 8
+
+
+def percentile(values, fraction):
+    """Value below which the given fraction of the sorted values lie"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class Profiler:
+    """
+    Phase timers, stats overlay and trace recorder for the game loop
+    Args:
+        caches: {name: SurfaceCache} whose hit rates are shown
+        window: number of recent frames the figures are taken over
+    """
+    def __init__(self, caches=None, window=WINDOW):
+        self.font = None      # Overlay font, created the first time it is drawn
+        self.caches = caches or {}
+        self.targets = []     # (owner, name, phase, count) wrapped while active
+        self.originals = []   # (owner, name, function) to put back when switched off
+        self.visible = False  # Overlay shown
+        self.trace = None     # Trace events while recording, otherwise None
+        self.origin = time.perf_counter()  # Time 0 of the trace
+
+        # Current frame
+        self.frame_start = None
+        self.phases = {}      # Seconds spent per phase in the current frame
+        self.depth = 0        # Events drained from the queue in the current frame
+
+        # Recent frames
+        self.ends = deque(maxlen=window)      # Time each frame was flipped
+        self.work = deque(maxlen=window)      # Frame time without the waiting
+        self.depths = deque(maxlen=window)    # Events drained per frame
+        self.totals = deque(maxlen=window)    # Phase seconds per frame
+
+    # --- Wrapping ---
+
+    def add(self, owner, name, phase, count=False):
+        """
+        Time every call of owner.name as the given phase while the profiler is on
+        Args:
+            owner: module or object holding the function
+            name: attribute name of the function
+            phase: label shown in the overlay and the trace
+            count: True if the function returns a list of drained events
+        """
+        self.targets.append((owner, name, phase, count))
+
+    @property
+    def active(self):
+        """True while the timed wrappers are in place"""
+        return bool(self.originals)
+
+    def update(self):
+        """Put the wrappers in while the overlay or the trace needs them, take them out otherwise"""
+        wanted = self.visible or self.trace is not None
+        if wanted and not self.originals:
+            for owner, name, phase, count in self.targets:
+                function = getattr(owner, name)
+                self.originals.append((owner, name, function))
+                setattr(owner, name, self.timed(function, phase, count))
+            self.frame_start = None  # The first frame after switching on is not whole
+        elif not wanted and self.originals:
+            for owner, name, function in reversed(self.originals):
+                setattr(owner, name, function)
+            self.originals.clear()
+
+    def timed(self, function, phase, count):
+        """Wrapper of function recording its time as phase"""
+        clock = time.perf_counter
+        frame_end = phase == FRAME_PHASE
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                end = clock()
+                self.record(phase, start, end)
+            if count:
+                self.depth += len(result)
+            if frame_end:
+                self.end_frame(end)
+            return result
+        return wrapper
+
+    # --- Measuring ---
+
+    def record(self, phase, start, end):
+        """Add one timed call to the current frame (and the trace)"""
+        self.phases[phase] = self.phases.get(phase, 0.0) + end - start
+        if self.trace is not None:
+            self.trace.append({"name": phase, "ph": "X", "pid": 0, "tid": 0,
+                               "ts": (start - self.origin) * 1e6, "dur": (end - start) * 1e6})
+
+    def end_frame(self, now):
+        """Close the current frame at time now"""
+        if self.frame_start is not None:
+            waited = sum(self.phases.get(phase, 0.0) for phase in WAIT_PHASES)
+            self.ends.append(now)
+            self.work.append(now - self.frame_start - waited)
+            self.depths.append(self.depth)
+            self.totals.append(self.phases)
+        self.frame_start = now
+        self.phases = {}
+        self.depth = 0
+
+    def stats(self):
+        """Figures over the recent frames as a dict"""
+        frames = len(self.work)
+        span = self.ends[-1] - self.ends[0] if frames > 1 else 0.0
+        work = sorted(self.work)
+        phases = {}
+        for totals in self.totals:
+            for phase, seconds in totals.items():
+                phases[phase] = phases.get(phase, 0.0) + seconds
+        return {
+            "frames": frames,
+            "fps": (frames - 1) / span if span > 0 else 0.0,
+            "p50": percentile(work, 0.50),
+            "p95": percentile(work, 0.95),
+            "p99": percentile(work, 0.99),
+            "events": sum(self.depths) / frames if frames else 0.0,
+            "max_events": max(self.depths, default=0),
+            "phases": {phase: seconds / frames for phase, seconds in phases.items()},
+            "caches": {name: cache.hit_rate() for name, cache in self.caches.items()},
+        }
+
+    # --- Overlay ---
+
+    def toggle(self):
+        """Show or hide the stats overlay"""
+        self.visible = not self.visible
+        self.update()
+
+    def lines(self):
+        """Text lines of the overlay"""
+        s = self.stats()
+        lines = [
+            f"FPS {s['fps']:.1f}  ({s['frames']} frames)",
+            f"Frame p50 {s['p50'] * 1000:.2f}  p95 {s['p95'] * 1000:.2f}  p99 {s['p99'] * 1000:.2f} ms",
+            f"Events/frame {s['events']:.1f}  max {s['max_events']}",
+        ]
+        for phase, seconds in sorted(s["phases"].items(), key=lambda item: -item[1]):
+            lines.append(f"{phase}: {seconds * 1000:.2f} ms/frame")
+        if s["caches"]:
+            lines.append("Cache hits: " + ", ".join(f"{name} {rate:.0%}" for name, rate in s["caches"].items()))
+        return lines
+
+    def draw(self, surface):
+        """
+        Draw the overlay in the top right corner of surface
+        Returns (rect, pixels) - the area covered and a copy of what was
+        there before, so the caller can push the area and then put it back
+        """
+        # Rendered straight with the font so the game's text cache stats stay honest
+        if self.font is None:
+            pygame.font.init()
+            self.font = pygame.font.Font(None, FONT_SIZE)
+        font = self.font
+        texts = [font.render(line, True, TEXT_COLOR) for line in self.lines()]
+        width = max(text.get_width() for text in texts) + 2 * MARGIN
+        height = sum(text.get_height() for text in texts) + 2 * MARGIN
+        x = surface.get_width() - width
+        rect = pygame.Rect(x, 0, width, height).clip(surface.get_rect())
+        under = surface.subsurface(rect).copy()
+        box = pygame.Surface((width, height), pygame.SRCALPHA)
+        box.fill(BACKGROUND)
+        surface.blit(box, (x, 0))
+        y = MARGIN
+        for text in texts:
+            surface.blit(text, (x + MARGIN, y))
+            y += text.get_height()
+        return rect, under
+
+    # --- Trace ---
+
+    def start_trace(self):
+        """Record every timed call from now on"""
+        self.trace = []
+        self.update()
+
+    def save_trace(self, path):
+        """Write the recorded calls as a Chrome trace-event file and stop recording"""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace or [], "displayTimeUnit": "ms"}, f)
+        self.trace = None
+        self.update()
@@ -0,0 +1,43 @@
+# Surface caches for the Pygame front end
+# Rendering text and drawing the cave walls are the expensive parts of a
+# frame, so each surface is built once and reused until it falls out of a
+# small least-recently-used cache. Hit/miss counters show how well it works.
+from collections import OrderedDict  # Keeps entries in least-recently-used order
+
+
+class SurfaceCache:
+    """
+    LRU cache of surfaces built on demand
+    Args:
+        build: callable(*key) -> surface, called on a cache miss
+        max_size: most surfaces kept before the least recently used is dropped
+    """
+    def __init__(self, build, max_size=256):
+        self.build = build
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0    # Lookups answered from the cache
+        self.misses = 0  # Lookups that had to build a new surface
+
+    def get(self, *key):
+        """Return the surface for key, building it if it is not cached"""
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)  # Most recently used goes last
+            return surface
+
+        self.misses += 1
+        surface = self.surfaces[key] = self.build(*key)
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)  # Evict least recently used
+        return surface
+
+    def hit_rate(self):
+        """Fraction of lookups answered from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """Drop every cached surface (e.g. after the font or screen size changes)"""
+        self.surfaces.clear()
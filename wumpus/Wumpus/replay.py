@@ -0,0 +1,159 @@
+# Replay logs for Hunt the Wumpus
+# A game is fully described by its seed and the actions the player took,
+# so a replay file only stores those (one byte per action) plus the engine
+# settings. Re-simulating the file checks that the rules still give every
+# game the same ending - handy for bug reports and for verifying rule changes.
+#
+# File layout (little endian):
+#   header: b"WUMP", version (u8), bats, pits, arrows, rocks (u16 each),
+#           wumpus move chance (u8), mobile wumpus (u8), rooms (u32),
+#           cave checksum (u32)
+#   then per game: seed (u64), result (i8, 0 = unfinished),
+#                  action count (u32), one byte per action (action << 2 | direction)
+import struct      # Packing the binary records
+import sys         # For command line arguments
+import time        # For timing re-simulation
+import zlib        # CRC32 checksum of the cave layout
+from array import array  # Flattening the cave for its checksum
+
+import engine      # Rules that the replays are checked against
+
+MAGIC = b"WUMP"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHHHBBII")
+RECORD = struct.Struct("<QbI")
+
+
+def cave_checksum(cave):
+    """CRC32 of the exits of every room, to catch replays made on another cave"""
+    exits = array("i")
+    for room in range(1, len(cave) + 1):
+        exits.extend(cave[room])
+    return zlib.crc32(exits.tobytes())
+
+
+class ReplayWriter:
+    """
+    Appends finished games to a replay file
+    Args:
+        path: file to write (overwritten)
+        game: engine.Engine the games are played with (its settings go in the header)
+    """
+    def __init__(self, path, game):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(
+            MAGIC, VERSION, game.num_bats, game.num_pits, game.num_arrows, game.num_rocks,
+            game.wumpus_move_chance, game.mobile_wumpus, game.num_rooms, cave_checksum(game.cave)))
+        self.games = 0
+
+    def add(self, state):
+        """Record one game from its seed and action log"""
+        self.file.write(RECORD.pack(state.seed, state.result or 0, len(state.actions)))
+        self.file.write(state.actions)
+        self.games += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_replays(path):
+    """
+    Read a replay file
+    Returns (settings dict, list of (seed, result, actions)) where result
+    is None for unfinished games and actions is a bytes object
+    Raises ValueError if the file is not a replay file or is cut short
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a version {VERSION} replay file")
+    (magic, version, bats, pits, arrows, rocks, move_chance, mobile,
+     num_rooms, checksum) = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} replay file")
+    settings = {
+        "num_bats": bats, "num_pits": pits, "num_arrows": arrows, "num_rocks": rocks,
+        "wumpus_move_chance": move_chance, "mobile_wumpus": bool(mobile),
+        "num_rooms": num_rooms, "checksum": checksum,
+    }
+
+    games = []
+    offset = HEADER.size
+    while offset < len(data):
+        if offset + RECORD.size > len(data):
+            raise ValueError(f"{path} is cut short")
+        seed, result, count = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if offset + count > len(data):
+            raise ValueError(f"{path} is cut short")
+        games.append((seed, result or None, data[offset:offset + count]))
+        offset += count
+    return settings, games
+
+
+def replay_game(game, seed, actions):
+    """Re-simulate one game from its seed and actions, returns the final GameState"""
+    state = game.new_game(seed)
+    game.check_room(state)  # Same start as Engine.play
+    step = game.step
+    for action in actions:
+        step(state, action >> 2, action & 3)
+    return state
+
+
+def verify(path, cave=engine.cave):
+    """
+    Re-simulate every game in a replay file with the current rules
+    Args:
+        path: replay file to check
+        cave: cave the games were recorded on
+    Returns a dict with the number of games, the indexes of the games that
+    now end differently and the re-simulation speed in games per second
+    """
+    settings, games = read_replays(path)
+    if settings["num_rooms"] != len(cave) or settings["checksum"] != cave_checksum(cave):
+        raise ValueError(f"{path} was recorded on a different cave")
+    game = engine.Engine(settings["num_bats"], settings["num_pits"], settings["num_arrows"],
+                         settings["num_rocks"], settings["wumpus_move_chance"],
+                         settings["mobile_wumpus"], cave)
+
+    mismatches = []
+    start = time.perf_counter()
+    for index, (seed, result, actions) in enumerate(games):
+        if replay_game(game, seed, actions).result != result:
+            mismatches.append(index)
+    elapsed = time.perf_counter() - start
+    return {
+        "games": len(games),
+        "mismatches": mismatches,
+        "games_per_sec": len(games) / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+if __name__ == "__main__":
+    # Usage: python replay.py record FILE [games] [difficulty] [seed]
+    #        python replay.py verify FILE
+    if len(sys.argv) < 3 or sys.argv[1] not in ("record", "verify"):
+        sys.exit("usage: python replay.py record FILE [games] [difficulty] [seed]\n"
+                 "       python replay.py verify FILE")
+    command, path = sys.argv[1], sys.argv[2]
+    if command == "record":
+        num_games = int(sys.argv[3]) if len(sys.argv) > 3 else 10000
+        difficulty = sys.argv[4] if len(sys.argv) > 4 else "Medium"
+        base_seed = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+        game = engine.Engine.from_difficulty(difficulty)
+        with ReplayWriter(path, game) as writer:
+            for index in range(num_games):
+                writer.add(game.play(engine.random_policy, seed=engine.game_seed(base_seed, index)))
+        print(f"recorded {num_games} {difficulty} games to {path}")
+    else:
+        stats = verify(path)
+        print(f"{stats['games']} games  {len(stats['mismatches'])} mismatches  "
+              f"{stats['games_per_sec']:.0f} games/s")
+        sys.exit(1 if stats["mismatches"] else 0)
@@ -0,0 +1,385 @@
+# Multiplayer server for Hunt the Wumpus
+# Hosts many independent games on one asyncio event loop over a local TCP
+# or Unix socket. Each connection is a Session (an asyncio.Protocol with
+# __slots__) holding its GameState, and every turn goes through
+# engine.Engine.step (move_player / shoot_arrow / throw_rock + check_room,
+# with the Wumpus moving as in the game). Requests are answered straight
+# from the data_received callback, so there is no coroutine per connection
+# and nothing blocks: a turn is a few microseconds of rules.
+# Connections can also join a named shared cave (see shared.py) and hunt
+# one Wumpus together. Their turns are answered with delta lines, which
+# are encoded once and written to every player in the cave, each followed
+# by that player's own percept line if one is due, and a round that waits
+# too long for someone is ended by a timer.
+#
+# Line protocol (one request line, one reply line, ASCII):
+#   NEW [difficulty] [seed]      start a game (Easy/Medium/Hard, default engine settings otherwise)
+#   JOIN <cave> [difficulty] [seed]  join a shared cave by name (the first player sets it up)
+#   MOVE|SHOOT|THROW <direction> one turn, direction is UP, DOWN, LEFT or RIGHT
+#   LEAVE                        leave the shared cave (replies OK)
+#   STATS                        server statistics (same line as the periodic report)
+#   QUIT                         close the connection
+# Game replies: OK room up down left right wumpus bats pit arrows rocks result events
+#   (exits are room numbers, 0 = wall; wumpus/bats/pit are 1 when sensed nearby;
+#    result is the game over event code or 0 while playing; events are the
+#    turn's engine event codes joined by commas, "-" if none)
+# Shared caves reply to JOIN with a state line and a percept line and to turns
+#   with delta lines and a percept line, and send every player the delta
+#   lines of the others and their own percept lines (shared.py)
+# Errors reply: ERR <message>
+# Usage: python server.py [--port 7777 | --unix PATH] [--report 5]
+import argparse    # Command line options
+import asyncio     # Event loop, sockets
+import time        # Turn latency and rates
+from collections import deque  # Recent turn latencies
+
+import engine
+import telemetry   # Gameplay events recorded to files (--telemetry)
+from shared import SharedGame
+from engine import MOVE, SHOOT, THROW, UP, DOWN, LEFT, RIGHT
+
+# Default address
+HOST = "127.0.0.1"
+PORT = 7777
+
+# Seconds between statistics reports on stdout (0 = no reports)
+REPORT_INTERVAL = 5.0
+
+# Turn latencies kept for the percentiles
+LATENCY_WINDOW = 100000
+
+# A game that runs this long is ended as a timeout (result stays 0)
+MAX_TURNS = 1000
+
+# Seconds a shared cave waits for its players before the Wumpus takes its turn anyway
+ROUND_TIMEOUT = 1.0
+
+# Longest request line accepted (the connection is closed after a longer one)
+MAX_LINE = 1024
+
+ACTIONS = {b"MOVE": MOVE, b"SHOOT": SHOOT, b"THROW": THROW}
+DIRECTION_NAMES = {b"UP": UP, b"DOWN": DOWN, b"LEFT": LEFT, b"RIGHT": RIGHT}
+
+
+class Session(asyncio.Protocol):
+    """
+    One connection and its game
+    Args:
+        server: WumpusServer answering the requests
+    """
+    __slots__ = ("server", "transport", "buffer", "game", "state", "cave", "player")
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = b""  # Start of a request line that hasn't fully arrived
+        self.game = None   # engine.Engine with the game's settings
+        self.state = None  # GameState, None until NEW
+        self.cave = None   # Cave joined, None outside shared caves
+        self.player = 0    # Player id in the cave
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.stats.open += 1
+
+    def connection_lost(self, exc):
+        self.server.stats.open -= 1
+        self.server.leave(self)
+
+    def data_received(self, data):
+        """Answer every complete request line that arrived (replies go out in one write)"""
+        *lines, self.buffer = (self.buffer + data).split(b"\n")
+        if len(self.buffer) > MAX_LINE:
+            self.transport.close()
+            return
+        server = self.server
+        latencies = server.stats.latencies
+        clock = time.perf_counter
+        replies = []
+        for line in lines:
+            start = clock()
+            reply = server.handle(self, line)
+            if reply is None:  # QUIT
+                server.leave(self)
+                replies.append(b"BYE\n")
+                self.transport.write(b"".join(replies))
+                self.transport.close()
+                return
+            replies.append(reply)
+            latencies.append(clock() - start)
+        if replies:
+            self.transport.write(b"".join(replies))
+
+    # A client that doesn't read its replies stops being read from
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+class Cave:
+    """
+    A shared cave and the connections playing in it
+    Args:
+        name: name the players join it by
+        shared: shared.SharedGame
+    """
+    __slots__ = ("name", "shared", "members", "timer", "round")
+
+    def __init__(self, name, shared):
+        self.name = name
+        self.shared = shared
+        self.members = {}  # player id -> Session
+        self.timer = None  # Round timeout (asyncio.TimerHandle)
+        self.round = 0     # Round the timer is set for
+
+
+class Stats:
+    """Counters and turn latencies of the whole server"""
+    __slots__ = ("open", "caves", "sessions", "finished", "turns", "latencies", "last_time", "last")
+
+    def __init__(self):
+        self.open = 0          # Connections open now
+        self.caves = 0         # Shared caves open now
+        self.sessions = 0      # Games started
+        self.finished = 0      # Games that ended (win, loss or timeout)
+        self.turns = 0         # Turns played
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # Seconds per request, newest last
+        self.last_time = time.perf_counter()
+        self.last = (0, 0, 0)  # (sessions, finished, turns) at the last report
+
+    def report(self):
+        """One line with the rates since the last report and the latency percentiles"""
+        now = time.perf_counter()
+        elapsed = max(now - self.last_time, 1e-9)
+        sessions, finished, turns = self.last
+        latencies = sorted(self.latencies)
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+        line = (f"open {self.open}  caves {self.caves}  sessions {(self.sessions - sessions) / elapsed:,.0f}/s  "
+                f"finished {(self.finished - finished) / elapsed:,.0f}/s  "
+                f"turns {(self.turns - turns) / elapsed:,.0f}/s  "
+                f"turn p50 {p50 * 1e6:.0f} us  p99 {p99 * 1e6:.0f} us  (total {self.sessions} sessions)")
+        self.last_time = now
+        self.last = (self.sessions, self.finished, self.turns)
+        return line
+
+
+class WumpusServer:
+    """
+    Runs the games of every connection
+    Args:
+        max_turns: turn limit per game
+    """
+    def __init__(self, max_turns=MAX_TURNS):
+        self.max_turns = max_turns
+        self.stats = Stats()
+        # Engines are shared by every session with the same settings
+        self.engines = {name: engine.Engine.from_difficulty(name) for name in engine.DIFFICULTIES}
+        self.engines[None] = engine.Engine()
+        self.caves = {}  # name -> Cave still playing
+        self.loop = None  # Event loop, for the round timers
+
+    def new_game(self, session, args):
+        """NEW [difficulty] [seed]"""
+        name = args[0].decode().title() if args else None
+        if name not in self.engines:
+            return b"ERR unknown difficulty\n"
+        seed = int(args[1]) if len(args) > 1 else None
+        self.leave(session)
+        session.game = game = self.engines[name]
+        session.state = state = game.new_game(seed)
+        self.stats.sessions += 1
+        return self.reply(session, game.check_room(state))
+
+    def turn(self, session, action, args):
+        """MOVE/SHOOT/THROW <direction>"""
+        direction = DIRECTION_NAMES.get(args[0]) if args else None
+        if direction is None:
+            return b"ERR direction must be UP, DOWN, LEFT or RIGHT\n"
+        if session.cave is not None:
+            cave = session.cave
+            line = cave.shared.act(session.player, action, direction)  # ValueError if it can't act now
+            self.stats.turns += 1
+            data, own = self.send(cave, line, session)
+            return data + own
+        state = session.state
+        if state is None or state.result is not None or state.turns >= self.max_turns:
+            return b"ERR no game in progress\n"
+        events = session.game.step(state, action, direction)
+        self.stats.turns += 1
+        if state.result is not None or state.turns >= self.max_turns:
+            self.stats.finished += 1
+        return self.reply(session, events)
+
+    def reply(self, session, events):
+        """OK line describing what the player can see now"""
+        game, state = session.game, session.state
+        up, down, left, right = game.cave[state.player_pos]
+        return (f"OK {state.player_pos} {up} {down} {left} {right} "
+                f"{int(game.wumpus_nearby(state))} {int(game.bats_nearby(state))} "
+                f"{int(game.pit_nearby(state))} {state.num_arrows} {state.num_rocks} "
+                f"{state.result or 0} {','.join(map(str, events)) or '-'}\n").encode()
+
+    # --- Shared caves ---
+
+    def join(self, session, args):
+        """JOIN <cave> [difficulty] [seed]"""
+        if not args:
+            return b"ERR cave name needed\n"
+        self.leave(session)
+        session.state = None
+        cave = self.caves.get(args[0])
+        if cave is None:
+            name = args[1].decode().title() if len(args) > 1 else None
+            if name not in self.engines:
+                return b"ERR unknown difficulty\n"
+            seed = int(args[2]) if len(args) > 2 else None
+            cave = self.caves[args[0]] = Cave(args[0], SharedGame(self.engines[name], seed))
+            self.stats.caves += 1
+            self.stats.sessions += 1
+        player, line = cave.shared.join()  # ValueError if the cave is full
+        session.cave, session.player = cave, player
+        cave.members[player] = session
+        _, own = self.send(cave, line, session)  # The state line already holds the join
+        return cave.shared.state_line(player).encode() + own
+
+    def leave(self, session):
+        """Take a connection out of its shared cave (if it is in one)"""
+        cave = session.cave
+        if cave is None:
+            return
+        session.cave = None
+        del cave.members[session.player]
+        line = cave.shared.leave(session.player)
+        if cave.members:
+            self.send(cave, line, session)
+        else:
+            self.close_cave(cave)  # Nobody left in it
+
+    def send(self, cave, line, session=None):
+        """
+        Write a shared cave's new lines to its players, each with its own
+        percept line if one is due, and look after the round timer. The
+        delta lines are encoded once for all of them
+        Args:
+            session: the player the lines answer (left out, they are its reply)
+        Returns (encoded delta lines, session's encoded percept line or b"")
+        """
+        data = line.encode()
+        shared = cave.shared
+        private = shared.percept_lines()
+        for player, member in cave.members.items():
+            if member is not session and not member.transport.is_closing():
+                own = private.get(player)
+                member.transport.write(data + own.encode() if own else data)
+        if shared.result is not None:
+            self.close_cave(cave)
+        elif shared.round != cave.round and cave.members:
+            # A new round started: give its players ROUND_TIMEOUT to act
+            if cave.timer is not None:
+                cave.timer.cancel()
+            cave.round = shared.round
+            cave.timer = self.loop.call_later(ROUND_TIMEOUT, self.round_timeout, cave)
+        own = private.get(session.player) if session is not None else None
+        return data, own.encode() if own else b""
+
+    def round_timeout(self, cave):
+        """End a round some players didn't act in"""
+        cave.timer = None
+        if cave.shared.result is None and cave.members:
+            self.send(cave, cave.shared.end_round())
+
+    def close_cave(self, cave):
+        """A shared game is over or empty: stop its timer and free its name"""
+        if cave.timer is not None:
+            cave.timer.cancel()
+            cave.timer = None
+        if self.caves.get(cave.name) is cave:
+            del self.caves[cave.name]
+            self.stats.caves -= 1
+            self.stats.finished += 1
+
+    def handle(self, session, line):
+        """Reply to one request line (None to close the connection)"""
+        words = line.split()
+        if not words:
+            return b"ERR empty request\n"
+        command = words[0].upper()
+        action = ACTIONS.get(command)
+        try:
+            if action is not None:
+                return self.turn(session, action, [word.upper() for word in words[1:2]])
+            if command == b"NEW":
+                return self.new_game(session, words[1:])
+            if command == b"JOIN":
+                return self.join(session, words[1:])
+            if command == b"LEAVE":
+                self.leave(session)
+                return b"OK\n"
+            if command == b"STATS":
+                return (self.stats.report() + "\n").encode()
+            if command == b"QUIT":
+                return None
+        except ValueError as error:  # Bad seed, settings that don't fit the cave, not your turn
+            return f"ERR {error}\n".encode()
+        return b"ERR unknown command\n"
+
+    async def report_loop(self, interval):
+        """Print the statistics every interval seconds"""
+        while True:
+            await asyncio.sleep(interval)
+            print(self.stats.report(), flush=True)
+
+    async def serve(self, host=HOST, port=PORT, unix=None, report=REPORT_INTERVAL, ready=None):
+        """
+        Listen and serve forever
+        Args:
+            host, port: TCP address (port 0 picks a free one)
+            unix: Unix socket path to listen on instead of TCP
+            report: seconds between statistics reports (0 = none)
+            ready: callable(address) run once the server is listening
+        """
+        loop = self.loop = asyncio.get_running_loop()
+        if unix:
+            server = await loop.create_unix_server(lambda: Session(self), unix, backlog=4096)
+            address = unix
+        else:
+            server = await loop.create_server(lambda: Session(self), host, port, backlog=4096)
+            address = "%s:%d" % server.sockets[0].getsockname()[:2]
+        if ready:
+            ready(address)
+        if report > 0:
+            asyncio.create_task(self.report_loop(report))
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """Start the server from the command line"""
+    parser = argparse.ArgumentParser(description="Hunt the Wumpus game server")
+    parser.add_argument("--host", default=HOST, help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=PORT, help="TCP port (0 = any free port)")
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--report", type=float, default=REPORT_INTERVAL,
+                        help="seconds between statistics lines (0 = none)")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS, help="turn limit per game")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args()
+
+    server = WumpusServer(args.max_turns)
+    recorder = telemetry.from_args(args)  # Solo games only, shared caves have their own rules
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, args.report,
+                                 ready=lambda address: print(f"listening on {address}", flush=True)))
+    except KeyboardInterrupt:
+        print(server.stats.report())
+    finally:
+        if recorder is not None:
+            recorder.close()
+            print(recorder.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,577 @@
+# Shared-cave multiplayer rules for Hunt the Wumpus
+# Several players hunt one Wumpus in the same cave. The cave itself (the
+# Wumpus, hazards, items and the random stream) is one GameState shared by
+# everybody, each player only adds a room and an inventory. Play goes in
+# rounds: every player still in the game gets one action per round, applied
+# in the order the actions arrive, and the Wumpus takes one turn when the
+# round is over. While everybody has arrows it wanders as in the single
+# player game, keeping away from every player; once someone runs out it
+# hunts the closest player without arrows and eats whoever is in the room
+# it reaches.
+#
+# Every public change (players' rooms, inventories, bat carries, who is
+# out) is written down as it happens as a short token, and a turn is sent to
+# the players as one delta line of just those tokens instead of the whole
+# state, so a turn costs the same bytes and the same work however many
+# players share the cave (and the server sends the same line to all).
+# A player who joins gets the whole public state once as a state line.
+# Where the Wumpus, the bats, the pits and the items are stays on the
+# server, as in the single player game: each player only gets a short
+# percept line of their own, after their own action and when a round ends
+# (one line per player per round, so still the same cost per turn).
+#
+# Lines (space separated tokens):
+#   S <round> <tokens>           whole public state (sent on joining, Y=<id> is the joiner's id)
+#   D <round> <actor> <tokens>   one turn's public changes, actor is the player id
+#                                or "-" for the Wumpus's turn that ends the round
+#   N <round> <wumpus> <bats> <pit> <events>
+#                                one player's percepts (1 when sensed in a room next
+#                                to them) and the event codes of their own action,
+#                                comma separated ("-" if none), as in the server's OK line
+# Tokens:
+#   P<id>=<room>            player's room (joined, walked or carried by bats)
+#   C<id>                   bats carried the player (its P token follows)
+#   I<id>=<arrows>,<rocks>  player's inventory
+#   O<id>=<event>           player is out (EATEN or FELL event code)
+#   L<id>                   player left the cave
+#   G=<id>                  game over, won by player id (0 = everybody is out)
+# Usage: python shared.py [players...]   (delta check and bytes per turn)
+import random      # For the check's random players
+import sys         # For command line arguments
+import time        # For timing the check
+
+import engine
+from engine import (MOVE, SHOOT, DIRECTIONS, EATEN, FELL, BATS, FOUND_ARROW,
+                    FOUND_ROCK, KILLED_WUMPUS, ARROW_MISSED, OUT_OF_ARROWS, NO_ARROWS,
+                    ROCK_WUMPUS, ROCK_BATS, ROCK_PIT, ROCK_EMPTY, NO_ROCKS, LAST_ROCK,
+                    MOVED, BLOCKED, rooms_in)
+from distances import UNREACHABLE
+
+# Most players in one cave
+MAX_PLAYERS = 64
+
+
+class Player:
+    """
+    One player in a shared cave
+    Args:
+        player_id: number of the player in the cave (from 1)
+        pos: starting room
+    """
+    __slots__ = ("id", "pos", "num_arrows", "num_rocks", "result")
+
+    def __init__(self, player_id, pos):
+        self.id = player_id
+        self.pos = pos
+        self.num_arrows = engine.START_ARROWS
+        self.num_rocks = engine.START_ROCKS
+        self.result = None  # EATEN or FELL once out, None while playing
+
+
+class SharedGame:
+    """
+    One cave that several players play in at once
+    Args:
+        game: engine.Engine with the settings and cave layout
+        seed: seed of the cave's random stream (None = pick one with game.rng)
+    """
+    def __init__(self, game, seed=None):
+        self.game = game
+        # Wumpus, hazards, items and the random stream (its player room is not used)
+        self.world = game.new_game(seed)
+        self.players = {}     # id -> Player, including players who are out
+        self.next_id = 1
+        self.alive = 0        # Players still playing
+        self.unarmed = set()  # Ids of playing players without arrows (the Wumpus hunts them)
+        self.waiting = set()  # Ids of playing players who haven't acted this round
+        self.rooms = {}       # room -> set of playing player ids in it
+        self.player_mask = 0  # Occupancy mask of the rooms with players in them
+        self.round = 1
+        self.result = None    # Id of the winner, 0 if everybody is out, None while playing
+        self.changes = []     # Tokens of the turn in progress
+        self.percepts = {}    # id -> event codes of players owed a percept line
+
+    # --- Players ---
+
+    def join(self):
+        """
+        Add a player in a random room without a hazard or the Wumpus
+        Returns (player id, delta line)
+        Raises ValueError if the game is over or full
+        """
+        if self.result is not None:
+            raise ValueError("game over")
+        if len(self.players) >= MAX_PLAYERS:
+            raise ValueError("cave is full")
+        player = Player(self.next_id, self.start_room())
+        self.next_id += 1
+        self.players[player.id] = player
+        self.alive += 1
+        self.waiting.add(player.id)
+        self.enter(player, player.pos)
+        self.inventory(player)
+        events = self.check_player(player)  # Items lying in the starting room
+        return player.id, self.delta(player.id, events)
+
+    def start_room(self):
+        """
+        Random room without a hazard or the Wumpus, dealt like populate_cave's
+        rooms: the taken rooms go to the front of the deck, then one partial
+        Fisher-Yates step picks from the rest (placement leaves free rooms)
+        """
+        world = self.world
+        taken = rooms_in(world.pit_mask | world.bat_mask | 1 << world.wumpus_pos)
+        swaps = {}
+        for index, room in enumerate(taken):
+            # Rooms are in increasing order, so each is still at deck[room - 1]
+            swaps[room - 1] = swaps.get(index, index + 1)
+            swaps[index] = room
+        return self.game.draw_room(world.rng, swaps, len(taken))
+
+    def leave(self, player_id):
+        """Take a player out of the cave. Returns the delta line (ending the round if it was the last one waited for)"""
+        player = self.players.pop(player_id)
+        self.percepts.pop(player_id, None)
+        if player.result is None:
+            self.remove(player)
+        self.changes.append(f"L{player_id}")
+        line = self.delta(player_id, [])
+        if not self.players:
+            return line  # Nobody left to see the Wumpus move
+        return line + self.close_round()
+
+    def enter(self, player, room):
+        """Put a player in a room"""
+        player.pos = room
+        ids = self.rooms.get(room)
+        if ids is None:
+            ids = self.rooms[room] = set()
+            self.player_mask |= 1 << room
+        ids.add(player.id)
+        self.changes.append(f"P{player.id}={room}")
+
+    def exit_room(self, player):
+        """Take a player out of its room"""
+        ids = self.rooms[player.pos]
+        ids.discard(player.id)
+        if not ids:
+            del self.rooms[player.pos]
+            self.player_mask &= ~(1 << player.pos)
+
+    def move_to(self, player, room):
+        """Move a player from its room to another one"""
+        self.exit_room(player)
+        self.enter(player, room)
+
+    def inventory(self, player):
+        """Record a player's arrows and rocks after they changed"""
+        if player.num_arrows:
+            self.unarmed.discard(player.id)
+        elif player.result is None:
+            self.unarmed.add(player.id)
+        self.changes.append(f"I{player.id}={player.num_arrows},{player.num_rocks}")
+
+    def remove(self, player):
+        """Take a playing player out of the rooms and the round"""
+        self.exit_room(player)
+        self.alive -= 1
+        self.unarmed.discard(player.id)
+        self.waiting.discard(player.id)
+
+    def knock_out(self, player, event):
+        """A player is eaten or falls. Ends the game when nobody is left"""
+        player.result = event
+        self.remove(player)
+        self.changes.append(f"O{player.id}={event}")
+        if not self.alive:
+            self.end(0)
+
+    def end(self, winner):
+        """Game over (winner is a player id, 0 if everybody is out)"""
+        self.result = winner
+        self.waiting.clear()
+        self.changes.append(f"G={winner}")
+
+    def eat_players(self, room):
+        """The Wumpus eats everybody in room"""
+        ids = self.rooms.get(room)
+        if ids:
+            for player_id in list(ids):
+                self.knock_out(self.players[player_id], EATEN)
+
+    # --- Turns ---
+
+    def act(self, player_id, action, direction):
+        """
+        Apply one player's action for this round
+        Args:
+            player_id: id returned by join()
+            action: MOVE, SHOOT or THROW
+            direction: UP, DOWN, LEFT or RIGHT
+        Returns the delta line (followed by the Wumpus's line if it ended the round)
+        Raises ValueError if the player can't act now
+        """
+        player = self.players.get(player_id)
+        if self.result is not None:
+            raise ValueError("game over")
+        if player is None or player.result is not None:
+            raise ValueError("player is out")
+        if player_id not in self.waiting:
+            raise ValueError("already acted this round")
+        self.waiting.discard(player_id)
+        self.world.turns += 1
+        if action == MOVE:
+            events = self.move_player(player, direction)
+        elif action == SHOOT:
+            events = self.shoot_arrow(player, direction)
+        else:
+            events = self.throw_rock(player, direction)
+        if player.result is None and self.result is None:
+            events += self.check_player(player)
+        line = self.delta(player_id, events)
+        return line + self.close_round()
+
+    def close_round(self):
+        """The Wumpus's line if nobody is left to act this round, otherwise nothing"""
+        if self.waiting or self.result is not None:
+            return ""
+        return self.end_round()
+
+    def end_round(self):
+        """
+        Give the Wumpus its turn and start the next round (also called by the
+        server when players take too long). Returns the Wumpus's delta line
+        """
+        if self.result is None:
+            self.move_wumpus()
+            self.eat_players(self.world.wumpus_pos)
+        line = self.delta("-", [])
+        self.round += 1
+        if self.result is None:
+            self.waiting = {player_id for ids in self.rooms.values() for player_id in ids}
+            for player_id in self.waiting:  # The Wumpus may have moved next to anybody
+                self.percepts.setdefault(player_id, [])
+        return line
+
+    def delta(self, actor, events):
+        """The line of the public changes recorded since the last one (events go to the actor only)"""
+        if actor in self.players:  # Not the Wumpus's turn or a player who left
+            self.percepts[actor] = events
+        line = " ".join(["D", str(self.round), str(actor), *self.changes]) + "\n"
+        self.changes.clear()
+        return line
+
+    def percept_lines(self):
+        """The percept lines owed since the last call, as {player id: line}"""
+        lines = {player_id: self.percept_line(self.players[player_id], events)
+                 for player_id, events in self.percepts.items()}
+        self.percepts.clear()
+        return lines
+
+    def percept_line(self, player, events=()):
+        """What one player senses from their room, and the event codes of their action"""
+        game, world = self.game, self.world
+        pos = player.pos
+        return (f"N {self.round} {int(game.check_neighbor_rooms(pos, 1 << world.wumpus_pos))} "
+                f"{int(game.check_neighbor_rooms(pos, world.bat_mask))} "
+                f"{int(game.check_neighbor_rooms(pos, world.pit_mask))} "
+                f"{','.join(map(str, events)) or '-'}\n")
+
+    # --- Rules (the engine's, for one player among several) ---
+
+    def check_player(self, player):
+        """Hazards and items of a player's room, as Engine.check_room. Returns the event codes"""
+        world = self.world
+        events = []
+        while True:
+            if player.pos == world.wumpus_pos:
+                self.knock_out(player, EATEN)
+                events.append(EATEN)
+                return events
+            here = 1 << player.pos
+            if world.pit_mask & here:
+                self.knock_out(player, FELL)
+                events.append(FELL)
+                return events
+
+            bats = world.bat_mask & here
+            if bats:
+                self.bat_teleport(player)
+                events.append(BATS)
+                here = 1 << player.pos
+
+            picked = False
+            if world.arrow_mask & here:
+                player.num_arrows += 1
+                world.arrow_mask ^= here
+                events.append(FOUND_ARROW)
+                picked = True
+            if world.rock_mask & here:
+                player.num_rocks += 1
+                world.rock_mask ^= here
+                events.append(FOUND_ROCK)
+                picked = True
+            if picked:
+                self.inventory(player)
+
+            if not bats:
+                return events
+
+    def bat_teleport(self, player):
+        """Move the bats out of the player's room and drop the player elsewhere"""
+        world = self.world
+        pos = player.pos
+        colony = world.bats_list.index(pos)  # Colonies keep their place in the list
+        world.bats_list[colony] = self.game.random_other_room(world, pos)
+        world.bat_mask = 0
+        for bat_room in world.bats_list:
+            world.bat_mask |= 1 << bat_room
+        self.changes.append(f"C{player.id}")
+        self.move_to(player, self.game.random_other_room(world, pos))
+
+    def move_player(self, player, direction):
+        """Walk through the exit in direction (the Wumpus waits for the end of the round)"""
+        new_room = self.game.cave[player.pos][direction]
+        if new_room <= 0:
+            return [BLOCKED]
+        self.move_to(player, new_room)
+        return [MOVED]
+
+    def shoot_arrow(self, player, direction):
+        """Shoot through an exit: a hit wins the game for the shooter, a miss wakes the Wumpus"""
+        if player.num_arrows == 0:
+            return [NO_ARROWS]
+        player.num_arrows -= 1
+        self.inventory(player)
+        world = self.world
+        if world.wumpus_pos == self.game.cave[player.pos][direction]:
+            self.end(player.id)
+            return [KILLED_WUMPUS]
+
+        events = [ARROW_MISSED]
+        if player.num_arrows == 0:
+            events.append(OUT_OF_ARROWS)
+        # The Wumpus runs to a random room away from the shooter, and eats anybody there
+        world.wumpus_pos = self.game.random_other_room(world, player.pos)
+        self.eat_players(world.wumpus_pos)
+        return events
+
+    def throw_rock(self, player, direction):
+        """Throw a rock through an exit to hear what is there"""
+        if player.num_rocks == 0:
+            return [NO_ROCKS]
+        player.num_rocks -= 1
+        self.inventory(player)
+        world = self.world
+        target = self.game.cave[player.pos][direction]
+        if world.wumpus_pos == target:
+            events = [ROCK_WUMPUS]
+        elif world.bat_mask >> target & 1:
+            events = [ROCK_BATS]
+        elif world.pit_mask >> target & 1:
+            events = [ROCK_PIT]
+        else:
+            events = [ROCK_EMPTY]
+        if player.num_rocks == 0:
+            events.append(LAST_ROCK)
+        return events
+
+    def move_wumpus(self):
+        """
+        The Wumpus's turn at the end of a round: hunt the closest player
+        without arrows, or wander away from everybody while all are armed
+        """
+        game, world = self.game, self.world
+        cave = game.cave
+        hazards = world.pit_mask | world.bat_mask
+        wumpus = world.wumpus_pos
+        if not self.unarmed:
+            # Passive random movement, never into a room with a player in it
+            if not game.mobile_wumpus or world.rng.randint(1, 100) > game.wumpus_move_chance:
+                return
+            blocked = hazards | self.player_mask
+            safe = [room for room in cave[wumpus] if room and not blocked >> room & 1]
+            if safe:
+                world.wumpus_pos = safe[world.rng.randrange(len(safe))]
+            return
+
+        # Closest hunted player (distances to the Wumpus's room share one search in big caves)
+        distances = game.distances
+        target = min((self.players[player_id].pos for player_id in self.unarmed),
+                     key=lambda room: (distances.distance(room, wumpus), room))
+        hop = distances.next_hop(wumpus, target)
+        if not (hop == target or (hop and not hazards >> hop & 1)):
+            # Shortest path is blocked by a hazard - take the closest safe room
+            hop = 0
+            min_dist = UNREACHABLE
+            for new_room in cave[wumpus]:
+                if new_room and not hazards >> new_room & 1:
+                    dist = distances.distance(new_room, target)
+                    if dist < min_dist:
+                        min_dist = dist
+                        hop = new_room
+        if hop:
+            world.wumpus_pos = hop
+
+    # --- Whole state ---
+
+    def state_line(self, you=None):
+        """
+        The whole public state as one line, for a player who just joined
+        Args:
+            you: id of the player it is for (sent as a Y=<id> token)
+        """
+        tokens = [f"Y={you}"] if you is not None else []
+        for player in self.players.values():
+            tokens.append(f"P{player.id}={player.pos}")
+            tokens.append(f"I{player.id}={player.num_arrows},{player.num_rocks}")
+            if player.result is not None:
+                tokens.append(f"O{player.id}={player.result}")
+        if self.result is not None:
+            tokens.append(f"G={self.result}")
+        return f"S {self.round} {' '.join(tokens)}\n"
+
+
+class SharedView:
+    """
+    A client's copy of a shared cave, kept up to date from the state, delta
+    and percept lines. Attributes are plain values a front end can draw from
+    """
+    def __init__(self):
+        self.round = 0
+        self.players = {}    # id -> [room, arrows, rocks, result or None]
+        self.me = None       # Own player id (from the state line)
+        self.result = None
+        self.carried = []    # Ids of the players bats carried in the last line
+        self.senses = (0, 0, 0)  # Wumpus, bats and pit next to own room (from percept lines)
+        self.events = []     # Event codes of own last action
+
+    def apply(self, line):
+        """Update from one S, D or N line"""
+        fields = line.split()
+        self.round = int(fields[1])
+        if fields[0] == "N":
+            self.senses = tuple(int(field) for field in fields[2:5])
+            self.events = [] if fields[5] == "-" else [int(code) for code in fields[5].split(",")]
+            return
+        if fields[0] == "S":
+            me = self.me
+            self.__init__()
+            self.me = me
+            self.round = int(fields[1])
+            tokens = fields[2:]
+        else:
+            tokens = fields[3:]
+        self.carried = []
+        for token in tokens:
+            kind = token[0]
+            key, _, value = token[1:].partition("=")
+            if kind == "P":
+                self.player(key)[0] = int(value)
+            elif kind == "C":
+                self.carried.append(int(key))
+            elif kind == "I":
+                arrows, rocks = value.split(",")
+                player = self.player(key)
+                player[1], player[2] = int(arrows), int(rocks)
+            elif kind == "O":
+                self.player(key)[3] = int(value)
+            elif kind == "L":
+                self.players.pop(int(key), None)
+            elif kind == "Y":
+                self.me = int(value)
+            elif kind == "G":
+                self.result = int(value)
+
+    def player(self, key):
+        """[room, arrows, rocks, result] of a player, added the first time it is seen"""
+        return self.players.setdefault(int(key), [0, 0, 0, None])
+
+
+def matches(view, shared):
+    """True if a SharedView holds the same public state as the SharedGame it follows"""
+    players = {player.id: [player.pos, player.num_arrows, player.num_rocks, player.result]
+               for player in shared.players.values()}
+    # Rooms of players who are out are not kept up to date
+    for values in list(players.values()) + list(view.players.values()):
+        if values[3] is not None:
+            values[0] = None
+    return view.players == players and view.result == shared.result
+
+
+def senses(shared, player_id):
+    """(wumpus, bats, pit) a player senses now, as in its percept lines"""
+    return tuple(int(field) for field in shared.percept_line(shared.players[player_id]).split()[2:5])
+
+
+def play_shared(game, num_players, seed, rng, view=None, max_rounds=200):
+    """
+    Play one shared game with random players
+    Args:
+        game: engine.Engine to play with
+        num_players: players joining at the start
+        seed: seed of the cave
+        rng: random.Random choosing the players' actions
+        view: SharedView of player 1 to follow its lines and check against
+              the game after each one
+    Returns (turns, bytes of delta lines, bytes of percept lines, whether the view always matched)
+    """
+    shared = SharedGame(game, seed)
+    for _ in range(num_players):
+        shared.join()
+    private = shared.percept_lines()
+    if view is not None:
+        view.apply(shared.state_line(1))  # Everybody who joined is in it
+        view.apply(private[1])
+    turns = 0
+    sent = private_sent = 0
+    same = True
+    while shared.result is None and shared.round <= max_rounds:
+        for player_id in list(shared.waiting):
+            if player_id not in shared.waiting:
+                continue  # Eaten earlier in the round
+            action = SHOOT if rng.random() < 0.1 else MOVE
+            line = shared.act(player_id, action, rng.choice(DIRECTIONS))
+            private = shared.percept_lines()
+            turns += 1
+            sent += len(line)
+            private_sent += sum(map(len, private.values()))
+            if view is not None:
+                for part in line.splitlines():
+                    view.apply(part)
+                if 1 in private:
+                    view.apply(private[1])
+                    if view.senses != senses(shared, 1):
+                        same = False
+                if not matches(view, shared):
+                    same = False
+            if shared.result is not None:
+                break
+    return turns, sent, private_sent, same
+
+
+if __name__ == "__main__":
+    # Follow random shared games through one player's lines only, check the
+    # copy never drifts from the real state and show the bytes per turn
+    counts = [int(arg) for arg in sys.argv[1:]] or [2, 8, 32, 64]
+    game = engine.Engine.from_difficulty("Medium")
+    games = 200
+    for num_players in counts:
+        rng = random.Random(num_players)
+        turns = sent = private_sent = same = 0
+        for index in range(games):
+            game_turns, game_bytes, game_private, game_same = play_shared(
+                game, num_players, engine.game_seed(0, index), rng, SharedView())
+            turns += game_turns
+            sent += game_bytes
+            private_sent += game_private
+            same += game_same
+        # The same games again without the checks, for the cost of the rules and the lines
+        rng = random.Random(num_players)
+        start = time.perf_counter()
+        for index in range(games):
+            play_shared(game, num_players, engine.game_seed(0, index), rng)
+        elapsed = time.perf_counter() - start
+        print(f"{num_players:3} players  {turns / games:6.1f} turns/game  "
+              f"{sent / turns:5.1f} delta bytes/turn  {private_sent / turns:5.1f} percept bytes/turn  "
+              f"{elapsed / turns * 1e6:5.1f} us/turn  {same}/{games} views matched")
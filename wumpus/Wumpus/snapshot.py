@@ -0,0 +1,261 @@
+# Game snapshots for Hunt the Wumpus
+# A snapshot packs a game into one fixed-layout binary record: positions,
+# inventory, turns, result, bat rooms, the pit, arrow and rock masks and
+# where its random streams stand. A stream is a random.Random seeded with
+# the game's seed, so where it stands is how many 32-bit words it has drawn.
+# Saving finds that count a whole Mersenne Twister block (624 words) at a
+# time, and restoring skips a freshly seeded stream ahead by it with
+# getrandbits() (a block per call, in C), so nothing is re-simulated.
+# The game then continues exactly where it left off (the same bats, Wumpus
+# moves and policy choices), so the game can resume after quitting and long
+# runs can checkpoint the games they are in the middle of. The action logs
+# follow all the records, so games restored from a snapshot still replay.
+#
+# File layout (little endian):
+#   header: b"WSNP", version (u8), bats, pits, arrows, rocks (u16 each),
+#           wumpus move chance (u8), mobile wumpus (u8), rooms (u32),
+#           cave checksum (u32), snapshot count (u32)
+#   then one record per snapshot, the same size for every snapshot of a file:
+#     player, wumpus (u32), arrows, rocks (u16), turns (u32),
+#     result (i8, 0 = playing), seed (u64), rule stream words drawn (u64),
+#     policy stream words drawn (i64, -1 = no policy stream), action count (u32),
+#     bat rooms (u32 per bat colony, in order),
+#     pit, arrow and rock masks ((rooms + 8) // 8 bytes each)
+#   then the action logs of the snapshots in order, one byte per action
+# Usage: python snapshot.py [games]   (save/restore speed and exactness check)
+import os          # Atomic replace of the snapshot file
+import random      # Random streams skipped to where they stood
+import struct      # Packing the binary records
+import sys         # For command line arguments
+import time        # For timing save/restore
+
+import engine
+from engine import EATEN, FELL, KILLED_WUMPUS
+from replay import cave_checksum  # Same cave check as the replay files
+
+MAGIC = b"WSNP"
+VERSION = 4
+HEADER = struct.Struct("<4sBHHHHBBIII")
+
+# Record fields in front of the bat rooms
+PLAYER, WUMPUS, ARROWS, ROCKS, TURNS, RESULT, SEED, RULE_WORDS, POLICY_WORDS, ACTIONS = range(10)
+NO_POLICY_STREAM = -1
+RESULTS = (0, EATEN, FELL, KILLED_WUMPUS)
+
+# Mersenne Twister state words, regenerated together once all are drawn
+BLOCK_WORDS = 624
+
+# Most blocks a stream is searched for, on top of one per turn played
+SEARCH_BLOCKS = 16
+
+
+def words_drawn(rng, seed, max_blocks):
+    """
+    How many 32-bit words a random.Random has drawn since it was seeded
+    with seed, or None if it isn't within max_blocks blocks of that seed
+    """
+    _, words, _ = rng.getstate()
+    block, index = words[:-1], words[-1]
+    fresh = random.Random(seed)  # Before its first draw, index is BLOCK_WORDS
+    first = 0
+    if index < BLOCK_WORDS:  # Partway through a block, so at least one was generated
+        fresh.getrandbits(32 * BLOCK_WORDS)
+        first = 1
+    for blocks in range(first, max_blocks + 1):
+        _, fresh_words, _ = fresh.getstate()
+        if fresh_words[:-1] == block:
+            return (blocks - 1) * BLOCK_WORDS + index
+        fresh.getrandbits(32 * BLOCK_WORDS)  # Exactly one regeneration
+    return None
+
+
+def skip_words(rng, words):
+    """Draw and drop the given number of 32-bit words from a random.Random"""
+    blocks, rest = divmod(words, BLOCK_WORDS)
+    for _ in range(blocks):  # A block at a time keeps the dropped ints small
+        rng.getrandbits(32 * BLOCK_WORDS)
+    rng.getrandbits(32 * rest)  # getrandbits(k) draws exactly k / 32 words
+
+
+def settings_of(game):
+    """The engine settings stored in a snapshot header, in header order"""
+    return (game.num_bats, game.num_pits, game.num_arrows, game.num_rocks,
+            game.wumpus_move_chance, int(game.mobile_wumpus), game.num_rooms,
+            cave_checksum(game.cave))
+
+
+def record_struct(game):
+    """Fixed-layout struct of one snapshot record for an engine's settings"""
+    mask = (game.num_rooms + 8) // 8
+    return struct.Struct(f"<IIHHIbQQqI{game.num_bats}I{mask}s{mask}s{mask}s")
+
+
+class Snapshots:
+    """
+    Packs and restores GameStates for one engine's settings
+    Args:
+        game: engine.Engine the games are played with
+    """
+    def __init__(self, game):
+        self.game = game
+        self.record = record_struct(game)
+        self.mask_bytes = (game.num_rooms + 8) // 8
+        self.room_limit = 1 << game.num_rooms + 1  # Masks only hold bits of rooms 1..num_rooms
+
+    def pack(self, state):
+        """
+        One snapshot record (bytes) of a game, its action log is stored apart
+        Raises ValueError for a game that can't be restored (no seed or a
+        stream that wasn't seeded with it) or that doesn't fit the settings
+        """
+        if state.seed is None:
+            raise ValueError("a game without a seed can't be restored")
+        if len(state.bats_list) != self.game.num_bats:
+            raise ValueError(f"game has {len(state.bats_list)} bat colonies, settings say {self.game.num_bats}")
+        max_blocks = SEARCH_BLOCKS + state.turns
+        rule_words = words_drawn(state.rng, state.seed, max_blocks)
+        if rule_words is None:
+            raise ValueError(f"game {state.seed} doesn't use its own seeded random stream")
+        if state.policy_rng is None:
+            policy_words = NO_POLICY_STREAM
+        else:
+            policy_words = words_drawn(state.policy_rng, state.seed ^ engine.POLICY_STREAM, max_blocks)
+            if policy_words is None:
+                raise ValueError(f"game {state.seed} has a policy stream that can't be saved")
+        size = self.mask_bytes
+        return self.record.pack(
+            state.player_pos, state.wumpus_pos, state.num_arrows, state.num_rocks, state.turns,
+            state.result or 0, state.seed, rule_words, policy_words, len(state.actions),
+            *state.bats_list,
+            state.pit_mask.to_bytes(size, "little"),
+            state.arrow_mask.to_bytes(size, "little"),
+            state.rock_mask.to_bytes(size, "little"))
+
+    def unpack(self, data, offset=0):
+        """
+        Restore a game from the record at offset in data (its action log is
+        left empty, see load_snapshots)
+        Returns (GameState, number of actions in its log)
+        Raises ValueError if the record is cut short or doesn't describe a
+        game these settings can hold
+        """
+        if offset + self.record.size > len(data):
+            raise ValueError("snapshot record cut short")
+        fields = self.record.unpack_from(data, offset)
+        num_bats, num_rooms = self.game.num_bats, self.game.num_rooms
+        bats = list(fields[ACTIONS + 1:ACTIONS + 1 + num_bats])
+        pits, arrows, rocks = (int.from_bytes(mask, "little") for mask in fields[ACTIONS + 1 + num_bats:])
+        rooms = (fields[PLAYER], fields[WUMPUS], *bats)
+        if (not all(1 <= room <= num_rooms for room in rooms) or fields[RESULT] not in RESULTS
+                or max(pits, arrows, rocks) >= self.room_limit or (pits | arrows | rocks) & 1):
+            raise ValueError(f"snapshot of game {fields[SEED]} doesn't fit a {num_rooms} room cave")
+
+        seed = fields[SEED]
+        state = engine.GameState(seed)
+        state.player_pos, state.wumpus_pos = fields[PLAYER], fields[WUMPUS]
+        state.num_arrows, state.num_rocks = fields[ARROWS], fields[ROCKS]
+        state.turns = fields[TURNS]
+        state.result = fields[RESULT] or None
+        state.bats_list = bats
+        state.bat_mask = 0
+        for room in bats:
+            state.bat_mask |= 1 << room
+        state.pit_mask, state.arrow_mask, state.rock_mask = pits, arrows, rocks
+        skip_words(state.rng, fields[RULE_WORDS])
+        if fields[POLICY_WORDS] != NO_POLICY_STREAM:
+            state.policy_rng = random.Random(seed ^ engine.POLICY_STREAM)
+            skip_words(state.policy_rng, fields[POLICY_WORDS])
+        return state, fields[ACTIONS]
+
+
+def save_snapshots(path, game, states):
+    """
+    Write games to a snapshot file (replaced in one step, so a crash mid-save
+    leaves the previous file intact)
+    Args:
+        path: file to write
+        game: engine.Engine the games are played with (its settings go in the header)
+        states: GameStates to save
+    """
+    snapshots = Snapshots(game)
+    records = [snapshots.pack(state) for state in states]
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, *settings_of(game), len(records)))
+        f.write(b"".join(records))
+        f.write(b"".join(state.actions for state in states))
+    os.replace(temp, path)
+
+
+def load_snapshots(path, game=None):
+    """
+    Read a snapshot file
+    Args:
+        path: file to read
+        game: engine.Engine to check the settings against, or None to build
+              one on the default cave from the file's settings
+    Returns (game, list of GameStates)
+    Raises ValueError if the file is not a snapshot file, was saved with
+    other settings, is cut short or holds a game that doesn't fit the cave
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a version {VERSION} snapshot file")
+    (magic, version, bats, pits, arrows, rocks, move_chance, mobile,
+     num_rooms, checksum, count) = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} snapshot file")
+    if game is None:
+        game = engine.Engine(bats, pits, arrows, rocks, move_chance, bool(mobile))
+    if settings_of(game) != (bats, pits, arrows, rocks, move_chance, mobile, num_rooms, checksum):
+        raise ValueError(f"{path} was saved with other game settings or another cave")
+
+    snapshots = Snapshots(game)
+    states = []
+    logs = HEADER.size + count * snapshots.record.size  # Action logs start after the records
+    if logs > len(data):
+        raise ValueError(f"{path} is cut short")
+    for index in range(count):
+        state, actions = snapshots.unpack(data, HEADER.size + index * snapshots.record.size)
+        state.actions = bytearray(data[logs:logs + actions])
+        logs += actions
+        states.append(state)
+    if logs != len(data):
+        raise ValueError(f"{path} is cut short" if logs > len(data) else f"{path} has bytes after its games")
+    return game, states
+
+
+if __name__ == "__main__":
+    # Snapshot games halfway through, restore them and check they end the same
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    path = "snapshot_check.wsnap"
+    game = engine.Engine.from_difficulty("Medium")
+    states = []
+    for index in range(num_games):
+        state = game.new_game(engine.game_seed(0, index))
+        state.policy_rng = random.Random(state.seed ^ engine.POLICY_STREAM)
+        game.check_room(state)
+        for _ in range(5):  # A few turns in
+            if state.result is None:
+                game.step(state, *engine.random_policy(game, state))
+        states.append(state)
+
+    start = time.perf_counter()
+    save_snapshots(path, game, states)
+    saved = time.perf_counter() - start
+    start = time.perf_counter()
+    _, restored = load_snapshots(path, game)
+    loaded = time.perf_counter() - start
+    size = os.path.getsize(path)
+    os.remove(path)
+
+    def finish(state):
+        while state.result is None and state.turns < 1000:
+            game.step(state, *engine.random_policy(game, state))
+        return state.result, state.turns, bytes(state.actions)
+
+    same = sum(finish(a) == finish(b) for a, b in zip(states, restored))
+    print(f"{num_games} games  {size / num_games:.0f} bytes each  "
+          f"save {num_games / saved:,.0f}/s  restore {num_games / loaded:,.0f}/s  "
+          f"{same}/{num_games} finished the same after restoring")
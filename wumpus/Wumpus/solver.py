@@ -0,0 +1,570 @@
+# Perfect-information solver for Hunt the Wumpus
+# Works out the best possible chance to win for a player who can see the
+# whole cave: where the Wumpus, the bats, the pits and the arrows are. No
+# real player (and not the agent) knows that much, so the result is a
+# ceiling for every policy - the gap between it and agent.Agent is the most
+# any smarter AI could still gain.
+#
+# The game state after populate_cave is finite, so the solver searches it
+# with expectimax: the player picks the best action, then chance moves the
+# Wumpus and drops the player wherever the bats like. Two things keep the
+# search small:
+#   - with an arrow left and the Wumpus in a room the player can walk to
+#     without passing a hazard, the player always wins in the end (now and
+#     then the Wumpus stays put long enough to walk up to it and shoot), so
+#     those states are worth exactly 1 without searching
+#   - every other state (cut off by hazards, or out of arrows) goes into a
+#     transposition table keyed by the whole state packed into one int.
+#     Walking around can come back to the same state, so the values are
+#     found by value iteration over that graph instead of plain recursion.
+#     A search stops after MAX_STATES states (the most likely ones first),
+#     then the value is given as a low-high range
+# Rocks only tell the player things it already knows here, so the solver
+# ignores them, and it plays without a turn limit. Its win chance is an
+# upper bound for that relaxed game, not the optimum of the real one.
+#
+# Solved states can be saved to a policy table file, which is memory-mapped
+# when read back so lookups don't load or parse it.
+# Usage: python solver.py [--games N] [--difficulty NAME] [--tables DIR]
+import argparse    # Command line options
+import heapq       # Most likely states are searched first
+import mmap        # Zero-copy policy tables
+import os          # Policy table paths
+import struct      # Policy table header
+import sys         # Exit status
+import time        # Solve timing
+from array import array    # Writing the policy table
+from bisect import bisect_left  # Looking up packed keys
+from operator import mul        # Expected values
+
+import agent       # Heuristic AI to compare with
+import engine
+from engine import DIRECTIONS, MOVE, SHOOT, THROW, UP, UNREACHABLE, rooms_in
+from replay import cave_checksum
+
+# Value iteration stops once no state's value changes by more than this
+TOLERANCE = 1e-9
+
+# Actions this close to a state's value count as best ones
+TIE = 1e-6
+
+# Most states one solve expands, anything less likely only gets bounds
+MAX_STATES = 5000
+
+# Bits of a packed state key used for the arrow count
+ARROW_BITS = 4
+
+# Graph nodes that end the game
+WIN = 0
+LOSS = 1
+
+# Action code for states that can't be won any more (harmless, just waits)
+NO_WIN = THROW << 2 | UP
+
+# Policy table file (little endian): header, then count sorted u64 keys,
+# count f64 low and count f64 high win chances and count action codes
+# (action << 2 | direction)
+MAGIC = b"WSOL"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHHHBBIIQx")  # Padded to 32 bytes so the keys stay aligned
+
+
+def table_settings(game):
+    """Header fields (after magic and version) that tie a policy table to a game setup"""
+    return (game.num_bats, game.num_pits, game.num_arrows, game.num_rocks,
+            game.wumpus_move_chance, game.mobile_wumpus, game.num_rooms,
+            cave_checksum(game.cave))
+
+
+class PolicyTable:
+    """
+    Read-only policy table file written by Solver.save
+    The file is memory-mapped and the keys, values and action codes are
+    typed views into the mapping, so opening it copies nothing and each
+    lookup is a binary search straight over the file's pages
+    Args:
+        path: table file to open
+    """
+    __slots__ = ("file", "map", "settings", "keys", "lows", "highs", "codes")
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, *settings, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} policy table")
+        self.settings = tuple(settings)
+        view = memoryview(self.map)
+        start = HEADER.size
+        self.keys = view[start:start + 8 * count].cast("Q")
+        start += 8 * count
+        self.lows = view[start:start + 8 * count].cast("d")
+        start += 8 * count
+        self.highs = view[start:start + 8 * count].cast("d")
+        start += 8 * count
+        self.codes = view[start:start + count]
+        view.release()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, key):
+        """(action code, low, high) of a packed state key, or None if it isn't in the table"""
+        keys = self.keys
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            return self.codes[index], self.lows[index], self.highs[index]
+        return None
+
+    def items(self):
+        """All (key, (action code, low, high)) entries in key order"""
+        return zip(self.keys, zip(self.codes, self.lows, self.highs))
+
+    def close(self):
+        """Unmap the file (the table is unusable afterwards)"""
+        if self.map is not None:
+            for name in ("keys", "lows", "highs", "codes"):
+                view = getattr(self, name, None)
+                if view is not None:
+                    view.release()
+            self.map.close()
+            self.file.close()
+            self.map = None
+
+    def __del__(self):
+        self.close()  # The views must go before the mapping they point into
+
+
+class Solver:
+    """
+    Perfect-information player and solver for one game setup
+    Calling it like a policy plays the best action for the state it is
+    given, solving new states the first time it meets them
+    Args:
+        game: engine.Engine with the settings and cave to solve
+        table: PolicyTable with earlier solutions for the same setup (optional)
+        max_states: most states one search expands
+    """
+    def __init__(self, game, table=None, max_states=MAX_STATES):
+        if game.mobile_wumpus and game.wumpus_move_chance >= 100:
+            raise ValueError("the solver needs a Wumpus that sometimes stays put "
+                             "(move chance below 100)")
+        if table is not None and table.settings != table_settings(game):
+            raise ValueError("policy table was made for other game settings")
+        self.game = game
+        self.table = table
+        self.max_states = max_states
+        self.num_rooms = game.num_rooms
+        self.exits = [()] + [tuple(room for room in game.cave[room] if room)
+                             for room in range(1, self.num_rooms + 1)]
+        self.move_chance = game.wumpus_move_chance / 100 if game.mobile_wumpus else 0.0
+
+        # Packed key: pickups mask | pit rooms | bat rooms | arrows | wumpus | player
+        self.room_bits = self.num_rooms.bit_length()
+        key_bits = (self.num_rooms + ARROW_BITS
+                    + (2 + game.num_bats + game.num_pits) * self.room_bits)
+        if key_bits > 64 or engine.START_ARROWS + game.num_arrows >= 1 << ARROW_BITS:
+            raise ValueError(f"game state doesn't fit in a 64-bit key ({key_bits} bits)")
+
+        self.solved = {}    # Packed key -> (action code, low, high) of solved states
+        self.pit_mask = None
+        self.pit_rooms = ()
+        self.labels = {}    # Bat rooms -> safe area label of every room
+
+    # --- State keys ---
+
+    def start(self, state):
+        """Switch to the pit layout of a game (pits never move during a game)"""
+        if state.pit_mask != self.pit_mask:
+            self.pit_mask = state.pit_mask
+            self.pit_rooms = tuple(rooms_in(state.pit_mask))
+            self.labels.clear()
+
+    def pack(self, player, wumpus, arrows, bats, pickups):
+        """The whole state as one int (bats is a sorted tuple of bat rooms)"""
+        key = pickups >> 1  # Room 0 never holds anything
+        for room in self.pit_rooms + bats:
+            key = key << self.room_bits | room
+        key = key << ARROW_BITS | arrows
+        key = key << self.room_bits | wumpus
+        return key << self.room_bits | player
+
+    def state_key(self, state):
+        """Packed key of a GameState"""
+        self.start(state)
+        return self.pack(state.player_pos, state.wumpus_pos, state.num_arrows,
+                         tuple(sorted(state.bats_list)), state.arrow_mask)
+
+    def lookup(self, key):
+        """(action code, low, high) of a solved state, or None"""
+        entry = self.solved.get(key)
+        if entry is None and self.table is not None:
+            entry = self.table.lookup(key)
+        return entry
+
+    # --- Rules ---
+
+    def safe_areas(self, bats):
+        """
+        Label every room with the area of hazard-free rooms it belongs to
+        (0 for pits and bat rooms), cached per bat layout
+        """
+        labels = self.labels.get(bats)
+        if labels is None:
+            hazards = self.pit_mask
+            for room in bats:
+                hazards |= 1 << room
+            labels = [0] * (self.num_rooms + 1)
+            label = 0
+            for first in range(1, self.num_rooms + 1):
+                if labels[first] or hazards >> first & 1:
+                    continue
+                label += 1
+                labels[first] = label
+                stack = [first]
+                while stack:
+                    for room in self.exits[stack.pop()]:
+                        if not labels[room] and not hazards >> room & 1:
+                            labels[room] = label
+                            stack.append(room)
+            self.labels[bats] = labels
+        return labels
+
+    def sure_win(self, player, wumpus, arrows, bats):
+        """True if an arrow is left and the Wumpus is next door or can be walked up to"""
+        if not arrows:
+            return False
+        if wumpus in self.exits[player]:
+            return True
+        labels = self.safe_areas(bats)
+        return labels[wumpus] != 0 and labels[wumpus] == labels[player]
+
+    def wumpus_moves(self, wumpus, player, arrows, bats):
+        """Where the Wumpus can go after the player walks, as (room, chance) pairs"""
+        hazards = self.pit_mask
+        for room in bats:
+            hazards |= 1 << room
+        if arrows:
+            # Passive: stays put or takes a random safe exit
+            safe = [room for room in self.exits[wumpus]
+                    if room != player and not hazards >> room & 1]
+            if not self.move_chance or not safe:
+                return [(wumpus, 1.0)]
+            share = self.move_chance / len(safe)
+            return [(wumpus, 1.0 - self.move_chance)] + [(room, share) for room in safe]
+
+        # Hunting: same choice as Engine.move_wumpus, nothing random about it
+        distances = self.game.distances
+        hop = distances.next_hop(wumpus, player)
+        if hop == player or (hop and not hazards >> hop & 1):
+            return [(hop, 1.0)]
+        best = wumpus
+        min_dist = UNREACHABLE
+        for room in self.exits[wumpus]:
+            if not hazards >> room & 1:
+                dist = distances.distance(room, player)
+                if dist < min_dist:
+                    min_dist = dist
+                    best = room
+        return [(best, 1.0)]
+
+    # --- Search ---
+
+    def node(self, key, decision, state):
+        """Graph node number of a state, adding it (to be expanded) if it is new"""
+        number = self.index.get(key)
+        if number is None:
+            number = len(self.nodes)
+            self.index[key] = number
+            self.nodes.append((decision, state))
+        return number
+
+    def settle(self, player, wumpus, arrows, bats, pickups):
+        """Node of a state where the player stands in a safe room"""
+        if self.sure_win(player, wumpus, arrows, bats):
+            return WIN
+        if not arrows and not pickups:
+            return LOSS  # No arrow left anywhere, the Wumpus can't be killed
+        return self.node(self.pack(player, wumpus, arrows, bats, pickups), True,
+                         (player, wumpus, arrows, bats, pickups))
+
+    def land(self, room, wumpus, arrows, bats, pickups):
+        """Node of the player arriving in room (what check_room would do)"""
+        if room == wumpus or self.pit_mask >> room & 1:
+            return LOSS
+        if room in bats:
+            # Waiting to be carried off, the bats decide where to
+            return self.node(("bats", room, wumpus, arrows, bats, pickups), False,
+                             (room, wumpus, arrows, bats, pickups))
+        if pickups >> room & 1:
+            arrows += 1
+            pickups ^= 1 << room
+        return self.settle(room, wumpus, arrows, bats, pickups)
+
+    def expand(self, number):
+        """
+        Choices of a node as (action code, nodes, chances) triples, bat
+        nodes have a single choice with action code None
+        """
+        decision, (room, wumpus, arrows, bats, pickups) = self.nodes[number]
+        others = [other for other in range(1, self.num_rooms + 1) if other != room]
+
+        if not decision:
+            # Bat teleport: the colony moves to a random other room, then the
+            # player is dropped in a random other room (and picks things up there)
+            outcomes = {}
+            share = 1.0 / len(others) ** 2
+            rest = list(bats)
+            rest.remove(room)
+            for bat_room in others:
+                new_bats = tuple(sorted(rest + [bat_room]))
+                for player in others:
+                    new_arrows, new_pickups = arrows, pickups
+                    if pickups >> player & 1:
+                        new_arrows += 1
+                        new_pickups ^= 1 << player
+                    target = self.land(player, wumpus, new_arrows, new_bats, new_pickups)
+                    outcomes[target] = outcomes.get(target, 0.0) + share
+            return [(None, tuple(outcomes), tuple(outcomes.values()))]
+
+        choices = []
+        exits = self.game.cave[room]
+        for direction in DIRECTIONS:
+            new_room = exits[direction]
+            if not new_room or self.pit_mask >> new_room & 1:
+                continue  # Walls waste the turn, pits end the game
+            # Walking into the Wumpus only ends the game if it stays put (it
+            # gets its move before check_room, like in Engine.step)
+            outcomes = {}
+            for new_wumpus, chance in self.wumpus_moves(wumpus, new_room, arrows, bats):
+                target = self.land(new_room, new_wumpus, arrows, bats, pickups)
+                outcomes[target] = outcomes.get(target, 0.0) + chance
+            choices.append((MOVE << 2 | direction, tuple(outcomes), tuple(outcomes.values())))
+
+        if arrows:
+            # Missing on purpose sends the Wumpus to a random other room
+            direction = next(d for d in DIRECTIONS if exits[d] != wumpus)
+            outcomes = {}
+            for new_wumpus in others:
+                target = self.settle(room, new_wumpus, arrows - 1, bats, pickups)
+                outcomes[target] = outcomes.get(target, 0.0) + 1.0 / len(others)
+            choices.append((SHOOT << 2 | direction, tuple(outcomes), tuple(outcomes.values())))
+        return choices
+
+    def iterate(self, choices, values):
+        """
+        Value iteration over the expanded nodes (the keys of choices), the
+        other nodes keep the values they were given. Starts from the given
+        values, which only go up, and stops once nothing changes
+        """
+        order = sorted(choices, reverse=True)  # Roughly leaves first
+        value_of = values.__getitem__
+        while True:
+            change = 0.0
+            for number in order:
+                best = 0.0
+                for _, targets, chances in choices[number]:
+                    value = sum(map(mul, chances, map(value_of, targets)))
+                    if value > best:
+                        best = value
+                if best - values[number] > change:
+                    change = best - values[number]
+                values[number] = best
+            if change < TOLERANCE:
+                return values
+
+    def solve(self, state):
+        """
+        Best chance to win from a GameState, as (low, high) bounds that are
+        equal unless the search hit max_states. Every state it expanded gets
+        its best action stored (see lookup / save)
+        """
+        if state.result is not None:
+            value = 1.0 if state.result == engine.KILLED_WUMPUS else 0.0
+            return value, value
+        self.start(state)
+        bats = tuple(sorted(state.bats_list))
+        if self.sure_win(state.player_pos, state.wumpus_pos, state.num_arrows, bats):
+            return 1.0, 1.0
+        entry = self.lookup(self.state_key(state))
+        if entry is not None:
+            return entry[1], entry[2]
+
+        # Build the graph of the states this one can lead to, most likely
+        # first (the chance of getting there when every action is tried)
+        self.index = {}
+        self.nodes = [None, None]  # WIN and LOSS
+        root = self.settle(state.player_pos, state.wumpus_pos, state.num_arrows,
+                           bats, state.arrow_mask)
+        choices = {}
+        reach = {root: 1.0}
+        queue = [(-1.0, root)]
+        while queue and len(choices) < self.max_states:
+            chance, number = heapq.heappop(queue)
+            if number in choices or -chance < reach[number]:
+                continue  # Already expanded, or queued again with a better chance
+            choices[number] = self.expand(number)
+            for _, targets, chances in choices[number]:
+                for target, share in zip(targets, chances):
+                    if target > LOSS and target not in choices and reach.get(target, 0.0) < -chance * share:
+                        reach[target] = -chance * share
+                        heapq.heappush(queue, (chance * share, target))
+
+        # States past the end of the search count as lost for the low bound
+        # and as won for the high bound
+        # (the high bound starts from the low one, which is still below it)
+        low = self.iterate(choices, [1.0] + [0.0] * (len(self.nodes) - 1))
+        high = [value if number in choices else 1.0 for number, value in enumerate(low)]
+        high[LOSS] = 0.0
+        self.iterate(choices, high)
+
+        # Pick each state's action among the best ones (by the low bound) so
+        # that it can lead somewhere closer to a win (ties could otherwise
+        # walk in circles)
+        codes = [NO_WIN] * len(self.nodes)
+        done = bytearray(len(self.nodes))
+        done[WIN] = 1
+        changed = True
+        while changed:
+            changed = False
+            for number in choices:
+                if done[number] or low[number] <= 0.0:
+                    continue
+                for code, targets, chances in choices[number]:
+                    value = sum(map(mul, chances, map(low.__getitem__, targets)))
+                    if value >= low[number] - TIE and any(done[target] for target in targets):
+                        done[number] = 1
+                        if code is not None:
+                            codes[number] = code
+                        changed = True
+                        break
+
+        for key, number in self.index.items():
+            if number in choices and self.nodes[number][0]:
+                self.solved[key] = (codes[number], low[number], high[number])
+        del self.index, self.nodes
+        return low[root], high[root]
+
+    # --- Playing ---
+
+    def walk_towards(self, player, wumpus, bats):
+        """First step of a shortest hazard-free walk to a room next to the Wumpus"""
+        hazards = self.pit_mask | 1 << wumpus
+        for room in bats:
+            hazards |= 1 << room
+        first_step = {}
+        frontier = []
+        exits = self.game.cave[player]
+        for direction in DIRECTIONS:
+            room = exits[direction]
+            if room and not hazards >> room & 1 and room not in first_step:
+                first_step[room] = direction
+                frontier.append(room)
+        for room in frontier:  # Grows while it is read, so this is a BFS
+            if wumpus in self.exits[room]:
+                return first_step[room]
+            for next_room in self.exits[room]:
+                if not hazards >> next_room & 1 and next_room not in first_step:
+                    first_step[next_room] = first_step[room]
+                    frontier.append(next_room)
+        return UP  # Not reached when sure_win holds
+
+    def __call__(self, game, state):
+        """Policy interface: the perfect-information best action for state"""
+        self.start(state)
+        player, wumpus, arrows = state.player_pos, state.wumpus_pos, state.num_arrows
+        exits = game.cave[player]
+        if arrows and wumpus in self.exits[player]:
+            return SHOOT, next(d for d in DIRECTIONS if exits[d] == wumpus)
+        bats = tuple(sorted(state.bats_list))
+        if self.sure_win(player, wumpus, arrows, bats):
+            return MOVE, self.walk_towards(player, wumpus, bats)
+        key = self.state_key(state)
+        entry = self.lookup(key)
+        if entry is None:
+            self.solve(state)
+            entry = self.lookup(key)
+        return entry[0] >> 2, entry[0] & 3
+
+    def save(self, path):
+        """Write every solved state (and those of the table it started from) to a policy table file"""
+        entries = dict(self.table.items()) if self.table is not None else {}
+        entries.update(self.solved)
+        keys = sorted(entries)
+        with open(path + ".tmp", "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, *table_settings(self.game), len(keys)))
+            array("Q", keys).tofile(f)
+            array("d", [entries[key][1] for key in keys]).tofile(f)
+            array("d", [entries[key][2] for key in keys]).tofile(f)
+            f.write(bytes(entries[key][0] for key in keys))
+        os.replace(path + ".tmp", path)  # Readers never see half a table
+
+
+def main():
+    """Solve sample games of each preset and compare the upper bound with the AIs"""
+    parser = argparse.ArgumentParser(description="Perfect-information upper bound of Hunt the Wumpus")
+    parser.add_argument("--games", type=int, default=2000, help="games per difficulty")
+    parser.add_argument("--seed", type=int, default=0, help="base seed of the games")
+    parser.add_argument("--difficulty", choices=sorted(engine.DIFFICULTIES),
+                        help="only this preset (default all)")
+    parser.add_argument("--tables", help="directory to read and update the policy tables in")
+    args = parser.parse_args()
+
+    names = [args.difficulty] if args.difficulty else list(engine.DIFFICULTIES)
+    print("bound: best win rate seeing the whole cave, without rocks or a turn limit")
+    print("       (a ceiling for every policy, not the optimum of the real game)")
+    print(f"{'':6} {'bound':>15} {'played':>7} {'agent':>7} {'random':>7}  "
+          f"{'states':>7} {'solve s':>7}")
+    for name in names:
+        game = engine.Engine.from_difficulty(name)
+        path = os.path.join(args.tables, f"{name}.sol") if args.tables else None
+        table = PolicyTable(path) if path and os.path.exists(path) else None
+        solver = Solver(game, table)
+
+        # Best chance to win each game from its starting position
+        start = time.perf_counter()
+        low = high = 0.0
+        cut_short = 0  # Games whose search hit max_states
+        sure_wins = 0  # Games won from the start by walking up to the Wumpus
+        for index in range(args.games):
+            state = game.new_game(engine.game_seed(args.seed, index))
+            game.check_room(state)  # Same start as Engine.play
+            solver.start(state)
+            sure_wins += state.result is None and solver.sure_win(
+                state.player_pos, state.wumpus_pos, state.num_arrows, tuple(sorted(state.bats_list)))
+            game_low, game_high = solver.solve(state)
+            low += game_low
+            high += game_high
+            cut_short += game_high - game_low > TIE
+        elapsed = time.perf_counter() - start
+        bound = f"{low / args.games:.2%}"
+        if high - low >= 5e-5 * args.games:
+            bound += f"-{high / args.games:.2%}"  # The search was cut short somewhere
+
+        # The same games played by the solver itself and by the AIs
+        played = game.run_games(args.games, policy=solver, seed=args.seed)
+        heuristic = game.run_games(args.games, policy=agent.Agent(), seed=args.seed)
+        baseline = game.run_games(args.games, seed=args.seed)
+        print(f"{name:6} {bound:>15} {played['win_rate']:7.1%} "
+              f"{heuristic['win_rate']:7.1%} {baseline['win_rate']:7.1%}  "
+              f"{len(solver.solved) + (len(table) if table else 0):7} {elapsed:7.2f}")
+        if cut_short:
+            print(f"{'':6} {cut_short} of {args.games} games stopped at {solver.max_states} states, "
+                  f"so the bound is a low-high range, not an exact value")
+        if sure_wins == args.games:
+            # Nothing was searched, so there is no policy to compare with
+            print(f"{'':6} every game starts as a sure win, so the bound is trivially 100% "
+                  f"and says nothing about how good the AIs are on {name}")
+        elif sure_wins:
+            print(f"{'':6} {sure_wins} of {args.games} games start as sure wins (bound 100% each)")
+        if path and solver.solved:  # A preset with nothing solved gets no empty table
+            os.makedirs(args.tables, exist_ok=True)
+            solver.save(path)
+        if table is not None:
+            table.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
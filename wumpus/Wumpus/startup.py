@@ -0,0 +1,76 @@
+# Startup time report for Hunt the Wumpus
+# Runs each start-up path in a fresh interpreter with `python -X importtime`,
+# prints the slowest imports and checks the totals against a time budget.
+# Usage: python startup.py   (exits with status 1 if a budget is exceeded)
+import os          # For environment variables and paths
+import subprocess  # Each measurement runs in a clean interpreter
+import sys         # For the interpreter path and exit status
+
+# Folder holding the game modules
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Start-up budgets in milliseconds (wall time of the whole snippet)
+BUDGETS = {
+    "headless": 100,   # import engine, play nothing
+    "terminal": 100,   # import terminal (curses front end, no Pygame)
+    "gui import": 500, # import HuntTheWumpus (must not open a window), mostly pygame itself
+    "gui start": 800,  # import HuntTheWumpus + open the window and load sprites
+}
+
+# Code run for each start-up path
+SNIPPETS = {
+    "headless": "import engine",
+    "terminal": "import terminal",
+    "gui import": "import HuntTheWumpus",
+    "gui start": "import HuntTheWumpus; HuntTheWumpus.init_display(); HuntTheWumpus.get_font()",
+}
+
+# How many of the slowest imports to list per path
+TOP_IMPORTS = 5
+
+
+def measure(snippet):
+    """
+    Run a snippet under -X importtime
+    Returns (total milliseconds, [(cumulative ms, module name), ...] slowest first)
+    """
+    env = dict(os.environ)
+    # Without a real display the window goes to SDL's dummy driver
+    if not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY") and sys.platform.startswith("linux"):
+        env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    code = ("import time; start = time.perf_counter(); " + snippet +
+            "; print((time.perf_counter() - start) * 1000)")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=HERE, env=env, capture_output=True, text=True, check=True)
+
+    # stderr lines look like "import time:  self [us] | cumulative | imported package"
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # Nested imports are indented
+        if depth <= 1:  # Our modules and what they import directly
+            imports.append((int(cumulative) / 1000, name.strip()))
+    imports.sort(reverse=True)
+    return float(result.stdout.strip().splitlines()[-1]), imports
+
+
+def main():
+    """Print the report and return the exit status"""
+    status = 0
+    for name, snippet in SNIPPETS.items():
+        total, imports = measure(snippet)
+        budget = BUDGETS[name]
+        verdict = "ok" if total <= budget else "OVER BUDGET"
+        if total > budget:
+            status = 1
+        print(f"{name:11} {total:7.1f} ms  (budget {budget} ms)  {verdict}")
+        for cumulative, module in imports[:TOP_IMPORTS]:
+            print(f"    {cumulative:7.1f} ms  {module}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# Monte Carlo difficulty sweep for Hunt the Wumpus
+# Plays a policy over a grid of difficulty settings (bats, pits, arrows,
+# rocks, Wumpus move chance) on every core and streams the results to a
+# CSV file, one row per finished chunk of games. Every game's seed comes
+# from the settings and its index, so the numbers don't depend on how many
+# workers ran or in what order, and an interrupted sweep picks up where it
+# stopped by skipping the chunks already in the file.
+#
+# Usage: python sweep.py --bats 1-3 --pits 1,2 --arrows 1-5 --rocks 1-5 \
+#            --move 30-90:30 --games 4000 --out sweep.csv [--parquet summary.parquet]
+import argparse    # Command line options
+import csv         # Streaming results
+import itertools   # Building the settings grid
+import os          # Core count and file checks
+import sys         # Exit status
+import time        # Progress timing
+import zlib        # Stable seed per settings tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed  # One worker per core
+
+import agent       # Belief-state AI policy
+import engine      # Rules, policies and seeding
+
+# Policies a sweep can use, by command line name
+POLICIES = {
+    "random": engine.random_policy,
+    "agent": agent.Agent(),  # Each worker process gets its own copy
+}
+
+# Columns of the streamed chunk file
+SETTINGS = ("bats", "pits", "arrows", "rocks", "move_chance")
+FIELDS = SETTINGS + ("policy", "seed", "chunk_size", "chunk",
+                     "games", "wins", "eaten", "fell", "timeouts", "turns", "win_turns")
+
+
+def parse_values(text):
+    """
+    Parse a list of ints from the command line
+    "1,3,5" -> [1, 3, 5], "1-4" -> [1, 2, 3, 4], "30-90:30" -> [30, 60, 90]
+    """
+    values = []
+    for part in text.split(","):
+        part, _, step = part.partition(":")
+        first, _, last = part.partition("-")
+        values.extend(range(int(first), int(last or first) + 1, int(step or 1)))
+    return values
+
+
+def point_seed(base_seed, point, policy):
+    """Seed of one grid point (same settings + policy always get the same games)"""
+    key = ",".join(map(str, point)) + "," + policy
+    return engine.game_seed(base_seed, zlib.crc32(key.encode()))
+
+
+def run_chunk(point, policy, seed, chunk_size, chunk, max_turns):
+    """
+    Play one chunk of games for a grid point (runs in a worker process)
+    Returns the chunk's row as a dict with the FIELDS keys
+    """
+    game = engine.Engine(*point)
+    play = game.play
+    policy_function = POLICIES[policy]
+    counts = {engine.EATEN: 0, engine.FELL: 0, engine.KILLED_WUMPUS: 0, None: 0}
+    turns = win_turns = 0
+    for index in range(chunk * chunk_size, (chunk + 1) * chunk_size):
+        state = play(policy_function, max_turns, engine.game_seed(seed, index))
+        counts[state.result] += 1
+        turns += state.turns
+        if state.result == engine.KILLED_WUMPUS:
+            win_turns += state.turns
+    row = dict(zip(SETTINGS, point))
+    row.update(policy=policy, seed=seed, chunk_size=chunk_size, chunk=chunk,
+               games=chunk_size, wins=counts[engine.KILLED_WUMPUS],
+               eaten=counts[engine.EATEN], fell=counts[engine.FELL],
+               timeouts=counts[None], turns=turns, win_turns=win_turns)
+    return row
+
+
+def read_rows(path):
+    """All chunk rows in a sweep file (skipping a line cut off by an interruption)"""
+    rows = []
+    if not os.path.exists(path):
+        return rows
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                rows.append({key: row[key] if key == "policy" else int(row[key]) for key in FIELDS})
+            except (KeyError, TypeError, ValueError):
+                continue
+    return rows
+
+
+def current_rows(path, base_seed, chunk_size):
+    """
+    Chunk rows of a sweep file that belong to this sweep (same base seed and
+    chunk size), keyed by (settings, policy, chunk) so repeats count once
+    """
+    rows = {}
+    for row in read_rows(path):
+        point = tuple(row[name] for name in SETTINGS)
+        if row["chunk_size"] == chunk_size and row["seed"] == point_seed(base_seed, point, row["policy"]):
+            rows[point, row["policy"], row["chunk"]] = row
+    return rows
+
+
+def summarize(rows):
+    """Combine chunk rows into one summary dict per grid point and policy"""
+    totals = {}
+    for row in rows:
+        key = tuple(row[name] for name in SETTINGS) + (row["policy"],)
+        total = totals.setdefault(key, dict.fromkeys(
+            ("games", "wins", "eaten", "fell", "timeouts", "turns", "win_turns"), 0))
+        for name in total:
+            total[name] += row[name]
+
+    summary = []
+    for key, total in sorted(totals.items()):
+        games = total["games"]
+        summary.append(dict(
+            zip(SETTINGS + ("policy",), key), games=games,
+            win_rate=total["wins"] / games, eaten_rate=total["eaten"] / games,
+            fell_rate=total["fell"] / games, timeout_rate=total["timeouts"] / games,
+            avg_turns=total["turns"] / games,
+            avg_turns_to_win=total["win_turns"] / total["wins"] if total["wins"] else 0.0))
+    return summary
+
+
+def write_parquet(summary, path):
+    """Write the summary table to a Parquet file (needs pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("--parquet needs pyarrow (pip install pyarrow)")
+    pq.write_table(pa.Table.from_pylist(summary), path)
+
+
+def main():
+    """Run (or resume) a sweep and print the summary, returns the exit status"""
+    parser = argparse.ArgumentParser(description="Sweep difficulty settings with Monte Carlo games")
+    parser.add_argument("--bats", default="1-3", help="bat colonies, e.g. 1,2 or 1-3")
+    parser.add_argument("--pits", default="1-2", help="pits")
+    parser.add_argument("--arrows", default="1,3,5", help="arrows in the cave")
+    parser.add_argument("--rocks", default="1,3,5", help="rocks in the cave")
+    parser.add_argument("--move", default="30-90:30", help="Wumpus move chance percentages")
+    parser.add_argument("--policy", default="random", choices=sorted(POLICIES))
+    parser.add_argument("--games", type=int, default=2000,
+                        help="games per grid point (rounded up to whole chunks)")
+    parser.add_argument("--chunk", type=int, default=500, help="games per worker task")
+    parser.add_argument("--max-turns", type=int, default=1000, help="turn limit per game")
+    parser.add_argument("--seed", type=int, default=0, help="base seed of the sweep")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--out", default="sweep.csv", help="chunk results (appended, resumable)")
+    parser.add_argument("--parquet", help="also write the summary to this Parquet file")
+    args = parser.parse_args()
+
+    # Grid points that fit in the cave
+    grid = []
+    for point in itertools.product(parse_values(args.bats), parse_values(args.pits),
+                                   parse_values(args.arrows), parse_values(args.rocks),
+                                   parse_values(args.move)):
+        try:
+            engine.check_placement(engine.NUM_ROOMS, *point[:4])
+        except ValueError as error:
+            print(f"skipping {point}: {error}")
+            continue
+        grid.append(point)
+
+    # Chunks already in the file (same seed and chunk size) are not played again
+    chunks = -(-args.games // args.chunk)
+    done = current_rows(args.out, args.seed, args.chunk)
+    tasks = [(point, args.policy, point_seed(args.seed, point, args.policy), args.chunk, chunk, args.max_turns)
+             for point in grid for chunk in range(chunks)
+             if (point, args.policy, chunk) not in done]
+    print(f"{len(grid)} settings x {chunks} chunks of {args.chunk} games, "
+          f"{len(tasks)} chunks to play on {args.workers} workers")
+
+    # Stream each finished chunk to the file as soon as it arrives
+    new_file = not os.path.exists(args.out) or os.path.getsize(args.out) == 0
+    cut_off = False
+    if not new_file:
+        with open(args.out, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            cut_off = f.read(1) != b"\n"
+    with open(args.out, "a", newline="") as f:
+        if cut_off:
+            f.write("\n")  # Finish a line cut off by an interruption
+        writer = csv.DictWriter(f, FIELDS)
+        if new_file:
+            writer.writeheader()
+        start = time.perf_counter()
+        with ProcessPoolExecutor(args.workers) as executor:
+            futures = [executor.submit(run_chunk, *task) for task in tasks]
+            try:
+                for finished, future in enumerate(as_completed(futures), 1):
+                    writer.writerow(future.result())
+                    f.flush()
+                    if finished % 50 == 0 or finished == len(tasks):
+                        elapsed = time.perf_counter() - start
+                        print(f"  {finished}/{len(tasks)} chunks  "
+                              f"{finished * args.chunk / elapsed:.0f} games/s")
+            except KeyboardInterrupt:
+                executor.shutdown(cancel_futures=True)
+                print(f"interrupted, run the same command again to resume from {args.out}")
+                return 130
+
+    # Summary of the requested grid (including chunks from earlier runs)
+    rows = current_rows(args.out, args.seed, args.chunk)
+    summary = summarize(rows[point, args.policy, chunk]
+                        for point in grid for chunk in range(chunks))
+    print(f"{'bats':>4} {'pits':>4} {'arrows':>6} {'rocks':>5} {'move':>4}  "
+          f"{'win':>6} {'eaten':>6} {'fell':>6}  {'turns':>5} {'to win':>6}")
+    for row in summary:
+        print(f"{row['bats']:4} {row['pits']:4} {row['arrows']:6} {row['rocks']:5} "
+              f"{row['move_chance']:4}  {row['win_rate']:6.1%} {row['eaten_rate']:6.1%} "
+              f"{row['fell_rate']:6.1%}  {row['avg_turns']:5.1f} {row['avg_turns_to_win']:6.1f}")
+    if args.parquet:
+        write_parquet(summary, args.parquet)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
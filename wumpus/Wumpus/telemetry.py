@@ -0,0 +1,355 @@
+# Gameplay telemetry for Hunt the Wumpus
+# Records what happens in real games as structured events for analytics:
+# moves, shots, rock results, bat carries, pickups, Wumpus moves and deaths
+# by cause. Like the frame profiler it swaps wrappers in for the engine's
+# rule methods (check_room, bat_teleport, move_player, shoot_arrow,
+# throw_rock and move_wumpus), so while it is off the engine runs the plain
+# methods and nothing is recorded or paid for.
+# An event is a small tuple put on a bounded queue without waiting. If the
+# writer falls behind, the event is dropped and counted instead, so the game
+# loop can never be held up by telemetry. A background thread takes the
+# events off in batches and writes them to rotating files of
+# newline-delimited JSON, or Parquet columns (needs pyarrow). A file is
+# named *.part while it is being written and renamed once complete, so
+# collectors only ever pick up whole files.
+#
+# Event fields (FIELDS): time, game (seed), turn (actions so far), event, room, target, detail
+#   move     player walked from room towards target (detail "blocked" if there was no exit)
+#   shot     arrow shot from room into target, detail hit / miss / no_arrows
+#   rock     rock thrown from room into target, detail wumpus / bats / pit / empty / no_rocks
+#   bats     bats carried the player from room to target (one event per carry)
+#   pickup   arrow or rock (detail) found in room
+#   death    player eaten or fell (detail) in room
+#   wumpus   Wumpus moved from room to target, detail hunt (player out of arrows) or wander
+# Usage: python telemetry.py [games] [folder]   (overhead, drops and files check)
+import json        # Newline-delimited JSON files
+import os          # Paths and renaming finished files
+import queue       # Bounded event queue
+import shutil      # Removing the check's folder
+import sys         # For command line arguments
+import tempfile    # Folder for the check's files
+import threading   # Background writer
+import time        # Event times and file rotation
+
+import engine
+from engine import (EATEN, FELL, BATS, FOUND_ARROW, FOUND_ROCK, KILLED_WUMPUS, ARROW_MISSED,
+                    NO_ARROWS, ROCK_WUMPUS, ROCK_BATS, ROCK_PIT, ROCK_EMPTY, NO_ROCKS)
+
+FIELDS = ("time", "game", "turn", "event", "room", "target", "detail")
+FORMATS = ("jsonl", "parquet")
+
+# Events waiting for the writer before new ones are dropped
+QUEUE_SIZE = 65536
+
+# Most events written in one go, and the longest the writer waits to fill a batch
+BATCH_SIZE = 1024
+FLUSH_INTERVAL = 0.5
+
+# A file is finished after this many events or seconds, whichever comes first
+ROTATE_EVENTS = 100000
+ROTATE_SECONDS = 300.0
+
+# Details of the events, by engine event code
+SHOT_DETAILS = {KILLED_WUMPUS: "hit", ARROW_MISSED: "miss", NO_ARROWS: "no_arrows"}
+ROCK_DETAILS = {ROCK_WUMPUS: "wumpus", ROCK_BATS: "bats", ROCK_PIT: "pit",
+                ROCK_EMPTY: "empty", NO_ROCKS: "no_rocks"}
+DEATHS = {EATEN: "eaten", FELL: "fell"}
+PICKUPS = {FOUND_ARROW: "arrow", FOUND_ROCK: "rock"}
+
+STOP = None  # Put on the queue to make the writer finish
+
+
+class Telemetry:
+    """
+    Event bus from the engine's rules to rotating event files
+    Args:
+        folder: where the event files go (created if needed)
+        format: "jsonl" or "parquet"
+        queue_size: events that can wait for the writer before new ones are dropped
+        batch_size: most events written in one go
+        rotate_events, rotate_seconds: when a file is finished and a new one started
+    Raises ImportError for Parquet without pyarrow
+    """
+    def __init__(self, folder, format="jsonl", queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 rotate_events=ROTATE_EVENTS, rotate_seconds=ROTATE_SECONDS):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        if format == "parquet":
+            try:
+                import pyarrow  # noqa: F401 - only checked here, the writer imports it
+            except ImportError:
+                raise ImportError("Parquet telemetry needs pyarrow (pip install pyarrow)") from None
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.format = format
+        self.batch_size = batch_size
+        self.rotate_events = rotate_events
+        self.rotate_seconds = rotate_seconds
+        self.queue = queue.Queue(queue_size)
+        self.originals = []  # (owner, name, function) to put back on detach
+        self.hops = []       # Rooms the bats dropped the player in during one check_room
+
+        # Counters (emitted and dropped by the game's thread, the rest by the writer)
+        self.emitted = 0   # Events produced
+        self.dropped = 0   # Events lost because the queue was full
+        self.written = 0   # Events in finished or open files
+        self.files = 0     # Files started
+
+        # File being written (writer thread only)
+        self.file = None
+        self.part_path = None
+        self.file_events = 0
+        self.file_start = 0.0
+        self.rows = []     # Parquet rows of the open file
+
+        self.thread = threading.Thread(target=self.writer, name="telemetry", daemon=True)
+        self.thread.start()
+
+    # --- Producing events ---
+
+    def emit(self, state, turn, event, room, target=0, detail=""):
+        """Queue one event without waiting (dropped and counted if the queue is full)"""
+        self.emitted += 1
+        try:
+            self.queue.put_nowait((time.time(), state.seed, turn, event, room, target, detail))
+        except queue.Full:
+            self.dropped += 1
+
+    def attach(self, owner=engine.Engine):
+        """Start recording every game played with owner's rules (engine.Engine by default)"""
+        if self.originals:
+            return
+        for name, wrap in (("check_room", self.wrap_check_room), ("bat_teleport", self.wrap_bat_teleport),
+                           ("move_player", self.wrap_move_player),
+                           ("shoot_arrow", self.wrap_shoot_arrow), ("throw_rock", self.wrap_throw_rock),
+                           ("move_wumpus", self.wrap_move_wumpus)):
+            function = getattr(owner, name)
+            self.originals.append((owner, name, function))
+            setattr(owner, name, wrap(function))
+
+    def detach(self):
+        """Stop recording and put the plain rules back"""
+        for owner, name, function in reversed(self.originals):
+            setattr(owner, name, function)
+        self.originals.clear()
+
+    def wrap_check_room(self, function):
+        """check_room recording bat carries, pickups and deaths in the room each happened in"""
+        emit, hops = self.emit, self.hops
+
+        def check_room(game, state):
+            room = state.player_pos
+            hops.clear()
+            events = function(game, state)
+            turn = len(state.actions)
+            carried = iter(hops)  # The bats can carry the player more than once
+            for event in events:
+                if event == BATS:
+                    target = next(carried)
+                    emit(state, turn, "bats", room, target)
+                    room = target
+                elif event in PICKUPS:
+                    emit(state, turn, "pickup", room, 0, PICKUPS[event])
+                elif event in DEATHS:
+                    emit(state, turn, "death", room, 0, DEATHS[event])
+            return events
+        return check_room
+
+    def wrap_bat_teleport(self, function):
+        """bat_teleport noting where each carry dropped the player (for check_room)"""
+        hops = self.hops
+
+        def bat_teleport(game, state):
+            function(game, state)
+            hops.append(state.player_pos)
+        return bat_teleport
+
+    def wrap_move_player(self, function):
+        """move_player recording the move (before the Wumpus's answer to it)"""
+        emit = self.emit
+
+        def move_player(game, state, direction):
+            room = state.player_pos
+            target = game.cave[room][direction]
+            emit(state, len(state.actions) + 1, "move", room, target, "" if target > 0 else "blocked")
+            return function(game, state, direction)
+        return move_player
+
+    def wrap_shoot_arrow(self, function):
+        """shoot_arrow recording the shot and whether it hit"""
+        emit = self.emit
+
+        def shoot_arrow(game, state, direction):
+            room = state.player_pos
+            events = function(game, state, direction)
+            emit(state, len(state.actions), "shot", room, game.cave[room][direction], SHOT_DETAILS[events[0]])
+            return events
+        return shoot_arrow
+
+    def wrap_throw_rock(self, function):
+        """throw_rock recording what the rock found"""
+        emit = self.emit
+
+        def throw_rock(game, state, direction):
+            events = function(game, state, direction)
+            room = state.player_pos
+            emit(state, len(state.actions), "rock", room, game.cave[room][direction], ROCK_DETAILS[events[0]])
+            return events
+        return throw_rock
+
+    def wrap_move_wumpus(self, function):
+        """move_wumpus recording where the Wumpus went"""
+        emit = self.emit
+
+        def move_wumpus(game, state):
+            room = state.wumpus_pos
+            hunting = state.num_arrows == 0
+            function(game, state)
+            if state.wumpus_pos != room:
+                emit(state, len(state.actions), "wumpus", room, state.wumpus_pos,
+                     "hunt" if hunting else "wander")
+        return move_wumpus
+
+    # --- Writing ---
+
+    def writer(self):
+        """Background thread: write the queued events in batches until STOP"""
+        get = self.queue.get
+        get_nowait = self.queue.get_nowait
+        while True:
+            try:
+                batch = [get(timeout=FLUSH_INTERVAL)]
+            except queue.Empty:
+                self.rotate_if_old()
+                continue
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(get_nowait())
+            except queue.Empty:
+                pass
+            stop = batch[-1] is STOP
+            if stop:
+                batch.pop()
+            if batch:
+                self.write(batch)
+            if stop:
+                self.finish_file()
+                return
+            self.rotate_if_old()
+
+    def write(self, batch):
+        """Write a batch of events to the open file, starting new files as they fill up"""
+        while batch:
+            if self.file is None and not self.rows:
+                self.start_file()
+            room = self.rotate_events - self.file_events
+            part, batch = batch[:room], batch[room:]
+            if self.format == "jsonl":
+                self.file.write("".join(json.dumps(dict(zip(FIELDS, row))) + "\n" for row in part))
+                self.file.flush()  # A batch is visible to tail -f at once
+            else:
+                self.rows.extend(part)
+            self.file_events += len(part)
+            self.written += len(part)
+            if self.file_events >= self.rotate_events:
+                self.finish_file()
+
+    def start_file(self):
+        """Open the next event file (as *.part)"""
+        self.files += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"events-{stamp}-{self.files:04d}.{self.format}"
+        self.part_path = os.path.join(self.folder, name + ".part")
+        self.file = open(self.part_path, "w") if self.format == "jsonl" else None
+        self.file_events = 0
+        self.file_start = time.monotonic()
+
+    def rotate_if_old(self):
+        """Finish the open file once it has been open rotate_seconds"""
+        if self.part_path is not None and time.monotonic() - self.file_start >= self.rotate_seconds:
+            self.finish_file()
+
+    def finish_file(self):
+        """Close the open file and give it its final name"""
+        if self.part_path is None:
+            return
+        if self.format == "jsonl":
+            self.file.close()
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            columns = {name: [row[index] for row in self.rows] for index, name in enumerate(FIELDS)}
+            pq.write_table(pa.Table.from_pydict(columns), self.part_path)
+            self.rows = []
+        os.replace(self.part_path, self.part_path[:-len(".part")])
+        self.file = self.part_path = None
+
+    # --- Closing ---
+
+    def close(self):
+        """Stop recording, write what is queued, finish the open file and wait for the writer"""
+        self.detach()
+        self.queue.put(STOP)  # Waits for room if the queue is full, the writer is still draining it
+        self.thread.join()
+
+    def summary(self):
+        """One line with the counters"""
+        return (f"telemetry: {self.emitted} events  {self.written} written  "
+                f"{self.dropped} dropped  {self.files} files in {self.folder}")
+
+
+def add_arguments(parser):
+    """Add the telemetry options to a front end's argparse parser"""
+    parser.add_argument("--telemetry", metavar="FOLDER", help="record gameplay events to files in FOLDER")
+    parser.add_argument("--telemetry-format", choices=FORMATS, default="jsonl",
+                        help="event file format (parquet needs pyarrow)")
+
+
+def from_args(args):
+    """Telemetry recording the engine for parsed add_arguments() options (None if not asked for)"""
+    if not args.telemetry:
+        return None
+    try:
+        telemetry = Telemetry(args.telemetry, args.telemetry_format)
+    except ImportError as error:
+        sys.exit(str(error))
+    telemetry.attach()
+    return telemetry
+
+
+if __name__ == "__main__":
+    # Play games with and without telemetry, check every event is written or
+    # counted as dropped, then flood a small queue to show drops never block
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    folder = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp(prefix="telemetry-")
+    game = engine.Engine.from_difficulty("Medium")
+
+    plain = game.run_games(num_games, seed=0)
+    telemetry = Telemetry(folder, rotate_events=50000)
+    telemetry.attach()
+    recorded = game.run_games(num_games, seed=0)
+    telemetry.close()
+    lines = 0
+    for name in os.listdir(folder):
+        if name.endswith(".jsonl"):
+            with open(os.path.join(folder, name)) as f:
+                lines += sum(1 for _ in f)
+    print(f"{num_games} games  plain {plain['games_per_sec']:,.0f} games/s  "
+          f"recorded {recorded['games_per_sec']:,.0f} games/s  same results {plain['wins'] == recorded['wins']}")
+    print(telemetry.summary())
+    print(f"{lines} lines on disk  written + dropped = emitted: "
+          f"{telemetry.written + telemetry.dropped == telemetry.emitted}")
+
+    # A tiny queue the writer can't keep up with: events are dropped, turns never wait
+    flood = Telemetry(os.path.join(folder, "flood"), queue_size=256, batch_size=64)
+    flood.attach()
+    state = game.new_game(1)
+    slowest = 0.0
+    for _ in range(200000):
+        start = time.perf_counter()
+        flood.emit(state, 0, "move", 1, 2)
+        slowest = max(slowest, time.perf_counter() - start)
+    flood.close()
+    print(f"flood: {flood.summary()}  slowest emit {slowest * 1e6:.0f} us")
+    if len(sys.argv) <= 2:
+        shutil.rmtree(folder)
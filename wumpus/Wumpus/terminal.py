@@ -0,0 +1,338 @@
+# Terminal front end for Hunt the Wumpus
+# Plays the same game as the Pygame window inside a terminal with curses,
+# for SSH sessions and machines without a display. The room is drawn like
+# draw_room draws it (the round cave with its exit passages, the floor
+# turning red next to the Wumpus, the bat and draft hints and the
+# inventory), the keys come from the same keybind settings and every turn
+# goes through engine.Engine. Nothing here loads SDL, fonts or sprites, and
+# curses only sends the characters that changed to the terminal.
+# Usage: python terminal.py [--difficulty Medium] [--seed N]
+import argparse    # Command line options
+import math        # Room outline
+import sys         # For exiting
+
+try:
+    import curses  # Not part of Windows Python (pip install windows-curses)
+except ImportError:
+    curses = None
+
+import engine
+import agent       # AI player behind the hint key
+import telemetry   # Gameplay events recorded to files (--telemetry)
+from config import load_config, load_keybinds, SDL_UP, SDL_DOWN, SDL_LEFT, SDL_RIGHT, SDL_F1
+from engine import UP, DOWN, LEFT, RIGHT, MOVE, SHOOT, THROW
+
+# Smallest terminal the room fits in
+MIN_LINES = 20
+MIN_COLS = 50
+
+# Room proportions, the same fractions of the shorter side as layout.py
+WALL_FRACTION = 0.75    # Cave wall radius
+FLOOR_FRACTION = 0.5    # Red warning / pit floor radius
+EXIT_FRACTION = 0.08    # Exit passage thickness
+CELL_ASPECT = 2         # Terminal cells are about twice as tall as wide
+
+# Characters used where the terminal has no colours
+WALL_CHAR = ":"
+WARNING_CHAR = "!"
+PIT_CHAR = " "
+
+# Colour pair numbers
+STATUS_PAIR = 1   # Green status text
+WALL_PAIR = 2     # Brown (yellow) cave walls
+RED_PAIR = 3      # Red floor next to the Wumpus
+PIT_PAIR = 4      # Black floor over a pit
+PLAYER_PAIR = 5   # The player, bats and Wumpus on the room
+
+# Words used for hints and prompts
+HINT_ACTIONS = {MOVE: "Move", SHOOT: "Shoot an arrow", THROW: "Throw a rock"}
+DIRECTION_NAMES = {UP: "up", DOWN: "down", LEFT: "left", RIGHT: "right"}
+MOVE_ACTIONS = {"move_up": UP, "move_down": DOWN, "move_left": LEFT, "move_right": RIGHT}
+
+HELP = "Arrows move  Shift+arrow/A shoot  Ctrl+arrow/R throw  H hint  Q quit"
+
+
+# --- Keys ---
+
+def curses_keys(code):
+    """Terminal key codes for a saved (Pygame/SDL) key code, empty if the terminal has none"""
+    arrows = {SDL_UP: curses.KEY_UP, SDL_DOWN: curses.KEY_DOWN,
+              SDL_LEFT: curses.KEY_LEFT, SDL_RIGHT: curses.KEY_RIGHT}
+    if code in arrows:
+        return [arrows[code]]
+    if SDL_F1 <= code < SDL_F1 + 12:
+        return [curses.KEY_F1 + code - SDL_F1]
+    if 32 < code < 127:
+        char = chr(code)
+        return sorted({ord(char.lower()), ord(char.upper())})  # Pygame ignores Shift for letters
+    return []
+
+
+def key_actions(keybinds):
+    """{terminal key code: action name} for the keybinds"""
+    keys = {}
+    for action, code in keybinds.items():
+        for key in curses_keys(code):
+            keys[key] = action
+    return keys
+
+
+# Shift and Ctrl + arrow keys as ncurses names them (the Pygame window's
+# shoot and throw shortcuts)
+MODIFIED_ARROWS = {
+    b"KEY_SR": (SHOOT, UP), b"KEY_SF": (SHOOT, DOWN),
+    b"KEY_SLEFT": (SHOOT, LEFT), b"KEY_SRIGHT": (SHOOT, RIGHT),
+    b"kUP5": (THROW, UP), b"kDN5": (THROW, DOWN),
+    b"kLFT5": (THROW, LEFT), b"kRIT5": (THROW, RIGHT),
+}
+
+
+# --- Drawing ---
+
+class RoomShape:
+    """
+    Cell runs of the cave walls, exits and floor for one terminal size
+    (the layout.Layout of the terminal)
+    Args:
+        lines, cols: terminal size
+    """
+    def __init__(self, lines, cols):
+        self.size = (lines, cols)
+        self.cy, self.cx = lines // 2, cols // 2
+        side = min(lines, cols // CELL_ASPECT)
+        self.wall = list(self.disc(int(side // 2 * WALL_FRACTION)))
+        self.floor = list(self.disc(int(side // 2 * FLOOR_FRACTION)))
+
+        # Exit passages run from the terminal edge a third of the way into the room
+        radius = int(side // 2 * WALL_FRACTION)
+        reach_y = self.cy - radius + radius // 3
+        reach_x = self.cx - radius * CELL_ASPECT + radius * CELL_ASPECT // 3
+        rows = max(1, round(side * EXIT_FRACTION))
+        cols_wide = rows * CELL_ASPECT
+        top = self.cy - rows // 2
+        left = self.cx - cols_wide // 2
+        self.exits = {  # direction -> [(y, x, width)]
+            LEFT: [(y, 0, reach_x) for y in range(top, top + rows)],
+            RIGHT: [(y, cols - reach_x, reach_x) for y in range(top, top + rows)],
+            UP: [(y, left, cols_wide) for y in range(0, reach_y)],
+            DOWN: [(y, left, cols_wide) for y in range(lines - reach_y, lines)],
+        }
+
+    def disc(self, radius):
+        """(y, x, width) runs filling a circle of radius rows around the center"""
+        for dy in range(-radius, radius + 1):
+            half = round(radius * CELL_ASPECT * math.sqrt(max(0.0, 1 - (dy / (radius + 0.5)) ** 2)))
+            yield self.cy + dy, self.cx - half, 2 * half + 1
+
+
+class TerminalGame:
+    """
+    The game loop of the terminal front end
+    Args:
+        screen: curses window covering the terminal
+        game: engine.Engine with the chosen settings
+        keybinds: {action: Pygame key code}
+    """
+    def __init__(self, screen, game, keybinds):
+        self.screen = screen
+        self.game = game
+        self.keys = key_actions(keybinds)
+        self.state = None
+        self.advisor = agent.Agent()
+        self.messages = []   # Shown under the room until the next key
+        self.shape = None    # RoomShape of the current terminal size
+        self.colors = curses.has_colors()
+        if self.colors:
+            curses.start_color()
+            curses.use_default_colors()
+            curses.init_pair(STATUS_PAIR, curses.COLOR_GREEN, -1)
+            curses.init_pair(WALL_PAIR, curses.COLOR_BLACK, curses.COLOR_YELLOW)
+            curses.init_pair(RED_PAIR, curses.COLOR_BLACK, curses.COLOR_RED)
+            curses.init_pair(PIT_PAIR, curses.COLOR_WHITE, curses.COLOR_BLACK)
+            curses.init_pair(PLAYER_PAIR, curses.COLOR_YELLOW, -1)
+
+    def attr(self, pair, bold=False):
+        """Colour attribute (plain text on terminals without colours)"""
+        attr = curses.color_pair(pair) if self.colors else curses.A_NORMAL
+        return attr | curses.A_BOLD if bold else attr
+
+    def fill(self, runs, char, attr):
+        """Fill (y, x, width) cell runs, clipped to the terminal"""
+        lines, cols = self.shape.size
+        for y, x, width in runs:
+            if 0 <= y < lines:
+                start, end = max(0, x), min(cols, x + width)
+                if end > start:
+                    # The bottom right cell can't be written without scrolling
+                    if y == lines - 1 and end == cols:
+                        end -= 1
+                    self.screen.addstr(y, start, char * (end - start), attr)
+
+    def status_lines(self):
+        """Status text in the top left corner, as in the Pygame window"""
+        game, state = self.game, self.state
+        lines = [
+            f"POS: {state.player_pos}",
+            f"Arrows: {state.num_arrows}",
+            f"Rocks: {state.num_rocks}",
+            engine.BATS_NEARBY_MESSAGE if game.bats_nearby(state) else "",
+            engine.PIT_NEARBY_MESSAGE if game.pit_nearby(state) else "",
+        ]
+        return [line for line in lines if line]
+
+    def draw(self):
+        """Draw the room, the status text and the messages"""
+        screen = self.screen
+        lines, cols = screen.getmaxyx()
+        screen.erase()
+        if lines < MIN_LINES or cols < MIN_COLS:
+            screen.addstr(0, 0, f"Make the terminal at least {MIN_COLS}x{MIN_LINES}"[:cols - 1])
+            screen.refresh()
+            return
+        if self.shape is None or self.shape.size != (lines, cols):
+            self.shape = RoomShape(lines, cols)
+        shape, game, state = self.shape, self.game, self.state
+        pos = state.player_pos
+        exits = game.cave[pos]
+
+        # Walls, exits and the floor warning
+        wall = self.attr(WALL_PAIR)
+        wall_char = " " if self.colors else WALL_CHAR
+        self.fill(shape.wall, wall_char, wall)
+        for direction, runs in shape.exits.items():
+            if exits[direction] > 0:
+                self.fill(runs, wall_char, wall)
+        if state.has_pit(pos):
+            self.fill(shape.floor, PIT_CHAR, self.attr(PIT_PAIR))
+        elif game.wumpus_nearby(state):
+            self.fill(shape.floor, " " if self.colors else WARNING_CHAR, self.attr(RED_PAIR))
+
+        # Player in the middle, with the bats or the Wumpus if they are here
+        figures = "@"
+        if state.has_bats(pos):
+            figures = "B" + figures
+        if pos == state.wumpus_pos:
+            figures += "W"
+        screen.addstr(shape.cy, shape.cx - len(figures) // 2, figures, self.attr(PLAYER_PAIR, True))
+
+        for y, line in enumerate(self.status_lines()):
+            screen.addstr(y, 0, line[:cols - 1], self.attr(STATUS_PAIR, True))
+        bottom = lines - 1 - len(self.messages)
+        for y, line in enumerate(self.messages, start=bottom):
+            screen.addstr(y, 0, line[:cols - 1], curses.A_BOLD)
+        screen.addstr(lines - 1, 0, HELP[:cols - 1], curses.A_DIM)
+        screen.refresh()
+
+    # --- Turns ---
+
+    def new_game(self, seed=None):
+        """Start a game and look at the first room"""
+        self.state = self.game.new_game(seed)
+        self.advisor = agent.Agent()
+        self.show(None, None, self.game.check_room(self.state))  # The first room can already be dangerous
+
+    def act(self, action, direction):
+        """Play one turn"""
+        self.show(action, direction, self.game.step(self.state, action, direction))
+
+    def show(self, action, direction, events):
+        """Tell the hint advisor what happened and put the event messages up"""
+        self.advisor.observe(self.game, self.state, action, direction, events)
+        self.messages = [engine.MESSAGES[event] for event in events if event in engine.MESSAGES]
+        if self.state.result is not None:
+            self.messages.append("Play again? (y/n)")
+
+    def choose_direction(self, prompt):
+        """Ask for a direction with the move keys (None if cancelled)"""
+        self.messages = [prompt + " - press a direction (Esc cancels)"]
+        self.draw()
+        while True:
+            key = self.screen.getch()
+            if key == curses.KEY_RESIZE:
+                self.draw()
+                continue
+            direction = MOVE_ACTIONS.get(self.keys.get(key))
+            if direction is not None:
+                return direction
+            if key in (27, ord("q"), ord("Q")):
+                self.messages = []
+                return None
+
+    def handle_key(self, key):
+        """Apply one key press. Returns False to quit"""
+        if key in (27, ord("q"), ord("Q")):
+            return False
+        name = curses.keyname(key) if key >= 0 else b""
+        if name in MODIFIED_ARROWS:
+            self.act(*MODIFIED_ARROWS[name])
+            return True
+        action = self.keys.get(key)
+        if action in MOVE_ACTIONS:
+            self.act(MOVE, MOVE_ACTIONS[action])
+        elif action == "shoot_arrow":
+            direction = self.choose_direction("Shoot an arrow")
+            if direction is not None:
+                self.act(SHOOT, direction)
+        elif action == "throw_rock":
+            direction = self.choose_direction("Throw a rock")
+            if direction is not None:
+                self.act(THROW, direction)
+        elif action == "hint":
+            hint_action, direction = self.advisor.hint(self.game, self.state)
+            self.messages = [f"Hint: {HINT_ACTIONS[hint_action]} {DIRECTION_NAMES[direction]}"]
+        return True
+
+    def run(self, seed=None):
+        """Play games until the player quits"""
+        self.new_game(seed)
+        while True:
+            self.draw()
+            key = self.screen.getch()
+            if key == curses.KEY_RESIZE:
+                continue
+            if self.state.result is not None:
+                # Game over - the last message stays up until a key is pressed
+                if key in (ord("y"), ord("Y"), ord("\n"), ord(" ")):
+                    self.new_game()
+                elif key in (27, ord("n"), ord("N"), ord("q"), ord("Q")):
+                    return
+                continue
+            if not self.handle_key(key):
+                return
+
+
+def main():
+    """Play in the terminal from the command line"""
+    parser = argparse.ArgumentParser(description="Hunt the Wumpus in the terminal")
+    parser.add_argument("--difficulty", choices=list(engine.DIFFICULTIES),
+                        help="difficulty preset (default: the one picked in the game's menu)")
+    parser.add_argument("--seed", type=int, help="seed of the first game")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args()
+    if curses is None:
+        sys.exit("The terminal front end needs curses (on Windows: pip install windows-curses)")
+
+    # Same keybinds and difficulty as the Pygame window
+    config = load_config()
+    keybinds = load_keybinds(config)
+    difficulty = args.difficulty or config.get("difficulty")
+    if difficulty in engine.DIFFICULTIES:
+        game = engine.Engine.from_difficulty(difficulty)
+    else:
+        game = engine.Engine()
+
+    def run(screen):
+        curses.curs_set(0)  # No blinking cursor over the room
+        curses.set_escdelay(25)  # Esc on its own doesn't wait a second for more keys
+        TerminalGame(screen, game, keybinds).run(args.seed)
+    recorder = telemetry.from_args(args)
+    try:
+        curses.wrapper(run)
+    finally:
+        if recorder is not None:
+            recorder.close()
+            print(recorder.summary())
+
+
+if __name__ == "__main__":
+    main()
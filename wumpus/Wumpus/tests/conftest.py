@@ -0,0 +1,31 @@
+# Shared setup for the tests
+# The game modules import each other as top level modules (import engine),
+# so the folder above this one goes on the path, as when running them directly.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402 - needs the path above
+
+
+@pytest.fixture
+def game():
+    """Engine with the default settings and cave, and a Wumpus that never wanders off"""
+    return engine.Engine(mobile_wumpus=False)
+
+
+@pytest.fixture
+def quiet_state(game):
+    """
+    Game in room 1 (exits: down 8, left 2, right 5) with the Wumpus in room 20
+    and no hazards or items, for setting up one situation at a time
+    """
+    state = game.new_game(1)
+    state.player_pos = 1
+    state.wumpus_pos = 20
+    state.bats_list = []
+    state.bat_mask = state.pit_mask = state.arrow_mask = state.rock_mask = 0
+    return state
@@ -0,0 +1,23 @@
+# Tests for the belief-state AI player (agent.py)
+import agent
+import engine
+
+
+def test_agent_beats_the_random_policy():
+    game = engine.Engine.from_difficulty("Medium")
+    smart = game.run_games(300, policy=agent.Agent(), seed=0)
+    baseline = game.run_games(300, seed=0)
+    assert smart["win_rate"] > baseline["win_rate"] + 0.3
+
+
+def test_wumpus_odds_stay_out_of_known_bat_rooms():
+    game = engine.Engine(wumpus_move_chance=100)  # A Wumpus that always moves
+    player = agent.Agent()
+    player.observe(game, game.new_game(1), None, None, [])
+    player.wumpus = [0.0] * (game.num_rooms + 1)
+    player.wumpus[6] = 1.0  # Room 6 is next to 5, 7 and 15
+    player.bat_sure = 1 << 7
+    player.move_wumpus(game, 5, False)
+    assert player.wumpus[7] == 0.0
+    assert player.wumpus[15] > 0.0 and player.wumpus[5] == 0.0  # Not into the player either
+    assert abs(sum(player.wumpus) - 1.0) < 1e-9
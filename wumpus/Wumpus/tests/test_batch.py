@@ -0,0 +1,50 @@
+# Tests for the NumPy batch simulator (batch.py) against the engine's rules
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import batch    # noqa: E402 - needs numpy
+import engine   # noqa: E402
+from engine import MOVE, THROW, RIGHT, ROCK_EMPTY  # noqa: E402
+
+
+@pytest.mark.parametrize("name", list(engine.DIFFICULTIES))
+def test_same_rates_as_the_engine(name):
+    # 10000 games each side: a rate's standard error is about 0.5 points
+    games = 10000
+    single = engine.Engine.from_difficulty(name).run_games(games, seed=1)
+    lockstep = batch.BatchEngine.from_difficulty(name, seed=1).run_games(games)
+    for key in ("wins", "eaten", "fell"):
+        assert abs(single[key] - lockstep[key]) / games < 0.03, key
+
+
+def quiet_games(sim, n):
+    """n games in room 1 with the Wumpus in room 20 and no hazards or items"""
+    s = sim.new_games(n)
+    s.player[:] = 1
+    s.wumpus[:] = 20
+    s.bats[:] = 0
+    s.bat_mask[:] = s.pit_mask[:] = s.arrow_mask[:] = s.rock_mask[:] = 0
+    return s
+
+
+def test_rock_result_only_for_games_that_throw():
+    sim = batch.BatchEngine(mobile_wumpus=False, seed=0)
+    s = quiet_games(sim, 2)
+    sim.step(s, np.array([THROW, THROW]), np.array([RIGHT, RIGHT]))
+    assert list(s.rock_result) == [ROCK_EMPTY, ROCK_EMPTY]
+    sim.step(s, np.array([THROW, MOVE]), np.array([RIGHT, RIGHT]))
+    assert list(s.rock_result) == [ROCK_EMPTY, 0]
+
+
+def test_carried_flag_set_by_the_bats():
+    sim = batch.BatchEngine(num_bats=1, mobile_wumpus=False, seed=0)
+    s = quiet_games(sim, 500)
+    s.bats[:, 0] = 5
+    s.bat_mask[:] = batch.room_bits(s.bats[:, 0])
+    s.player[250:] = 2  # These walk right into room 1, the others into the bats in room 5
+    sim.step(s, np.full(500, MOVE), np.full(500, RIGHT))
+    assert s.carried[:250].all()
+    assert not s.carried[250:].any()
+    sim.step(s, np.full(500, THROW), np.full(500, RIGHT))
+    assert not s.carried.any()
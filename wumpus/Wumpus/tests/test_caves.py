@@ -0,0 +1,37 @@
+# Tests for the big cave layouts and their rules path (caves.py, engine.py)
+import random
+
+import pytest
+
+import caves
+import engine
+
+
+@pytest.fixture
+def big_cave():
+    """Connected cave past NEIGHBOR_MASK_LIMIT, so the engine looks rooms up in sets"""
+    cave = caves.grid_cave(40, 40, 0.5, random.Random(0))
+    assert len(cave) > engine.NEIGHBOR_MASK_LIMIT and cave.is_connected()
+    return cave
+
+
+def test_big_caves_play_like_small_ones(big_cave, monkeypatch):
+    def games(game):
+        return [(state.result, state.turns, bytes(state.actions), state.wumpus_pos)
+                for state in (game.play(engine.random_policy, 300, seed=seed) for seed in range(40))]
+
+    settings = (3, 3, 4, 4, 70)
+    sets = engine.Engine(*settings, cave=big_cave)
+    assert sets.neighbor_masks is None
+    monkeypatch.setattr(engine, "NEIGHBOR_MASK_LIMIT", len(big_cave))
+    masks = engine.Engine(*settings, cave=big_cave)  # Same cave on the bit-test path
+    assert masks.neighbor_masks is not None
+    assert games(sets) == games(masks)
+
+
+def test_room_sets_follow_the_masks(big_cave):
+    state = engine.Engine(cave=big_cave).new_game(3)
+    pit = engine.rooms_in(state.pit_mask)[0]
+    assert state.has_pit(pit)
+    state.pit_mask ^= 1 << pit  # A new mask object, so its set is rebuilt
+    assert not state.has_pit(pit)
@@ -0,0 +1,167 @@
+# Tests for the game rules in engine.py
+import pytest
+
+import engine
+from engine import (UP, DOWN, LEFT, RIGHT, MOVE, SHOOT, THROW, EATEN, FELL, BATS,
+                    FOUND_ARROW, FOUND_ROCK, KILLED_WUMPUS, ARROW_MISSED, OUT_OF_ARROWS,
+                    NO_ARROWS, ROCK_WUMPUS, ROCK_BATS, ROCK_PIT, ROCK_EMPTY, NO_ROCKS,
+                    LAST_ROCK, MOVED, BLOCKED, rooms_in)
+
+
+# --- Placement ---
+
+@pytest.mark.parametrize("name", list(engine.DIFFICULTIES))
+def test_placement_gives_hazards_their_own_rooms(name):
+    game = engine.Engine.from_difficulty(name)
+    for seed in range(200):
+        state = game.new_game(seed)
+        hazards = [state.player_pos, state.wumpus_pos, *state.bats_list, *rooms_in(state.pit_mask)]
+        assert len(set(hazards)) == len(hazards) == 2 + game.num_bats + game.num_pits
+        assert all(1 <= room <= game.num_rooms for room in hazards)
+        # Items are never under a hazard or the Wumpus
+        taken = state.bat_mask | state.pit_mask | 1 << state.wumpus_pos | 1 << state.player_pos
+        assert len(rooms_in(state.arrow_mask)) == game.num_arrows
+        assert len(rooms_in(state.rock_mask)) == game.num_rocks
+        assert not (state.arrow_mask | state.rock_mask) & taken
+
+
+def test_same_seed_same_game(game):
+    first, second = game.new_game(42), game.new_game(42)
+    assert (first.player_pos, first.wumpus_pos, first.bats_list, first.pit_mask,
+            first.arrow_mask, first.rock_mask) == \
+           (second.player_pos, second.wumpus_pos, second.bats_list, second.pit_mask,
+            second.arrow_mask, second.rock_mask)
+
+
+def test_settings_that_dont_fit_are_rejected():
+    with pytest.raises(ValueError):
+        engine.Engine(num_bats=10, num_pits=10).new_game(1)
+
+
+# --- Rooms ---
+
+def test_walking_into_the_wumpus(game, quiet_state):
+    quiet_state.wumpus_pos = 8
+    assert game.step(quiet_state, MOVE, DOWN) == [MOVED, EATEN]
+    assert quiet_state.result == EATEN
+
+
+def test_falling_into_a_pit(game, quiet_state):
+    quiet_state.pit_mask = 1 << 2
+    assert game.step(quiet_state, MOVE, LEFT) == [MOVED, FELL]
+    assert quiet_state.result == FELL
+
+
+def test_bats_carry_the_player_and_move(game, quiet_state):
+    quiet_state.bats_list = [5]
+    quiet_state.bat_mask = 1 << 5
+    events = game.step(quiet_state, MOVE, RIGHT)
+    assert events[:2] == [MOVED, BATS]
+    assert quiet_state.player_pos != 5
+    assert quiet_state.bats_list != [5]
+    assert quiet_state.bat_mask == 1 << quiet_state.bats_list[0]
+
+
+def test_picking_up_items(game, quiet_state):
+    quiet_state.arrow_mask = quiet_state.rock_mask = 1 << 8
+    assert game.step(quiet_state, MOVE, DOWN) == [MOVED, FOUND_ARROW, FOUND_ROCK]
+    assert (quiet_state.num_arrows, quiet_state.num_rocks) == (engine.START_ARROWS + 1,
+                                                               engine.START_ROCKS + 1)
+    assert quiet_state.arrow_mask == quiet_state.rock_mask == 0
+
+
+def test_walking_into_a_wall(game, quiet_state):
+    assert game.step(quiet_state, MOVE, UP) == [BLOCKED]
+    assert quiet_state.player_pos == 1
+
+
+def test_percepts(game, quiet_state):
+    quiet_state.wumpus_pos = 8
+    quiet_state.bat_mask = 1 << 2
+    assert game.wumpus_nearby(quiet_state) and game.bats_nearby(quiet_state)
+    assert not game.pit_nearby(quiet_state)
+
+
+# --- Arrows and rocks ---
+
+def test_arrow_hits(game, quiet_state):
+    quiet_state.wumpus_pos = 5
+    assert game.step(quiet_state, SHOOT, RIGHT) == [KILLED_WUMPUS]
+    assert quiet_state.result == KILLED_WUMPUS
+
+
+def test_arrow_misses_and_wakes_the_wumpus(game, quiet_state):
+    events = game.step(quiet_state, SHOOT, DOWN)
+    assert events[:2] == [ARROW_MISSED, OUT_OF_ARROWS]  # The only arrow is gone
+    assert quiet_state.wumpus_pos != quiet_state.player_pos  # Runs to another room
+    assert game.step(quiet_state, SHOOT, DOWN)[0] == NO_ARROWS
+
+
+@pytest.mark.parametrize("setup, expected", [
+    ("wumpus", ROCK_WUMPUS), ("bats", ROCK_BATS), ("pit", ROCK_PIT), ("empty", ROCK_EMPTY),
+])
+def test_rock_results(game, quiet_state, setup, expected):
+    if setup == "wumpus":
+        quiet_state.wumpus_pos = 2
+    elif setup == "bats":
+        quiet_state.bats_list = [2]
+        quiet_state.bat_mask = 1 << 2
+    elif setup == "pit":
+        quiet_state.pit_mask = 1 << 2
+    assert game.step(quiet_state, THROW, LEFT)[0] == expected
+
+
+def test_running_out_of_rocks(game, quiet_state):
+    for _ in range(engine.START_ROCKS - 1):
+        game.step(quiet_state, THROW, LEFT)
+    assert game.step(quiet_state, THROW, LEFT) == [ROCK_EMPTY, LAST_ROCK]
+    assert game.step(quiet_state, THROW, LEFT) == [NO_ROCKS]
+
+
+# --- The Wumpus ---
+
+def test_wumpus_hunts_a_player_without_arrows():
+    game = engine.Engine()
+    state = game.new_game(3)
+    state.bats_list = []
+    state.bat_mask = state.pit_mask = 0
+    state.num_arrows = 0
+    state.player_pos, state.wumpus_pos = 1, 20
+    before = game.distances.distance(20, 1)
+    game.move_wumpus(state)
+    assert game.distances.distance(state.wumpus_pos, 1) == before - 1
+
+
+def test_wandering_wumpus_avoids_the_player_and_hazards():
+    game = engine.Engine(wumpus_move_chance=100)
+    for seed in range(100):
+        state = game.new_game(seed)
+        game.move_wumpus(state)
+        hazards = state.pit_mask | state.bat_mask
+        assert state.wumpus_pos != state.player_pos
+        assert not hazards >> state.wumpus_pos & 1
+
+
+# --- Turns ---
+
+def test_every_action_counts_as_a_turn(game, quiet_state):
+    game.act(quiet_state, MOVE, DOWN)  # How the window plays: act now, check the room later
+    game.check_room(quiet_state)
+    game.step(quiet_state, THROW, UP)
+    game.step(quiet_state, SHOOT, UP)
+    assert quiet_state.turns == len(quiet_state.actions) == 3
+    assert list(quiet_state.actions) == [MOVE << 2 | DOWN, THROW << 2 | UP, SHOOT << 2 | UP]
+
+
+def test_seeded_runs_repeat():
+    game = engine.Engine.from_difficulty("Medium")
+    assert game.run_games(300, seed=7)["wins"] == game.run_games(300, seed=7)["wins"]
+
+
+def test_games_never_change_the_cave():
+    game = engine.Engine.from_difficulty("Hard")
+    before = {room: tuple(exits) for room, exits in game.cave.items()}
+    game.run_games(500, seed=1)
+    assert {room: tuple(exits) for room, exits in game.cave.items()} == before
+    with pytest.raises(TypeError):
+        game.cave[1][0] = 2  # Rooms are read-only
@@ -0,0 +1,67 @@
+# Tests for the reinforcement-learning environments (env.py)
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import env
+from engine import MOVE, THROW, UP, KILLED_WUMPUS
+from env import ROCK_EVENTS
+
+
+def test_reset_and_step_follow_the_game():
+    wumpus_env = env.WumpusEnv.from_difficulty("Medium")
+    obs, info = wumpus_env.reset(seed=7)
+    state = wumpus_env.state
+    assert obs.shape == (env.OBS_SIZE,) and obs.dtype == env.OBS_DTYPE
+    assert info["seed"] == 7
+    assert obs[env.OBS_ROOM] == state.player_pos
+    assert list(obs[env.OBS_EXITS:env.OBS_EXITS + 4]) == list(wumpus_env.game.cave[state.player_pos])
+
+    rng = np.random.default_rng(0)
+    for _ in range(wumpus_env.max_turns):
+        obs, reward, terminated, truncated, info = wumpus_env.step(int(rng.integers(env.NUM_ACTIONS)))
+        assert obs[env.OBS_ROOM] == state.player_pos
+        assert obs[env.OBS_ARROWS] == state.num_arrows and obs[env.OBS_ROCKS] == state.num_rocks
+        assert obs[env.OBS_ROCK] in (0, *ROCK_EVENTS)
+        if terminated:
+            expected = env.WIN_REWARD if state.result == KILLED_WUMPUS else env.LOSS_REWARD
+            assert reward == expected and not truncated
+            assert obs[env.OBS_CARRIED] == 0  # Only a player who lived was carried
+            break
+        assert reward == env.STEP_REWARD
+
+
+def test_throwing_a_rock_shows_what_it_found():
+    wumpus_env = env.WumpusEnv.from_difficulty("Medium")
+    wumpus_env.reset(seed=3)
+    state = wumpus_env.state
+    direction = next(d for d, room in enumerate(wumpus_env.game.cave[state.player_pos]) if room)
+    obs, *_ = wumpus_env.step(THROW << 2 | direction)
+    assert obs[env.OBS_ROCK] in ROCK_EVENTS
+    obs, *_ = wumpus_env.step(MOVE << 2 | UP)
+    assert obs[env.OBS_ROCK] == 0  # Only the step with the throw reports it
+
+
+def test_vector_env_resets_finished_games():
+    vector = env.VectorEnv.from_difficulty("Medium", 256, max_turns=20, seed=0)
+    obs, info = vector.reset()
+    assert obs.shape == (256, env.OBS_SIZE) and obs.dtype == env.OBS_DTYPE
+    assert info == {}
+
+    rng = np.random.default_rng(0)
+    finished = 0
+    for _ in range(60):
+        obs, rewards, terminated, truncated, _ = vector.step(env.random_actions(rng, 256))
+        assert rewards.shape == terminated.shape == truncated.shape == (256,)
+        assert not (terminated & truncated).any()
+        assert set(np.unique(rewards)) <= {env.WIN_REWARD, env.LOSS_REWARD, env.STEP_REWARD}
+        assert (rewards[~terminated] == env.STEP_REWARD).all()
+        done = terminated | truncated
+        finished += done.sum()
+        # Finished slots already hold a new game: its first observation, no turns played
+        s = vector.state
+        assert (s.result[done] == 0).all() and (s.turns[done] == 0).all()
+        assert (obs[done, env.OBS_ROCK] == 0).all()
+        assert (obs[:, env.OBS_ROOM] == s.player).all()
+        assert (obs[:, env.OBS_CARRIED] <= 1).all()
+    assert finished > 256  # Every slot was cut off at least once by max_turns
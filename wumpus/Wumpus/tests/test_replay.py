@@ -0,0 +1,73 @@
+# Tests for seeded games and replay files (replay.py)
+import pytest
+
+import agent
+import engine
+import replay
+
+
+def fingerprint(state):
+    """Everything about a game that a replay has to reproduce"""
+    return (state.player_pos, state.wumpus_pos, state.num_arrows, state.num_rocks,
+            state.bats_list, state.pit_mask, state.arrow_mask, state.rock_mask,
+            state.turns, state.result, bytes(state.actions), state.rng.getstate())
+
+
+@pytest.mark.parametrize("policy", [engine.random_policy, agent.Agent()], ids=["random", "agent"])
+def test_replaying_the_actions_gives_the_same_game(policy):
+    game = engine.Engine.from_difficulty("Hard")
+    for index in range(100):
+        state = game.play(policy, seed=engine.game_seed(5, index))
+        assert fingerprint(replay.replay_game(game, state.seed, state.actions)) == fingerprint(state)
+
+
+def test_replay_file_round_trip(tmp_path):
+    game = engine.Engine.from_difficulty("Medium")
+    path = tmp_path / "games.wrep"
+    states = [game.play(engine.random_policy, seed=engine.game_seed(0, index)) for index in range(200)]
+    with replay.ReplayWriter(path, game) as writer:
+        for state in states:
+            writer.add(state)
+
+    settings, games = replay.read_replays(path)
+    assert settings["num_bats"] == game.num_bats and settings["num_rooms"] == game.num_rooms
+    assert games == [(state.seed, state.result, bytes(state.actions)) for state in states]
+    stats = replay.verify(path)
+    assert stats["games"] == 200 and stats["mismatches"] == []
+
+
+def test_verify_catches_a_rule_change(tmp_path, monkeypatch):
+    game = engine.Engine.from_difficulty("Hard")
+    path = tmp_path / "games.wrep"
+    with replay.ReplayWriter(path, game) as writer:
+        for index in range(200):
+            writer.add(game.play(engine.random_policy, seed=engine.game_seed(0, index)))
+    monkeypatch.setattr(engine.Engine, "move_wumpus", lambda self, state: None)
+    assert replay.verify(path)["mismatches"]
+
+
+@pytest.mark.parametrize("keep", [0, 5, replay.HEADER.size + 3, -1])
+def test_short_files_are_rejected(tmp_path, keep):
+    game = engine.Engine()
+    path = tmp_path / "games.wrep"
+    with replay.ReplayWriter(path, game) as writer:
+        writer.add(game.play(engine.random_policy, seed=1))
+    data = path.read_bytes()
+    path.write_bytes(data[:keep])
+    with pytest.raises(ValueError):
+        replay.read_replays(path)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "games.wrep"
+    path.write_bytes(b"not a replay file at all, just some text")
+    with pytest.raises(ValueError):
+        replay.read_replays(path)
+
+
+def test_seeds_of_a_run_dont_depend_on_the_worker_split():
+    game = engine.Engine.from_difficulty("Medium")
+    whole = game.run_games(400, seed=3)
+    halves = [game.run_games(200, seed=3, first_game=first) for first in (0, 200)]
+    assert whole["wins"] == sum(half["wins"] for half in halves)
+    assert whole["eaten"] == sum(half["eaten"] for half in halves)
@@ -0,0 +1,121 @@
+# Tests for saving and restoring games partway through (snapshot.py)
+import os
+import random
+
+import pytest
+
+import engine
+import snapshot
+from engine import MOVE, DOWN
+
+
+def started(game, index, turns):
+    """Seeded game played `turns` turns into the random policy, as Engine.play would"""
+    state = game.new_game(engine.game_seed(0, index))
+    state.policy_rng = random.Random(state.seed ^ engine.POLICY_STREAM)
+    game.check_room(state)
+    for _ in range(turns):
+        if state.result is None:
+            game.step(state, *engine.random_policy(game, state))
+    return state
+
+
+def finish(game, state):
+    while state.result is None and state.turns < 1000:
+        game.step(state, *engine.random_policy(game, state))
+    return state.result, state.turns, bytes(state.actions), state.rng.getstate()
+
+
+def test_restored_games_end_the_same(tmp_path):
+    game = engine.Engine.from_difficulty("Medium")
+    path = str(tmp_path / "games.wsnap")
+    states = [started(game, index, index % 8) for index in range(300)]
+    snapshot.save_snapshots(path, game, states)
+    _, restored = snapshot.load_snapshots(path, game)
+    assert len(restored) == len(states)
+    assert [finish(game, state) for state in restored] == [finish(game, state) for state in states]
+
+
+def test_records_are_small_and_fixed(tmp_path):
+    game = engine.Engine.from_difficulty("Medium")
+    path = str(tmp_path / "games.wsnap")
+    snapshot.save_snapshots(path, game, [started(game, index, 5) for index in range(100)])
+    record = snapshot.record_struct(game).size
+    assert record <= 64
+    _, restored = snapshot.load_snapshots(path)  # Settings come from the file
+    log = sum(len(state.actions) for state in restored)
+    assert os.path.getsize(path) == snapshot.HEADER.size + 100 * record + log
+
+
+def test_restoring_doesnt_replay_the_game(tmp_path, monkeypatch):
+    game = engine.Engine.from_difficulty("Medium")
+    state = started(game, 0, 0)
+    while state.result is None and state.turns < 300:
+        game.step(state, *engine.random_policy(game, state))
+    path = str(tmp_path / "games.wsnap")
+    snapshot.save_snapshots(path, game, [state])
+    monkeypatch.setattr(engine.Engine, "act", None)  # Any re-simulation would fail
+    _, (restored,) = snapshot.load_snapshots(path, game)
+    assert restored.actions == state.actions
+    assert restored.rng.getstate() == state.rng.getstate()
+    assert restored.policy_rng.getstate() == state.policy_rng.getstate()
+
+
+@pytest.mark.parametrize("draws", [0, 1, 311, 312, 313, 2000])
+def test_stream_position_round_trip(draws):
+    rng = random.Random(7)
+    for _ in range(draws):  # Mixed draw sizes, crossing block boundaries
+        rng.choice([rng.random, lambda: rng.randrange(20), lambda: rng.getrandbits(70)])()
+    words = snapshot.words_drawn(rng, 7, 100)
+    restored = random.Random(7)
+    snapshot.skip_words(restored, words)
+    assert restored.getstate() == rng.getstate()
+    assert snapshot.words_drawn(rng, 8, 100) is None  # Another seed's stream
+
+
+def test_game_saved_before_its_room_is_checked(tmp_path, game):
+    # The window acts on a key and checks the room on its next pass
+    state = game.new_game(1)
+    game.check_room(state)
+    game.act(state, MOVE, DOWN)
+    path = str(tmp_path / "games.wsnap")
+    snapshot.save_snapshots(path, game, [state])
+    _, (restored,) = snapshot.load_snapshots(path, game)
+    assert snapshot.Snapshots(game).pack(restored) == snapshot.Snapshots(game).pack(state)
+    assert game.check_room(restored) == game.check_room(state)
+
+
+def test_games_without_a_seed_cant_be_saved(game):
+    state = engine.GameState()  # Set up by hand, as the window does before its first game
+    with pytest.raises(ValueError):
+        snapshot.Snapshots(game).pack(state)
+
+
+def test_other_settings_are_rejected(tmp_path):
+    path = str(tmp_path / "games.wsnap")
+    easy = engine.Engine.from_difficulty("Easy")
+    snapshot.save_snapshots(path, easy, [started(easy, 0, 3)])
+    with pytest.raises(ValueError, match="other game settings"):
+        snapshot.load_snapshots(path, engine.Engine.from_difficulty("Hard"))
+
+
+def test_short_and_foreign_files_are_rejected(tmp_path):
+    game = engine.Engine.from_difficulty("Medium")
+    path = str(tmp_path / "games.wsnap")
+    snapshot.save_snapshots(path, game, [started(game, index, 4) for index in range(3)])
+    data = open(path, "rb").read()
+    for broken in (b"", data[:snapshot.HEADER.size - 1], data[:-1], b"WREP" + data[4:]):
+        open(path, "wb").write(broken)
+        with pytest.raises(ValueError):
+            snapshot.load_snapshots(path, game)
+
+
+def test_games_that_dont_fit_the_cave_are_rejected(tmp_path):
+    game = engine.Engine.from_difficulty("Medium")
+    path = str(tmp_path / "games.wsnap")
+    snapshot.save_snapshots(path, game, [started(game, 0, 4)])
+    data = bytearray(open(path, "rb").read())
+    data[snapshot.HEADER.size:snapshot.HEADER.size + 4] = (12345).to_bytes(4, "little")  # Player room
+    open(path, "wb").write(data)
+    with pytest.raises(ValueError, match="doesn't fit"):
+        snapshot.load_snapshots(path, game)
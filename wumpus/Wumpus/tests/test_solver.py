@@ -0,0 +1,56 @@
+# Tests for the perfect-information solver and its policy tables (solver.py)
+import engine
+import solver
+from engine import MOVE, DOWN
+
+
+def hard_games(game, count):
+    """Started Hard games that aren't sure wins, so the solver has to search them"""
+    probe = solver.Solver(game)
+    index = 0
+    while count:
+        state = game.new_game(engine.game_seed(0, index))
+        index += 1
+        game.check_room(state)
+        probe.start(state)
+        if state.result is None and not probe.sure_win(
+                state.player_pos, state.wumpus_pos, state.num_arrows, tuple(sorted(state.bats_list))):
+            count -= 1
+            yield state
+
+
+def test_policy_table_round_trip(tmp_path):
+    game = engine.Engine.from_difficulty("Hard")
+    first = solver.Solver(game, max_states=300)
+    bounds = [first.solve(state) for state in hard_games(game, 2)]
+    assert first.solved
+    path = str(tmp_path / "Hard.sol")
+    first.save(path)
+
+    table = solver.PolicyTable(path)
+    try:
+        assert len(table) == len(first.solved)
+        assert {key: entry for key, entry in table.items()} == first.solved
+        # A solver reading the table gets the same answers without searching again
+        second = solver.Solver(game, table, max_states=300)
+        assert [second.solve(state) for state in hard_games(game, 2)] == bounds
+        assert not second.solved
+    finally:
+        table.close()
+
+
+def test_walking_into_the_wumpus_can_survive(game, quiet_state):
+    # Out of arrows, the hunting Wumpus steps out of the room the player
+    # walks into before check_room, so the solver must not count it as lost
+    quiet_state.num_arrows = 0
+    quiet_state.wumpus_pos = 8
+    quiet_state.arrow_mask = 1 << 20  # An arrow left to find, so the game isn't lost yet
+    perfect = solver.Solver(game)
+    perfect.start(quiet_state)
+    perfect.index, perfect.nodes = {}, [None, None]
+    node = perfect.settle(1, 8, 0, (), quiet_state.arrow_mask)
+    targets = {code: targets for code, targets, _ in perfect.expand(node)}
+    assert targets[MOVE << 2 | DOWN] != (solver.LOSS,)
+
+    game.step(quiet_state, MOVE, DOWN)
+    assert quiet_state.result is None
@@ -0,0 +1,58 @@
+# Tests for recording gameplay events (telemetry.py)
+import json
+import os
+
+import engine
+import telemetry
+
+
+def lines_on_disk(folder):
+    """Events in the finished jsonl files of folder"""
+    events = []
+    for name in sorted(os.listdir(folder)):
+        assert not name.endswith(".part")  # close() finishes every file
+        if name.endswith(".jsonl"):
+            with open(os.path.join(folder, name)) as f:
+                events.extend(json.loads(line) for line in f)
+    return events
+
+
+def test_every_event_is_written_or_dropped(tmp_path):
+    game = engine.Engine.from_difficulty("Medium")
+    plain = game.run_games(200, seed=0)
+    recorder = telemetry.Telemetry(str(tmp_path), rotate_events=500)
+    recorder.attach()
+    try:
+        recorded = game.run_games(200, seed=0)
+    finally:
+        recorder.close()
+
+    assert recorded["wins"] == plain["wins"]  # Recording doesn't change the games
+    assert recorder.emitted > 0
+    assert recorder.written + recorder.dropped == recorder.emitted
+    events = lines_on_disk(str(tmp_path))
+    assert len(events) == recorder.written
+    assert recorder.files >= 2  # rotate_events split the run over several files
+    assert set(events[0]) == set(telemetry.FIELDS)
+
+
+def test_a_full_queue_drops_and_counts(tmp_path):
+    game = engine.Engine.from_difficulty("Medium")
+    state = game.new_game(1)
+    recorder = telemetry.Telemetry(str(tmp_path), queue_size=4, batch_size=2)
+    for _ in range(5000):
+        recorder.emit(state, 0, "move", 1, 2)
+    recorder.close()
+
+    assert recorder.emitted == 5000
+    assert recorder.written + recorder.dropped == recorder.emitted
+    assert len(lines_on_disk(str(tmp_path))) == recorder.written
+
+
+def test_detach_puts_the_rules_back(tmp_path):
+    rules = engine.Engine.check_room, engine.Engine.move_wumpus
+    recorder = telemetry.Telemetry(str(tmp_path))
+    recorder.attach()
+    assert engine.Engine.check_room is not rules[0]
+    recorder.close()
+    assert (engine.Engine.check_room, engine.Engine.move_wumpus) == rules
@@ -0,0 +1,89 @@
+# Timed overlay scheduler for Hunt the Wumpus
+# Messages and projectile animations are queued here instead of blocking
+# the game with time.sleep(); the main loop keeps handling events and asks
+# the timeline what (if anything) should be drawn on top of the room.
+import time        # Default clock for overlay timing
+from collections import deque  # First-in first-out overlay queue
+
+
+class Overlay:
+    """
+    One queued overlay
+    Args:
+        duration: how long it stays on screen in seconds
+        draw: callable(surface, progress) drawing it, progress goes 0.0 -> 1.0
+        animated: True if it changes every frame (tweens), False for still images
+        skippable: whether a key press may cut it short
+    """
+    __slots__ = ("duration", "draw", "animated", "skippable", "start")
+
+    def __init__(self, duration, draw, animated=False, skippable=True):
+        self.duration = duration
+        self.draw = draw
+        self.animated = animated
+        self.skippable = skippable
+        self.start = None  # Set when the overlay reaches the front of the queue
+
+
+class Timeline:
+    """
+    Plays queued overlays one after another without ever blocking
+    Args:
+        clock: function returning the current time in seconds
+    """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.queue = deque()
+
+    def add(self, duration, draw, animated=False, skippable=True):
+        """Queue an overlay to be shown after everything already queued"""
+        overlay = Overlay(duration, draw, animated, skippable)
+        self.queue.append(overlay)
+        return overlay
+
+    def current(self):
+        """The overlay that should be on screen now (None when the queue is empty)"""
+        now = self.clock()
+        while self.queue:
+            overlay = self.queue[0]
+            if overlay.start is None:
+                overlay.start = now  # Its time starts when it is first shown
+            if now - overlay.start < overlay.duration:
+                return overlay
+            self.queue.popleft()  # Finished, move on to the next one
+        return None
+
+    def progress(self):
+        """How far through the current overlay we are (0.0 -> 1.0)"""
+        overlay = self.current()
+        if overlay is None or overlay.duration <= 0:
+            return 1.0
+        return min(1.0, (self.clock() - overlay.start) / overlay.duration)
+
+    def time_left(self):
+        """Seconds until the current overlay ends (0 when nothing is queued)"""
+        overlay = self.current()
+        if overlay is None:
+            return 0.0
+        return max(0.0, overlay.start + overlay.duration - self.clock())
+
+    def draw(self, surface):
+        """Draw the current overlay, returns False if there is nothing to draw"""
+        overlay = self.current()
+        if overlay is None:
+            return False
+        overlay.draw(surface, self.progress())
+        return True
+
+    def skip(self):
+        """Cut the current overlay short (if it allows it)"""
+        if self.queue and self.queue[0].skippable:
+            self.queue.popleft()
+
+    def clear(self):
+        """Drop every queued overlay"""
+        self.queue.clear()
+
+    def busy(self):
+        """True while an overlay is playing"""
+        return self.current() is not None